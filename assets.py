@@ -0,0 +1,205 @@
+"""
+Model pipeline: a content-hashed .bam cache plus lazy loading.
+
+Loading a glb goes through the glTF importer every start. The first time a
+model is needed it's converted and written to models/.cache as
+<name>-<hash>.bam, where the hash covers the source bytes and the Panda3D
+version. From then on the .bam loads directly, and editing the source or
+upgrading Panda3D simply misses the cache.
+
+LazyEntity doesn't load its model until it is first made visible, so
+hidden scenery costs nothing at startup. preload() warms models on
+Panda3D's loader thread (e.g. behind a splash screen) and LazyEntity picks
+them up when shown.
+
+Every load is timed; report() separates cold loads (converted) from warm
+ones (cache hit).
+
+    python assets.py build        convert everything in models/ ahead of time
+"""
+import glob
+import hashlib
+import os
+import time
+
+from panda3d.core import Filename, NodePath, PandaSystem
+from ursina import Entity
+
+MODEL_DIR = "models"
+CACHE_DIR = os.path.join(MODEL_DIR, ".cache")
+SOURCE_EXTENSIONS = (".glb", ".gltf", ".obj", ".egg", ".bam")
+
+timings = []            # (name, "cold" | "warm" | "builtin", seconds)
+_loaded = {}            # name -> NodePath (loaded once, instanced per entity)
+_pending = {}           # name -> callbacks waiting on a background load
+PREPARE = {}            # name -> (prepare function, cache tag) applied at conversion
+
+
+def _loader():
+    import builtins
+    return builtins.base.loader
+
+
+def find_source(name):
+    """models/stadium -> models/stadium.glb, or None for builtin models like 'cube'."""
+    stem = name if name.startswith(MODEL_DIR) else os.path.join(MODEL_DIR, name)
+    for ext in SOURCE_EXTENSIONS:
+        if os.path.isfile(stem + ext):
+            return stem + ext
+    return None
+
+
+def content_hash(path):
+    h = hashlib.blake2b(digest_size=8)
+    h.update(PandaSystem.getVersionString().encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(source, tag=""):
+    stem = os.path.splitext(os.path.basename(source))[0] + (f"-{tag}" if tag else "")
+    return os.path.join(CACHE_DIR, f"{stem}-{content_hash(source)}.bam")
+
+
+def convert(source, target, prepare=None):
+    """Load source through Panda3D's importers (then prepare(), if given) and write it out as .bam."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    node = _loader().loadModel(Filename.fromOsSpecific(source), noCache=True)
+    if prepare is not None:
+        node = prepare(node)
+    tmp = target + ".tmp"
+    if not node.writeBamFile(Filename.fromOsSpecific(tmp)):
+        raise OSError(f"could not write {tmp}")
+    os.replace(tmp, target)
+
+    # drop bams of older versions of the same source and tag
+    stem = os.path.basename(target).rsplit("-", 1)[0]
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{stem}-*.bam")):
+        if old != target and os.path.basename(old).rsplit("-", 1)[0] == stem:
+            os.remove(old)
+    return node
+
+
+def _bam_for(name):
+    """(bam path, converted now?) for a source model; converts on a miss."""
+    source = find_source(name)
+    if source is None or (source.endswith(".bam") and name not in PREPARE):
+        return source, False
+    prepare, tag = PREPARE.get(name, (None, ""))
+    target = cache_path(source, tag)
+    if os.path.exists(target):
+        return target, False
+    convert(source, target, prepare)
+    return target, True
+
+
+def load(name):
+    """NodePath for a model, via the cache. Returns None for builtin models."""
+    if name in _loaded:
+        return _loaded[name]
+    start = time.perf_counter()
+    bam, converted = _bam_for(name)
+    if bam is None:
+        return None
+    node = _loader().loadModel(Filename.fromOsSpecific(bam))
+    _loaded[name] = node
+    timings.append((name, "cold" if converted else "warm", time.perf_counter() - start))
+    return node
+
+
+def prepare_with(name, prepare, tag):
+    """
+    Run prepare(NodePath) -> NodePath on a model when it's converted, e.g.
+    lod.prepare_model. The tag goes in the cache file name, so change it
+    whenever prepare's output would change.
+    """
+    PREPARE[name] = (prepare, tag)
+
+
+def preload(names, on_done=None):
+    """
+    Load models on Panda3D's loader thread. Cache misses are converted on
+    the main thread first (the importers aren't thread safe). on_done is
+    called on the main thread once every model is in.
+    """
+    remaining = set()
+    for name in names:
+        if name in _loaded:
+            continue
+        start = time.perf_counter()
+        bam, converted = _bam_for(name)
+        if bam is None:
+            continue
+        remaining.add(name)
+
+        def loaded(node, name=name, start=start, converted=converted):
+            _loaded[name] = node
+            timings.append((name, "cold" if converted else "warm", time.perf_counter() - start))
+            for callback in _pending.pop(name, ()):
+                callback(node)
+            remaining.discard(name)
+            if not remaining and on_done:
+                on_done()
+
+        _pending.setdefault(name, [])
+        _loader().loadModel(Filename.fromOsSpecific(bam), callback=loaded)
+    if not remaining and on_done:
+        on_done()
+
+
+def report():
+    lines = []
+    for kind in ("cold", "warm"):
+        rows = [(n, s) for n, k, s in timings if k == kind]
+        if rows:
+            total = sum(s for _, s in rows)
+            lines.append(f"{kind} loads: {len(rows)} in {total * 1000:.0f} ms  "
+                         + ", ".join(f"{n} {s * 1000:.0f} ms" for n, s in rows))
+    return "\n".join(lines) or "no models loaded"
+
+
+class LazyEntity(Entity):
+    """Entity whose model is only loaded the first time it becomes visible."""
+
+    def __init__(self, model=None, visible=False, **kwargs):
+        object.__setattr__(self, "lazy_model", model)
+        super().__init__(**kwargs)
+        self.visible = visible
+
+    def __setattr__(self, name, value):
+        if name == "visible" and value and getattr(self, "lazy_model", None):
+            self.load_model()
+        super().__setattr__(name, value)
+
+    def load_model(self):
+        name = self.lazy_model
+        object.__setattr__(self, "lazy_model", None)
+        if name in _pending:
+            # still on the loader thread: attach when it lands
+            _pending[name].append(lambda node: self._attach(node))
+            return
+        node = load(name)
+        if node is None:
+            self.model = name   # builtin model, ursina loads it
+        else:
+            self._attach(node)
+
+    def _attach(self, node):
+        self.model = node.copyTo(NodePath())
+
+
+if __name__ == "__main__":
+    import sys
+
+    from direct.showbase.ShowBase import ShowBase
+
+    if sys.argv[1:2] != ["build"]:
+        sys.exit("usage: python assets.py build")
+    ShowBase(windowType="none")
+    for source in sorted(glob.glob(os.path.join(MODEL_DIR, "*"))):
+        stem, ext = os.path.splitext(source)
+        if ext in SOURCE_EXTENSIONS and ext != ".bam":
+            load(stem)
+    print(report())
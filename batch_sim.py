@@ -0,0 +1,457 @@
+"""
+NumPy batch rally simulator for tuning.
+
+Runs N independent rallies side by side with all state held in flat
+arrays (structure of arrays), so one tick is a handful of vector ops no
+matter how many rallies are in flight. The rules follow sim.Match with
+the player side on autopilot (Player.update_bot): ball flight, net and
+floor contact, players chasing the ball, teammate receives and the
+opponent's bump/spike with the 3-touch rule. When a rally ends its slot
+is reset under a mask and the next rally starts straight away.
+
+AI movement is the direct chase the sim used before planner.py: the
+players head for the ball's current position every tick rather than
+running to a planned intercept, so the AI here is weaker than
+sim.Match's. Compare parameter sets against each other, not against
+win rates from the real sim.
+
+Every tunable in BatchParams can be a scalar or an (N,) array (or (N, 2)
+for directions), so a whole parameter grid runs in one batch:
+
+    params, grid = param_grid(1000, opp_speed=[4, 6, 8], opp_cooldown=[0.3, 0.5])
+    result = BatchRallySim(params, seed=1).run(rallies_per_slot=4)
+    print(win_rate_by(result, grid))
+"""
+import itertools
+
+import numpy as np
+
+import sim
+
+PLAYER, PLAYER_TEAMMATE, OPPONENT, OPPONENT_TEAMMATE = range(4)
+PLAYER_SIDE, AI_SIDE = 0, 1
+NO_WINNER = -1
+
+STARTS = np.array([sim.PLAYER_START, sim.PLAYER_TEAMMATE_START,
+                   sim.OPPONENT_START, sim.OPPONENT_TEAMMATE_START], dtype=np.float64)
+
+# Box hit zones as (offset from body, half extents)
+BODY_ZONE = (np.array(sim.Actor.zone_offset, dtype=np.float64),
+             np.array(sim.Actor.zone_half, dtype=np.float64))
+NET_CENTER = np.array(sim.NET_POS, dtype=np.float64)
+NET_HALF = np.array(sim.NET_HALF, dtype=np.float64)
+
+# The bot faces +x with a level camera, so its camera box is axis-aligned
+BOT_ZONE = (np.array((sim.Player.zone_distance, sim.Player.eye_height, 0.0)),
+            np.array((sim.Player.zone_camera_half[2], sim.Player.zone_camera_half[1],
+                      sim.Player.zone_camera_half[0])))
+
+
+# Parameters whose value is a k-vector rather than a number: name -> k
+VECTOR_PARAMS = {'spike_dir': 2, 'bump_dir': 2}
+
+
+class BatchParams:
+    """Tunables. Each may be a scalar or one value per slot."""
+
+    def __init__(self, n, **overrides):
+        self.n = n
+        self.dt = 1 / 60
+        self.gravity = sim.GRAVITY
+        self.bounce = sim.BOUNCE
+        self.net_bounce = sim.NET_BOUNCE
+        self.opp_speed = 6.0
+        self.opp_cooldown = 0.5
+        self.bot_speed = 10.0
+        self.bot_cooldown = 0.2
+        self.teammate_speed = 5.0
+        self.spike_chance = 0.5
+        self.spike_dir = (-1.0, 1.0)    # (x, y) of Opponent.hit_ball's spike bump_dir, z is random
+        self.spike_speed = 13.0
+        self.bump_dir = (-1.0, 1.25)
+        self.bump_speed = 12.0
+        self.z_jitter = 0.3
+        self.max_rally_time = 60.0
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"unknown batch parameter: {name}")
+            setattr(self, name, value)
+
+    def column(self, name):
+        """Parameter as an (N,) array, or (N, k) for the VECTOR_PARAMS."""
+        value = np.asarray(getattr(self, name), dtype=np.float64)
+        shape = (self.n, VECTOR_PARAMS[name]) if name in VECTOR_PARAMS else (self.n,)
+        try:
+            return np.broadcast_to(value, shape).copy()
+        except ValueError:
+            raise ValueError(f"batch parameter {name} has shape {value.shape}, expected {shape} "
+                             f"or something that broadcasts to it") from None
+
+
+def param_grid(reps, **axes):
+    """
+    Cartesian product of parameter values, each combination repeated reps times.
+
+    Returns (BatchParams, grid) where grid maps each parameter name to its
+    (N,) column ((N, k) for VECTOR_PARAMS), handy for grouping results afterwards.
+    """
+    names = list(axes)
+    combos = list(itertools.product(*(axes[k] for k in names)))
+    n = len(combos) * reps
+    columns = {}
+    for i, name in enumerate(names):
+        values = [c[i] for c in combos]
+        columns[name] = np.repeat(np.asarray(values, dtype=np.float64), reps, axis=0)
+    return BatchParams(n, **columns), columns
+
+
+def _in_box(p, center, half, r=sim.BALL_RADIUS):
+    """Sphere (radius r at p) vs axis-aligned boxes, all (N, 3)."""
+    excess = np.abs(p - center)
+    excess -= half
+    np.maximum(excess, 0.0, out=excess)
+    return np.einsum('ij,ij->i', excess, excess) <= r * r
+
+
+def _normalize(v):
+    length = np.linalg.norm(v, axis=1, keepdims=True)
+    return v / np.where(length == 0, 1.0, length)
+
+
+# Every per-slot array of BatchRallySim, for compact()
+SLOT_FIELDS = ('gravity', 'bounce', 'net_bounce', 'opp_speed', 'opp_cooldown', 'bot_speed', 'bot_cooldown',
+               'teammate_speed', 'spike_chance', 'spike_dir', 'spike_speed', 'bump_dir', 'bump_speed',
+               'z_jitter', 'bot_step', 'opp_step', 'teammate_step',
+               'ball_p', 'ball_v', 'pos', 'cooldown', 'has_hit', 'freeze', 'touches', 'team_touches',
+               'total_touches', 'spikes', 'last_hitter', 'server', 'rally_ticks')
+
+# run() drops finished slots once at most this fraction of the batch is still playing
+COMPACT_BELOW = 0.5
+
+
+class BatchRallySim:
+    def __init__(self, params, seed=None):
+        self.params = p = params
+        self.n = n = params.n
+        self.rng = np.random.default_rng(seed)
+
+        # resolved parameter columns
+        self.gravity = p.column('gravity')
+        self.bounce = p.column('bounce')
+        self.net_bounce = p.column('net_bounce')
+        self.opp_speed = p.column('opp_speed')
+        self.opp_cooldown = p.column('opp_cooldown')
+        self.bot_speed = p.column('bot_speed')
+        self.bot_cooldown = p.column('bot_cooldown')
+        self.teammate_speed = p.column('teammate_speed')
+        self.spike_chance = p.column('spike_chance')
+        self.spike_dir = p.column('spike_dir')
+        self.spike_speed = p.column('spike_speed')
+        self.bump_dir = p.column('bump_dir')
+        self.bump_speed = p.column('bump_speed')
+        self.z_jitter = p.column('z_jitter')
+        # per-tick distances, (N, 1) to scale xz pairs
+        dt = p.dt
+        self.bot_step = (self.bot_speed * dt)[:, None]
+        self.opp_step = (self.opp_speed * dt)[:, None]
+        self.teammate_step = (self.teammate_speed * dt)[:, None]
+
+        # state
+        self.ball_p = np.zeros((n, 3))
+        self.ball_v = np.zeros((n, 3))
+        self.pos = np.zeros((n, 4, 3))
+        self.cooldown = np.zeros((n, 2))          # player, opponent
+        self.has_hit = np.zeros((n, 4), dtype=bool)
+        self.freeze = np.zeros((n, 4), dtype=bool)
+        self.touches = np.zeros((n, 2), dtype=np.int16)
+        self.team_touches = np.zeros((n, 2), dtype=np.int16)
+        self.total_touches = np.zeros(n, dtype=np.int16)
+        self.spikes = np.zeros(n, dtype=np.int16)
+        self.last_hitter = np.full(n, NO_WINNER, dtype=np.int8)
+        self.server = np.zeros(n, dtype=np.int8)
+        self.rally_ticks = np.zeros(n, dtype=np.int32)
+        self.ticks = 0
+
+        self.pos[:] = STARTS
+        self.reset(np.ones(n, dtype=bool))
+
+    # ----- RESET / SERVE -----
+
+    def reset(self, mask):
+        """Start a new rally (already served) in every slot where mask is set."""
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        player_serves = self.server[idx] == PLAYER_SIDE
+
+        # Only the serving side walks back to its spots (reset_for_serve)
+        p_idx, o_idx = idx[player_serves], idx[~player_serves]
+        self.pos[p_idx, :2] = STARTS[:2]
+        self.pos[o_idx, 2:] = STARTS[2:]
+        self.has_hit[idx] = False
+        self.freeze[idx] = False
+        self.touches[idx] = 0
+        self.team_touches[idx] = 0
+        self.total_touches[idx] = 0
+        self.spikes[idx] = 0
+        self.last_hitter[idx] = NO_WINNER
+        self.rally_ticks[idx] = 0
+
+        z = self.rng.uniform(-1, 1, idx.size)
+        self.ball_p[idx] = np.where(player_serves[:, None],
+                                    STARTS[PLAYER] + (1, 3, 0),
+                                    STARTS[OPPONENT] + (-1, 10, 0))
+        self.ball_v[idx, 0] = np.where(player_serves, 0.5, -0.5)
+        self.ball_v[idx, 1] = 10
+        self.ball_v[idx, 2] = z
+
+    # ----- TICK -----
+
+    def step(self):
+        """Advance every slot one tick. Returns the winner per slot (-1 = still playing)."""
+        dt = self.params.dt
+        n = self.n
+        bp, bv, pos = self.ball_p, self.ball_v, self.pos
+        winner = np.full(n, NO_WINNER, dtype=np.int8)
+        live = np.ones(n, dtype=bool)
+
+        self.cooldown = np.maximum(self.cooldown - dt, 0.0)
+        ball_left = bp[:, 0] < 0
+        ball_right = ~ball_left & (bp[:, 0] > 0)
+
+        # ----- MOVEMENT -----
+        # xz pairs are strided views (::2 picks x and z), so no gathers or copies
+        ball_xz = bp[:, ::2]
+        ahead = bv[:, ::2] * 0.1
+        ahead += ball_xz
+
+        # player bot: bang-bang toward where the ball will be, staying behind it
+        step = self.bot_step * ball_left[:, None]
+        me = pos[:, PLAYER, ::2]
+        me += np.where(ahead - (sim.Player.zone_distance, 0) > me, step, -step)
+
+        # opponent: same, no offset
+        step = self.opp_step * ball_right[:, None]
+        me = pos[:, OPPONENT, ::2]
+        me += np.where(ahead > me, step, -step)
+
+        # player teammate: constant speed toward the ball
+        me = pos[:, PLAYER_TEAMMATE, ::2]
+        d = ball_xz - me
+        dist = np.sqrt(np.einsum('ij,ij->i', d, d))
+        moving = ball_left & (dist > 0.1)
+        d *= (moving / np.maximum(dist, 1e-9))[:, None] * self.teammate_step
+        me += d
+
+        # opponent teammate: ease toward the ball until it has touched it
+        easing = ball_right & ~self.freeze[:, OPPONENT_TEAMMATE]
+        me = pos[:, OPPONENT_TEAMMATE, ::2]
+        d = ball_xz - me
+        d *= easing[:, None] * self.teammate_step
+        me += d
+
+        # ----- TOUCHES (actor order, like Match.check_touches) -----
+        # player bot bump
+        hit = live & (self.cooldown[:, 0] <= 0) & _in_box(bp, pos[:, PLAYER] + BOT_ZONE[0], BOT_ZONE[1])
+        if hit.any():
+            self._main_touch(hit, PLAYER_SIDE, winner, live)
+            ok = hit & live
+            self.cooldown[ok, 0] = self.bot_cooldown[ok]
+            bv[ok] = np.array((1.0, 1.0, 0.0)) / np.sqrt(2) * 12
+
+        # player teammate receive
+        d3 = bp - pos[:, PLAYER_TEAMMATE]
+        hit = live & ~self.has_hit[:, PLAYER_TEAMMATE] & ((d3 * d3).sum(axis=1) < 1.5 ** 2)
+        if hit.any():
+            self._receive(hit, PLAYER_TEAMMATE, PLAYER_SIDE)
+
+        # opponent bump / spike
+        hit = live & ball_right & (self.cooldown[:, 1] <= 0) & _in_box(bp, pos[:, OPPONENT] + BODY_ZONE[0], BODY_ZONE[1])
+        if hit.any():
+            self._main_touch(hit, AI_SIDE, winner, live)
+            ok = np.flatnonzero(hit & live)
+            self.cooldown[ok, 1] = self.opp_cooldown[ok]
+            spike = self.rng.random(ok.size) < self.spike_chance[ok]
+            jitter = self.rng.uniform(-1, 1, ok.size) * self.z_jitter[ok]
+            dir_xy = np.where(spike[:, None], self.spike_dir[ok], self.bump_dir[ok])
+            speed = np.where(spike, self.spike_speed[ok], self.bump_speed[ok])
+            direction = _normalize(np.column_stack((dir_xy, jitter)))
+            bv[ok] = direction * speed[:, None]
+            self.spikes[ok] += spike
+
+        # opponent teammate receive
+        hit = (live & ball_right & ~self.has_hit[:, OPPONENT_TEAMMATE] & ~self.freeze[:, OPPONENT_TEAMMATE]
+               & _in_box(bp, pos[:, OPPONENT_TEAMMATE] + BODY_ZONE[0], BODY_ZONE[1]))
+        if hit.any():
+            self._receive(hit, OPPONENT_TEAMMATE, AI_SIDE)
+
+        # ----- BALL -----
+        m = live
+        if m.all():     # the usual tick: no fault, so no masking
+            bv[:, 1] -= self.gravity * dt
+            bp += bv * dt
+        else:
+            bv[m, 1] -= self.gravity[m] * dt
+            bp[m] += bv[m] * dt
+
+        low = m & (bp[:, 1] < 0.1)
+        bp[low, 1] = 0.5
+        bv[low, 1] *= self.bounce[low]
+
+        # net: knock back if moving into it below the tape
+        into_net = (m & _in_box(bp, NET_CENTER, NET_HALF)
+                    & (bp[:, 1] <= sim.NET_TOP) & (bv[:, 0] * (sim.NET_POS[0] - bp[:, 0]) > 0))
+        bv[into_net, 0] *= self.net_bounce[into_net]
+
+        # floor: in → point to the other side, out → against the last hitter
+        floor = m & (bp[:, 1] - sim.BALL_RADIUS < sim.FLOOR_Y)
+        in_court = ((np.abs(bp[:, 0]) <= sim.COURT_HALF_X + sim.BALL_RADIUS)
+                    & (np.abs(bp[:, 2]) <= sim.COURT_HALF_Z + sim.BALL_RADIUS))
+        side_win = np.where(bp[:, 0] < 0, AI_SIDE, PLAYER_SIDE)
+        out_win = np.where(self.last_hitter == AI_SIDE, PLAYER_SIDE, AI_SIDE)
+        winner[floor] = np.where(in_court, side_win, out_win)[floor]
+
+        self.rally_ticks += 1
+        self.ticks += 1
+        return winner
+
+    def _main_touch(self, hit, side, winner, live):
+        """Player/opponent touch: count it and fault on the 4th."""
+        self.last_hitter[hit] = side
+        self.touches[hit, side] += 1
+        self.total_touches[hit] += 1
+        fault = hit & (self.touches[:, side] > 3)
+        winner[fault] = 1 - side
+        live &= ~fault
+
+    def _receive(self, hit, actor, side):
+        idx = np.flatnonzero(hit)
+        self.team_touches[idx, side] += 1
+        self.total_touches[idx] += 1
+        self.has_hit[idx, actor] = True
+        self.last_hitter[idx] = side
+        touch = self.team_touches[idx, side]
+        me = self.pos[idx, actor]
+
+        if actor == PLAYER_TEAMMATE:
+            # lift it for the player; freeze only after the first touch
+            set_target = me + (0, 3, 0)
+            self.freeze[idx, actor] |= touch == 1
+        else:
+            set_target = self.pos[idx, OPPONENT] + (0, 1, 0)
+            self.freeze[idx, actor] = True
+
+        sign = 1.0 if side == PLAYER_SIDE else -1.0
+        attack = np.column_stack((sign * self.rng.uniform(5, 10, idx.size),
+                                  np.ones(idx.size),
+                                  self.rng.uniform(-3, 3, idx.size)))
+        target = np.where((touch <= 2)[:, None], set_target, attack)
+        bump_dir = _normalize(target - me)
+        bump_dir[:, 1] += 0.5
+        self.ball_v[idx] = bump_dir * 12
+
+    # ----- RUN -----
+
+    def compact(self, keep):
+        """Keep only the slots at indices keep, in that order."""
+        for name in SLOT_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+        self.n = keep.size
+
+    def run(self, rallies_per_slot=1):
+        """
+        Play rallies until every slot has finished rallies_per_slot of them.
+
+        Returns a dict of (N, rallies_per_slot) arrays: winner (0 player side,
+        1 AI side, -1 timed out), rally_time, touches (total),
+        player_touches, ai_touches and spikes.
+
+        Rally lengths vary, so slots finish at different times. Once at most
+        COMPACT_BELOW of the batch is still playing, the finished slots are
+        compacted away rather than stepped for nothing. The sim is spent
+        afterwards: run it once.
+        """
+        n, r = self.n, rallies_per_slot
+        dt = self.params.dt
+        max_ticks = int(self.params.max_rally_time / dt)
+        out = {
+            'winner': np.full((n, r), NO_WINNER, dtype=np.int8),
+            'rally_time': np.zeros((n, r)),
+            'touches': np.zeros((n, r), dtype=np.int16),
+            'player_touches': np.zeros((n, r), dtype=np.int16),
+            'ai_touches': np.zeros((n, r), dtype=np.int16),
+            'spikes': np.zeros((n, r), dtype=np.int16),
+        }
+        done = np.zeros(n, dtype=np.int32)      # rallies finished per slot
+        playing = np.ones(n, dtype=bool)
+        slots = np.arange(n)                    # row in out for each slot still in the batch
+
+        while playing.any():
+            winner = self.step()
+            timed_out = self.rally_ticks >= max_ticks
+            ended = playing & ((winner != NO_WINNER) | timed_out)
+            if not ended.any():
+                continue
+
+            idx = np.flatnonzero(ended)
+            rows, k = slots[idx], done[idx]
+            out['winner'][rows, k] = winner[idx]
+            out['rally_time'][rows, k] = self.rally_ticks[idx] * dt
+            out['touches'][rows, k] = self.total_touches[idx]
+            out['player_touches'][rows, k] = self.touches[idx, PLAYER_SIDE] + self.team_touches[idx, PLAYER_SIDE]
+            out['ai_touches'][rows, k] = self.touches[idx, AI_SIDE] + self.team_touches[idx, AI_SIDE]
+            out['spikes'][rows, k] = self.spikes[idx]
+            done[idx] += 1
+
+            # winner serves next, like award_point
+            scored = ended & (winner != NO_WINNER)
+            self.server[scored] = winner[scored]
+            playing &= done < r
+            self.reset(ended & playing)
+
+            count = np.count_nonzero(playing)
+            if 0 < count <= COMPACT_BELOW * self.n:
+                keep = np.flatnonzero(playing)
+                self.compact(keep)
+                slots, done, playing = slots[keep], done[keep], playing[keep]
+
+        return out
+
+
+def win_rate_by(result, grid):
+    """
+    Player-side win rate per parameter combination, as {((name, value), ...): rate}.
+    Values of VECTOR_PARAMS are tuples.
+    """
+    names = list(grid)
+    columns = [np.asarray(grid[k], dtype=np.float64).reshape(len(grid[k]), -1) for k in names]
+    keys = np.hstack(columns)
+    splits = np.cumsum([c.shape[1] for c in columns])[:-1]
+    winner = result['winner']
+    rates = {}
+    for combo in np.unique(keys, axis=0):
+        rows = np.all(keys == combo, axis=1)
+        w = winner[rows]
+        decided = w != NO_WINNER
+        rate = float((w[decided] == PLAYER_SIDE).mean()) if decided.any() else float('nan')
+        values = [tuple(part.tolist()) if name in VECTOR_PARAMS else part[0].item()
+                  for name, part in zip(names, np.split(combo, splits))]
+        rates[tuple(zip(names, values))] = rate
+    return rates
+
+
+def format_value(value):
+    return "(" + ", ".join(f"{v:g}" for v in value) + ")" if isinstance(value, tuple) else f"{value:g}"
+
+
+if __name__ == "__main__":
+    import time
+
+    params, grid = param_grid(2000, opp_speed=[4.0, 6.0, 8.0], opp_cooldown=[0.3, 0.5, 0.8])
+    start = time.perf_counter()
+    result = BatchRallySim(params, seed=0).run(rallies_per_slot=2)
+    elapsed = time.perf_counter() - start
+    total = result['winner'].size
+    print(f"{total} rallies in {elapsed:.2f}s ({total / elapsed:.0f} rallies/s)")
+    for combo, rate in win_rate_by(result, grid).items():
+        print(", ".join(f"{k}={format_value(v)}" for k, v in combo), f"player wins {rate:.1%}")
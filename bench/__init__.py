@@ -0,0 +1,16 @@
+"""
+Scripted benchmarks for the game's hot paths.
+
+Scenarios drive a sim.Match with no human input. They run either headless
+(sim, trajectory prediction and event hooks, timed per frame) or inside the
+real game through `python Volleyball.py --bench <scenario>`, which also
+times rendering, effects and the crowd.
+
+    python -m bench run --out results.json
+    python -m bench run --render --sweep CROWD_ROWS=5,10,20 --sweep CROWD_COLS=35,70
+    python -m bench compare results.json --baseline baseline.json
+"""
+from bench.metrics import FrameStats
+from bench.scenarios import SCENARIOS, Scenario
+from bench.runner import run_headless, run_render, run_suite
+from bench.compare import compare, load_results
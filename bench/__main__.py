@@ -0,0 +1,85 @@
+"""
+    python -m bench run [--scenario NAME ...] [--frames N] [--sweep NAME=v1,v2 ...]
+                        [--render] [--out results.json] [--baseline baseline.json]
+    python -m bench compare results.json --baseline baseline.json [--threshold 0.1]
+    python -m bench list
+"""
+import argparse
+import json
+import sys
+
+from bench.compare import compare, format_rows, load_results, unmatched
+from bench.runner import GAME_FLAGS, format_params, run_suite
+from bench.scenarios import SCENARIOS
+
+
+def parse_sweep(items):
+    sweep = {}
+    for item in items or ():
+        name, _, values = item.partition("=")
+        if name not in GAME_FLAGS:
+            raise SystemExit(f"can't sweep {name}; choose from {', '.join(GAME_FLAGS)}")
+        try:
+            sweep[name] = [int(v) for v in values.split(",")]
+        except ValueError:
+            raise SystemExit(f"--sweep {item}: expected NAME=v1,v2 with whole-number values") from None
+    return sweep
+
+
+def report_regressions(results, baseline_path, threshold):
+    baseline = load_results(baseline_path)
+    rows = compare(results, baseline, threshold)
+    print(format_rows(rows))
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    # a result with nothing to compare against is a failure, not a pass
+    only_current, only_baseline = unmatched(results, baseline)
+    for side, missing in (("results", only_current), ("baseline", only_baseline)):
+        for r in missing:
+            print(f"only in {side}: {r['scenario']} {format_params(r['params'])}")
+    if only_current or only_baseline:
+        print(f"{len(only_current) + len(only_baseline)} result(s) without a counterpart")
+    return 1 if regressions or only_current or only_baseline or not rows else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Scripted game benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run scenarios")
+    run.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    run.add_argument("--frames", type=int, help="frames per run (default 3600 headless, 1800 rendered)")
+    run.add_argument("--sweep", action="append", metavar="NAME=v1,v2",
+                     help=f"sweep one of {', '.join(GAME_FLAGS)}")
+    run.add_argument("--render", action="store_true", help="run inside Volleyball.py")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", help="write results JSON here")
+    run.add_argument("--baseline", help="compare against this results JSON")
+    run.add_argument("--threshold", type=float, default=0.10)
+
+    cmp = sub.add_parser("compare", help="compare two results files")
+    cmp.add_argument("results")
+    cmp.add_argument("--baseline", required=True)
+    cmp.add_argument("--threshold", type=float, default=0.10)
+
+    sub.add_parser("list", help="list scenarios")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:<12} {scenario.description}")
+        return 0
+    if args.command == "compare":
+        return report_regressions(load_results(args.results), args.baseline, args.threshold)
+
+    results = run_suite(args.scenario, args.frames, parse_sweep(args.sweep), args.render, args.seed)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Compare a results file against a baseline and flag regressions."""
+import json
+
+from bench.runner import DEFAULT_PARAMS, format_params
+
+# metric -> True if bigger is better
+METRICS = {"fps": True, "p50_ms": False, "p99_ms": False, "alloc_blocks_per_frame": False}
+# below these a change is noise whatever the ratio
+FLOORS = {"fps": 1.0, "p50_ms": 0.01, "p99_ms": 0.01, "alloc_blocks_per_frame": 0.5}
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _key(result):
+    """(scenario, params) with defaults filled in, so {} and the default values match."""
+    params = {**DEFAULT_PARAMS, **result["params"]}
+    return result["scenario"], tuple(sorted(params.items()))
+
+
+def unmatched(current, baseline):
+    """(only in current, only in baseline): results the other file has no counterpart for."""
+    now = {_key(r): r for r in current["results"]}
+    base = {_key(r): r for r in baseline["results"]}
+    return ([r for k, r in now.items() if k not in base],
+            [r for k, r in base.items() if k not in now])
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Rows of (scenario, params, metric, baseline, current, change, regressed)
+    for every result present in both (see unmatched() for the rest). change
+    is relative; a metric regresses when it gets worse by more than
+    threshold (and by more than its floor).
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = base.get(_key(result))
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            a, b = old["metrics"][metric], result["metrics"][metric]
+            change = (b - a) / abs(a) if a else 0.0
+            worse = (a - b) if higher_is_better else (b - a)
+            regressed = worse > FLOORS[metric] and worse > threshold * abs(a)
+            rows.append((result["scenario"], result["params"], metric, a, b, change, regressed))
+    return rows
+
+
+def format_rows(rows):
+    lines = [f"{'scenario':<12} {'params':<32} {'metric':<24}{'baseline':>11}{'current':>11}{'change':>9}"]
+    for scenario, params, metric, a, b, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        lines.append(f"{scenario:<12} {format_params(params):<32} {metric:<24}"
+                     f"{a:11.3f}{b:11.3f}{change:+9.1%}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+"""Frame timing and allocation counters shared by the headless and in-game runs."""
+import gc
+import sys
+import time
+
+from profiler import percentile
+
+
+class FrameStats:
+    """
+    One sample per frame: wall time and the change in live allocated
+    blocks. Python has no cheap total-allocation counter, so
+    alloc_blocks_per_frame is net growth (about 0 for steady code, positive
+    when something accumulates); gc_collections counts gen-0 collections,
+    which rise with allocation churn.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.times = []
+        self.blocks = []
+        self.events = {}
+        self.start = None
+        self.start_blocks = 0
+        self.gc_start = gc.get_stats()[0]["collections"]
+
+    def on_event(self, event, data=None):
+        """Match listener: counts events so a run shows what it exercised."""
+        self.events[event] = self.events.get(event, 0) + 1
+
+    def frame_begin(self):
+        self.start = self.clock()
+        self.start_blocks = sys.getallocatedblocks()
+
+    def frame_end(self):
+        if self.start is None:
+            return
+        blocks = sys.getallocatedblocks()
+        end = self.clock()
+        self.blocks.append(blocks - self.start_blocks)
+        self.times.append(end - self.start)
+        self.start = None
+
+    def summary(self):
+        n = len(self.times)
+        total = sum(self.times)
+        ordered = sorted(self.times)
+        return {
+            "frames": n,
+            "fps": n / total if total else 0.0,
+            "mean_ms": 1000 * total / n if n else 0.0,
+            "p50_ms": 1000 * percentile(ordered, 50),
+            "p99_ms": 1000 * percentile(ordered, 99),
+            "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+            "alloc_blocks_per_frame": sum(self.blocks) / n if n else 0.0,
+            "gc_collections": gc.get_stats()[0]["collections"] - self.gc_start,
+            "events": dict(sorted(self.events.items())),
+        }
@@ -0,0 +1,110 @@
+"""Run scenarios headless or in the game, optionally over a parameter sweep."""
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.metrics import FrameStats
+from bench.scenarios import SCENARIOS
+from game.config import GameConfig
+from trajectory import TrajectoryPredictor
+
+GAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Volleyball.py")
+
+_defaults = GameConfig()
+DEFAULT_PARAMS = {"CROWD_ROWS": _defaults.crowd_rows, "CROWD_COLS": _defaults.crowd_cols,
+                  "TRAJECTORY_LENGTH": _defaults.trajectory_length, "TEAM_SIZE": _defaults.team_size}
+# Volleyball.py flag for each sweepable constant
+GAME_FLAGS = {"CROWD_ROWS": "--crowd-rows", "CROWD_COLS": "--crowd-cols",
+              "TRAJECTORY_LENGTH": "--trajectory-length", "TEAM_SIZE": "--team-size"}
+# Only these change anything without the renderer
+HEADLESS_PARAMS = {"TRAJECTORY_LENGTH", "TEAM_SIZE"}
+
+
+def run_headless(scenario, frames=3600, seed=0, params=None, dt=1 / 60):
+    """
+    One tick per frame of sim plus trajectory prediction, timed per frame.
+    Crowd and effect costs need run_render; here their triggering events
+    are only counted.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    script = SCENARIOS[scenario]()
+    match = script.make_match(seed, team_size=params["TEAM_SIZE"])
+    predictor = TrajectoryPredictor(dt)
+    length = params["TRAJECTORY_LENGTH"]
+    stats = FrameStats()
+    match.listeners.append(stats.on_event)
+
+    for i in range(frames):
+        stats.frame_begin()
+        script.frame(match, i)
+        match.step(dt)
+        if not match.serve_mode and predictor.update(match.ball, match.time):
+            predictor.trajectory.sample(length)
+        stats.frame_end()
+    return stats.summary()
+
+
+def run_render(scenario, frames=1800, seed=0, params=None, timeout=600):
+    """Run the scenario inside Volleyball.py in a subprocess and read back its summary."""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    fd, out = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    cmd = [sys.executable, GAME, "--bench", scenario, "--bench-frames", str(frames),
+           "--bench-seed", str(seed), "--bench-out", out]
+    for name, value in params.items():
+        cmd += [GAME_FLAGS[name], str(value)]
+    try:
+        subprocess.run(cmd, check=True, timeout=timeout, cwd=os.path.dirname(GAME))
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+
+def sweep_points(sweep):
+    """{name: [values]} -> list of {name: value}, every combination."""
+    if not sweep:
+        return [{}]
+    names = sorted(sweep)
+    return [dict(zip(names, values)) for values in itertools.product(*(sweep[n] for n in names))]
+
+
+def run_suite(scenarios=None, frames=None, sweep=None, render=False, seed=0, log=print):
+    """Every scenario at every sweep point. Returns a JSON-ready dict."""
+    scenarios = scenarios or list(SCENARIOS)
+    points = sweep_points(sweep)
+    if not render:
+        ignored = set(sweep or ()) - HEADLESS_PARAMS
+        if ignored:
+            log(f"note: {', '.join(sorted(ignored))} only matter with --render")
+    results = []
+    for name in scenarios:
+        for params in points:
+            start = time.perf_counter()
+            if render:
+                metrics = run_render(name, frames or 1800, seed, params)
+            else:
+                metrics = run_headless(name, frames or 3600, seed, params)
+            results.append({"scenario": name, "params": params, "metrics": metrics})
+            log(f"{name:<12} {format_params(params):<40} {metrics['fps']:9.0f} fps  "
+                f"p50 {metrics['p50_ms']:6.3f} ms  p99 {metrics['p99_ms']:6.3f} ms  "
+                f"({time.perf_counter() - start:.1f}s)")
+    return {
+        "meta": {
+            "mode": "render" if render else "headless",
+            "seed": seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def format_params(params):
+    return " ".join(f"{k}={v}" for k, v in sorted(params.items())) or "-"
@@ -0,0 +1,73 @@
+"""
+Scripted inputs. Each scenario sets up a Match and is called once per frame
+before the match steps; nothing here touches the renderer, so the same
+script runs headless and in Volleyball.py.
+"""
+import random
+
+import sim
+
+
+class Scenario:
+    name = "base"
+    description = ""
+    player_bot = True
+
+    def make_match(self, seed=0, profiler=None, team_size=2):
+        match = sim.Match(rng=random.Random(seed), player_bot=self.player_bot,
+                          serve_delay=0, profiler=profiler, team_size=team_size)
+        self.setup(match)
+        return match
+
+    def setup(self, match):
+        pass
+
+    def frame(self, match, index):
+        pass
+
+
+class ServeOnly(Scenario):
+    name = "serve_only"
+    description = "serve, let the ball fly for half a second, reset, alternate server"
+    player_bot = False
+    flight_frames = 30
+
+    def setup(self, match):
+        self.served_at = None
+
+    def frame(self, match, index):
+        if match.serve_mode:
+            if match.server == "player":
+                match.request_serve()
+            self.served_at = index
+        elif index - self.served_at >= self.flight_frames:
+            match.server = "ai" if match.server == "player" else "player"
+            match.reset_for_serve()
+
+
+class LongRally(Scenario):
+    name = "long_rally"
+    description = "bot vs AI, rallies played out to the end"
+
+
+class PointBurst(Scenario):
+    name = "point_burst"
+    description = "award a point every few frames (crowd cheer, score text, resets)"
+    every = 6
+
+    def frame(self, match, index):
+        if index % self.every == 0:
+            match.award_point("player" if (index // self.every) % 2 else "ai")
+
+
+class SpikeHeavy(Scenario):
+    name = "spike_heavy"
+    description = "bot vs AI where the player spikes every ball it can reach"
+
+    def frame(self, match, index):
+        player = match.player
+        if not match.serve_mode and match.ball.x < 0 and player.touching(match.ball):
+            player.spike(match)
+
+
+SCENARIOS = {s.name: s for s in (ServeOnly, LongRally, PointBurst, SpikeHeavy)}
@@ -0,0 +1,311 @@
+"""
+Analytic collision tests for the ball.
+
+Every shape in the game is a box, a sphere or the floor plane, so the
+ball (a sphere) is tested against them directly instead of going through
+Panda3D collider traversal. Tests return a Contact with the surface
+normal (pointing from the shape toward the ball), penetration depth and
+the time within the step when the contact starts.
+
+A CollisionWorld holds the static shapes and this tick's hit zones. The
+game has a dozen zones at most and the sim only sets the ones the ball
+can reach, so there is no spatial grid: each zone set is tested exactly.
+
+The swept tests find when a moving sphere first touches a shape within a
+step, so a fast ball can't pass through a thin shape between two ticks.
+"""
+import math
+
+
+class Contact:
+    __slots__ = ('normal', 'depth', 'time', 'shape')
+
+    def __init__(self, normal, depth, time=0.0, shape=None):
+        self.normal = normal    # unit (x, y, z), from the shape toward the ball
+        self.depth = depth      # how far the ball is inside (0 if just touching)
+        self.time = time        # seconds into the step when contact starts
+        self.shape = shape
+
+    def __repr__(self):
+        n = self.normal
+        return f"Contact(normal=({n[0]:.2f}, {n[1]:.2f}, {n[2]:.2f}), depth={self.depth:.3f}, time={self.time:.3f})"
+
+
+# -------------------------------------------
+# SHAPES
+# -------------------------------------------
+
+class Box:
+    """Box with half extents, optionally rotated by unit axes (x, y, z)."""
+    __slots__ = ('center', 'half', 'axes')
+
+    def __init__(self, center, half, axes=None):
+        self.center = center
+        self.half = half
+        self.axes = axes
+
+
+class Sphere:
+    __slots__ = ('center', 'radius')
+
+    def __init__(self, center, radius):
+        self.center = center
+        self.radius = radius
+
+
+class Plane:
+    """Infinite plane through point with unit normal; the 'inside' is behind it."""
+    __slots__ = ('point', 'normal')
+
+    def __init__(self, point, normal):
+        self.point = tuple(point)
+        self.normal = tuple(normal)
+
+
+# -------------------------------------------
+# NARROW PHASE
+# -------------------------------------------
+
+def sphere_box(center, radius, box):
+    """Overlap of a sphere with a box, or None."""
+    px, py, pz = center
+    bx, by, bz = box.center
+    dx, dy, dz = px - bx, py - by, pz - bz
+    axes = box.axes
+    if axes is None:
+        lx, ly, lz = dx, dy, dz
+    else:
+        (ax, ay, az), (bx, by, bz), (ux, uy, uz) = axes
+        lx = ax * dx + ay * dy + az * dz
+        ly = bx * dx + by * dy + bz * dz
+        lz = ux * dx + uy * dy + uz * dz
+    local = (lx, ly, lz)
+
+    # distance from the box surface, per box axis (0 when inside on that axis)
+    half = box.half
+    hx, hy, hz = half
+    ox = lx - hx if lx > hx else (lx + hx if lx < -hx else 0.0)
+    oy = ly - hy if ly > hy else (ly + hy if ly < -hy else 0.0)
+    oz = lz - hz if lz > hz else (lz + hz if lz < -hz else 0.0)
+    dist2 = ox * ox + oy * oy + oz * oz
+    if dist2 > radius * radius:
+        return None
+    off = (ox, oy, oz)
+
+    if dist2 > 1e-12:
+        dist = math.sqrt(dist2)
+        n = [o / dist for o in off]
+        depth = radius - dist
+    else:
+        # centre is inside the box: push out through the nearest face
+        i = min(range(3), key=lambda k: half[k] - abs(local[k]))
+        n = [0.0, 0.0, 0.0]
+        n[i] = 1.0 if local[i] >= 0 else -1.0
+        depth = radius + half[i] - abs(local[i])
+
+    if axes is not None:
+        n = [axes[0][i] * n[0] + axes[1][i] * n[1] + axes[2][i] * n[2] for i in range(3)]
+    return Contact(tuple(n), depth, 0.0, box)
+
+
+def sphere_sphere(center, radius, sphere):
+    px, py, pz = center
+    sx, sy, sz = sphere.center
+    dx, dy, dz = px - sx, py - sy, pz - sz
+    r = radius + sphere.radius
+    dist2 = dx * dx + dy * dy + dz * dz
+    if dist2 > r * r:
+        return None
+    dist = math.sqrt(dist2)
+    n = (dx / dist, dy / dist, dz / dist) if dist > 1e-9 else (0.0, 1.0, 0.0)
+    return Contact(n, r - dist, 0.0, sphere)
+
+
+def sphere_plane(center, radius, plane, velocity=(0, 0, 0), dt=0.0):
+    """
+    Contact with a plane for a sphere moving by velocity * dt this step.
+
+    Returns the contact if the sphere is already touching, or the time it
+    first touches within the step. None if it stays clear.
+    """
+    nx, ny, nz = plane.normal
+    qx, qy, qz = plane.point
+    dist = (center[0] - qx) * nx + (center[1] - qy) * ny + (center[2] - qz) * nz - radius
+    if dist <= 0:
+        return Contact(plane.normal, -dist, 0.0, plane)
+    approach = -(velocity[0] * nx + velocity[1] * ny + velocity[2] * nz)
+    if approach <= 0 or dt <= 0:
+        return None
+    t = dist / approach
+    if t > dt:
+        return None
+    return Contact(plane.normal, 0.0, t, plane)
+
+
+# -------------------------------------------
+# SWEPT TESTS
+# -------------------------------------------
+# A sphere moving in a straight line by velocity * dt. Each returns the
+# first contact within the step (Contact.time in seconds, depth 0) or None.
+# A sphere that already overlaps counts at time 0, unless it is already
+# moving out, so a ball that just bounced off a shape is not stopped by it.
+
+SWEEP_TOLERANCE = 1e-4  # gap that counts as touching
+SWEEP_ITERATIONS = 16
+
+
+def _box_local(center, box):
+    dx, dy, dz = center[0] - box.center[0], center[1] - box.center[1], center[2] - box.center[2]
+    axes = box.axes
+    if axes is None:
+        return dx, dy, dz
+    return tuple(a[0] * dx + a[1] * dy + a[2] * dz for a in axes)
+
+
+def _box_gap(local, half):
+    """Distance from a local point to the box surface, 0 inside."""
+    total = 0.0
+    for c, h in zip(local, half):
+        o = abs(c) - h
+        if o > 0:
+            total += o * o
+    return math.sqrt(total)
+
+
+def _overlap_moving_in(contact, velocity):
+    n = contact.normal
+    return velocity[0] * n[0] + velocity[1] * n[1] + velocity[2] * n[2] < 0
+
+
+def sweep_sphere_box(center, radius, box, velocity, dt):
+    # Slab test against the box grown by the radius: nothing outside it can
+    # touch, so this is also the cheap early out
+    o = _box_local(center, box)
+    vx, vy, vz = velocity
+    d = (vx, vy, vz) if box.axes is None else tuple(a[0] * vx + a[1] * vy + a[2] * vz for a in box.axes)
+    enter, leave = 0.0, max(dt, 0.0)
+    for oi, di, hi in zip(o, d, box.half):
+        ext = hi + radius
+        if -1e-12 < di < 1e-12:
+            if abs(oi) > ext:
+                return None
+            continue
+        t0, t1 = (-ext - oi) / di, (ext - oi) / di
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > enter:
+            enter = t0
+        if t1 < leave:
+            leave = t1
+        if enter > leave:
+            return None
+
+    if enter == 0.0:
+        contact = sphere_box(center, radius, box)
+        if contact is not None:
+            return contact if _overlap_moving_in(contact, velocity) else None
+        if dt <= 0:
+            return None
+
+    # Faces are exact at enter; edges and corners are rounded, so close
+    # the rest of the gap by conservative advancement
+    speed = math.sqrt(vx * vx + vy * vy + vz * vz)
+    t = enter
+    for _ in range(SWEEP_ITERATIONS):
+        local = (o[0] + d[0] * t, o[1] + d[1] * t, o[2] + d[2] * t)
+        gap = _box_gap(local, box.half) - radius
+        if gap <= SWEEP_TOLERANCE:
+            at = (center[0] + vx * t, center[1] + vy * t, center[2] + vz * t)
+            contact = sphere_box(at, radius + SWEEP_TOLERANCE, box)
+            contact.depth = 0.0
+            contact.time = t
+            return contact
+        t += gap / speed
+        if t > leave:
+            return None
+    return None
+
+
+def sweep_sphere_sphere(center, radius, sphere, velocity, dt):
+    contact = sphere_sphere(center, radius, sphere)
+    if contact is not None:
+        return contact if _overlap_moving_in(contact, velocity) else None
+    # |p + v t - c| = r: a quadratic in t
+    px, py, pz = (center[0] - sphere.center[0], center[1] - sphere.center[1], center[2] - sphere.center[2])
+    vx, vy, vz = velocity
+    r = radius + sphere.radius
+    a = vx * vx + vy * vy + vz * vz
+    b = 2 * (px * vx + py * vy + pz * vz)
+    c = px * px + py * py + pz * pz - r * r
+    disc = b * b - 4 * a * c
+    if a < 1e-12 or disc < 0 or b >= 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    if t > dt:
+        return None
+    n = ((px + vx * t) / r, (py + vy * t) / r, (pz + vz * t) / r)
+    return Contact(n, 0.0, t, sphere)
+
+
+def sweep_shape(center, radius, shape, velocity, dt):
+    if type(shape) is Box:
+        return sweep_sphere_box(center, radius, shape, velocity, dt)
+    if type(shape) is Sphere:
+        return sweep_sphere_sphere(center, radius, shape, velocity, dt)
+    return sphere_plane(center, radius, shape, velocity, dt)
+
+
+def sphere_shape(center, radius, shape):
+    if type(shape) is Box:
+        return sphere_box(center, radius, shape)
+    if type(shape) is Sphere:
+        return sphere_sphere(center, radius, shape)
+    return sphere_plane(center, radius, shape)
+
+
+# -------------------------------------------
+# WORLD
+# -------------------------------------------
+
+class CollisionWorld:
+    """
+    Static shapes (net, floor) plus the hit zones in play this tick.
+
+    There is no spatial broad phase: the owner only sets the few zones the
+    ball can reach this tick (see Match.check_touches) and removes the
+    rest, so every zone here is worth the exact test.
+    """
+
+    def __init__(self):
+        self.statics = {}
+        self.zones = {}     # key -> shape, in the order they were set
+
+    def add_static(self, name, shape):
+        self.statics[name] = shape
+
+    def set_zone(self, key, shape):
+        """Add or move one hit zone."""
+        self.zones[key] = shape
+
+    def remove_zone(self, key):
+        """Drop a hit zone. Removing one that isn't there is free."""
+        self.zones.pop(key, None)
+
+    def sweep_static(self, name, center, radius, velocity, dt):
+        """First contact with a static shape while moving by velocity * dt, or None."""
+        return sweep_shape(center, radius, self.statics[name], velocity, dt)
+
+    def zone_sweeps(self, center, radius, velocity, dt):
+        """(key, Contact) for every hit zone the moving sphere touches this step, earliest first."""
+        center = tuple(center)
+        hits = []
+        for key, shape in self.zones.items():
+            contact = sweep_shape(center, radius, shape, velocity, dt)
+            if contact is not None:
+                hits.append((key, contact))
+        hits.sort(key=lambda hit: hit[1].time)
+        return hits
+
+    def zone_contact(self, key, center, radius):
+        """Overlap of the sphere with one hit zone, or None."""
+        return sphere_shape(center, radius, self.zones[key])
@@ -0,0 +1,178 @@
+"""
+Crowd around the court, drawn as one merged mesh.
+
+Every spectator is a box baked into a static mesh. The stands are cut into
+sections of a few columns, one mesh each, arranged in a bounding volume
+hierarchy so Panda3D's cull pass skips the sections (and whole sides)
+outside the camera frustum; the crowd costs one draw call per visible
+section. Per-spectator data rides along in the vertex
+attributes: colour in the vertex colour, idle phase and a random jump seed
+in the uv. Idle bobbing and the cheer jump are computed in the vertex
+shader from Panda3D's frame time, so there is no per-spectator Python work
+per frame and a cheer is a single shader input change.
+"""
+import random
+
+from ursina import Entity, Mesh, Shader
+from panda3d.core import BoundingBox, ClockObject, Point3
+
+from lod import build_bvh
+
+
+crowd_shader = Shader(name='crowd_shader', language=Shader.GLSL, vertex='''
+#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelMatrix;
+uniform float osg_FrameTime;
+uniform float cheer_start;
+uniform float cheer_seed;
+uniform float motion;
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+out vec4 vertex_color;
+out vec3 world_normal;
+
+float out_expo(float t) { return t >= 1.0 ? 1.0 : 1.0 - pow(2.0, -10.0 * t); }
+float in_expo(float t) { return t <= 0.0 ? 0.0 : pow(2.0, 10.0 * (t - 1.0)); }
+
+void main() {
+    float phase = p3d_MultiTexCoord0.x;
+    float seed = p3d_MultiTexCoord0.y;
+
+    // idle bob
+    float y = 0.05 * sin(osg_FrameTime * 2.0 + phase);
+
+    // cheer: up over 0.2s (out_expo), back down over 0.3s (in_expo)
+    float t = osg_FrameTime - cheer_start;
+    if (t >= 0.0 && t < 0.5) {
+        float jump = 0.3 + 0.4 * fract(seed + cheer_seed);
+        if (t < 0.2) {
+            y += jump * out_expo(t / 0.2);
+        } else {
+            y += jump * (1.0 - in_expo((t - 0.2) / 0.3));
+        }
+    }
+
+    vec4 v = p3d_Vertex;
+    v.y += y * motion;
+    gl_Position = p3d_ModelViewProjectionMatrix * v;
+    vertex_color = p3d_Color;
+    world_normal = normalize(mat3(p3d_ModelMatrix) * p3d_Normal);
+}
+''', fragment='''
+#version 140
+uniform vec4 p3d_ColorScale;
+in vec4 vertex_color;
+in vec3 world_normal;
+out vec4 fragColor;
+
+void main() {
+    // cheap stand-in for colored_lights_shader: light from above
+    float light = 0.6 + 0.4 * max(dot(world_normal, normalize(vec3(0.3, 1.0, 0.2))), 0.0);
+    fragColor = vec4(vertex_color.rgb * light, vertex_color.a) * p3d_ColorScale;
+}
+''', default_input={
+    'cheer_start': -100.0,
+    'cheer_seed': 0.0,
+    'motion': 1.0,
+})
+
+
+CHEER_HEIGHT = 0.75   # highest the shader lifts a spectator (idle bob + tallest jump)
+
+# unit cube faces: normal, then 4 corners
+_FACES = (
+    ((0, 0, -1), ((-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1))),
+    ((0, 0, 1), ((1, -1, 1), (-1, -1, 1), (-1, 1, 1), (1, 1, 1))),
+    ((-1, 0, 0), ((-1, -1, 1), (-1, -1, -1), (-1, 1, -1), (-1, 1, 1))),
+    ((1, 0, 0), ((1, -1, -1), (1, -1, 1), (1, 1, 1), (1, 1, -1))),
+    ((0, 1, 0), ((-1, 1, -1), (1, 1, -1), (1, 1, 1), (-1, 1, 1))),
+    ((0, -1, 0), ((-1, -1, 1), (1, -1, 1), (1, -1, -1), (-1, -1, -1))),
+)
+
+
+def crowd_layout(rows, cols, x_min, x_max, z_min, z_max, spacing=1, row_depth=1.5):
+    """Seat positions on both long sides of the court, same layout as before."""
+    seats = []
+    for row in range(rows):
+        for col in range(cols):
+            x = x_min + col * (x_max - x_min) / (cols - 1) * spacing
+            seats.append((x, 0.5, z_min - row * row_depth))   # behind player
+            seats.append((x, 0.5, z_max + row * row_depth))   # behind AI
+    return seats
+
+
+def build_crowd_mesh(seats, size=(1, 5, 1), rng=random):
+    hx, hy, hz = size[0] / 2, size[1] / 2, size[2] / 2
+    vertices, triangles, colors, uvs, normals = [], [], [], [], []
+
+    for sx, sy, sz in seats:
+        col = (rng.randint(100, 255) / 255, rng.randint(100, 255) / 255, rng.randint(100, 255) / 255, 1)
+        uv = (rng.uniform(0, 2 * 3.1415), rng.random())   # idle phase, jump seed
+        for normal, corners in _FACES:
+            i = len(vertices)
+            for cx, cy, cz in corners:
+                vertices.append((sx + cx * hx, sy + cy * hy, sz + cz * hz))
+                colors.append(col)
+                uvs.append(uv)
+                normals.append(normal)
+            triangles.extend((i, i + 1, i + 2, i, i + 2, i + 3))
+
+    return Mesh(vertices=vertices, triangles=triangles, colors=colors,
+                uvs=uvs, normals=normals, static=True)
+
+
+def section_bounds(seats, lift, size=(1, 5, 1)):
+    """Box around a section, raised by lift: the shader moves vertices up, so the mesh's own bounds are too small."""
+    hx, hy, hz = size[0] / 2, size[1] / 2, size[2] / 2
+    return BoundingBox(Point3(min(s[0] for s in seats) - hx, min(s[1] for s in seats) - hy, min(s[2] for s in seats) - hz),
+                       Point3(max(s[0] for s in seats) + hx, max(s[1] for s in seats) + hy + lift, max(s[2] for s in seats) + hz))
+
+
+def crowd_sections(seats, x_min, x_max, section_width):
+    """Group seats by stand (sign of z) and by section_width-wide slices along x."""
+    sections = {}
+    for seat in seats:
+        key = (seat[2] > 0, int((seat[0] - x_min) // section_width))
+        sections.setdefault(key, []).append(seat)
+    return [sections[k] for k in sorted(sections)]
+
+
+class Crowd(Entity):
+    def __init__(self, rows=5, cols=35, x_min=-32, x_max=32, z_min=-30, z_max=30,
+                 spacing=1, section_width=8, **kwargs):
+        self.seats = crowd_layout(rows, cols, x_min, x_max, z_min, z_max, spacing)
+        super().__init__(shader=crowd_shader, **kwargs)
+        self.sections = []
+        for seats in crowd_sections(self.seats, x_min, x_max, section_width):
+            mesh = build_crowd_mesh(seats)
+            mesh.node().setBounds(section_bounds(seats, CHEER_HEIGHT))
+            self.sections.append(mesh)
+        build_bvh(self.sections, name='crowd').reparentTo(self)
+        self.motion = True
+
+    @property
+    def count(self):
+        return len(self.seats)
+
+    def set_density(self, fraction):
+        """Draw about this fraction of the sections, spread evenly along the stands."""
+        for i, section in enumerate(self.sections):
+            if int((i + 1) * fraction) > int(i * fraction):
+                section.show()
+            else:
+                section.hide()
+
+    def set_motion(self, on):
+        """Idle bob and cheer jumps on or off (off: everyone stands still)."""
+        self.motion = on
+        self.set_shader_input('motion', 1.0 if on else 0.0)
+
+    def cheer(self):
+        """Everyone jumps. Just restarts the jump curve in the shader."""
+        if not self.motion:
+            return
+        self.set_shader_input('cheer_start', ClockObject.getGlobalClock().getFrameTime())
+        self.set_shader_input('cheer_seed', random.random())
@@ -0,0 +1,225 @@
+"""
+Leak diagnostics: live entity, sequence and node counts plus Python heap
+snapshots, taken at points you choose and compared.
+
+A Sample holds flat counters:
+
+    entities, entities.<model>    live Ursina entities (scene.entities), by model name
+    sequences                     running Sequences, which includes invoke() timers
+    nodes, ui_nodes               Panda3D nodes under the 3D scene and under camera.ui
+    gc_objects                    objects tracked by the garbage collector
+    python_kib                    traced Python heap (when tracemalloc is on)
+
+plus any counters from providers added with watch(), such as the effect
+pool or the tween timeline. Ursina is only consulted when something has
+already imported it, so headless runs (the sim soak below, a test) get the
+same API minus the scene counters.
+
+Leaks then show up as failed checks instead of a kiosk running out of
+memory hours later:
+
+    diag = Diagnostics(trace=True)
+    before = diag.sample("start")
+    ...play for a while...
+    after = diag.sample("end")
+    diag.assert_no_growth(before, after, slack={"nodes": 20}, heap_kib=256)
+    print(diag.heap_diff(before, after))     # top allocation sites that grew
+
+    python diagnostics.py soak --points 100   # headless sim soak with the same checks
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+
+class LeakError(AssertionError):
+    """A counter grew past its allowance between two samples."""
+
+
+class Sample:
+    __slots__ = ('label', 'time', 'counts', 'heap')
+
+    def __init__(self, label, counts, heap=None):
+        self.label = label
+        self.time = time.perf_counter()
+        self.counts = counts    # name -> number
+        self.heap = heap        # tracemalloc.Snapshot, or None
+
+    def __getitem__(self, name):
+        return self.counts[name]
+
+    def get(self, name, default=0):
+        return self.counts.get(name, default)
+
+    def __repr__(self):
+        return f"Sample({self.label!r}, {len(self.counts)} counters)"
+
+
+def ursina_counts():
+    """Entity, sequence and node counters, or {} if Ursina isn't loaded."""
+    if "ursina" not in sys.modules:
+        return {}
+    from ursina import application, camera, scene
+
+    counts = {}
+    entities = list(scene.entities)
+    counts["entities"] = len(entities)
+    for e in entities:
+        model = getattr(e, "model", None)
+        name = f"entities.{getattr(model, 'name', None) or 'none'}"
+        counts[name] = counts.get(name, 0) + 1
+    counts["sequences"] = len(getattr(application, "sequences", ()))
+    counts["nodes"] = scene.countNumDescendants()
+    counts["ui_nodes"] = camera.ui.countNumDescendants()
+    return counts
+
+
+class Diagnostics:
+    def __init__(self, trace=False, frames=8):
+        self.providers = {}     # prefix -> callable returning {name: number}
+        self.samples = []
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def watch(self, prefix, provider):
+        """Add provider() -> {name: number} to every sample, as prefix.name."""
+        self.providers[prefix] = provider
+
+    def sample(self, label=None, collect=True):
+        """Counters now. collect=True runs the garbage collector first so only live objects count."""
+        if collect:
+            gc.collect()
+        counts = ursina_counts()
+        for prefix, provider in self.providers.items():
+            for name, value in provider().items():
+                counts[f"{prefix}.{name}"] = value
+        counts["gc_objects"] = len(gc.get_objects())
+        heap = None
+        if self.tracing:
+            heap = tracemalloc.take_snapshot()
+            counts["python_kib"] = tracemalloc.get_traced_memory()[0] / 1024
+        s = Sample(label if label is not None else f"#{len(self.samples)}", counts, heap)
+        self.samples.append(s)
+        return s
+
+    # ----- comparing -----
+
+    @staticmethod
+    def growth(before, after):
+        """name -> change for every counter that changed, biggest growth first."""
+        names = set(before.counts) | set(after.counts)
+        changes = {n: after.get(n) - before.get(n) for n in names}
+        return dict(sorted(((n, d) for n, d in changes.items() if d), key=lambda item: -item[1]))
+
+    def assert_no_growth(self, before, after, slack=None, heap_kib=None, ignore=("gc_objects",)):
+        """
+        Raise LeakError if any counter grew by more than its slack (default 0)
+        or the traced heap grew by more than heap_kib. Counters in ignore,
+        and python_kib when heap_kib is None, are not checked.
+        """
+        slack = slack or {}
+        problems = []
+        for name, change in self.growth(before, after).items():
+            if name in ignore or name == "python_kib":
+                continue
+            if change > slack.get(name, 0):
+                problems.append(f"{name} +{change:g} (allowed {slack.get(name, 0)})")
+        if heap_kib is not None and "python_kib" in after.counts:
+            change = after["python_kib"] - before.get("python_kib")
+            if change > heap_kib:
+                problems.append(f"python heap +{change:.0f} KiB (allowed {heap_kib})")
+        if problems:
+            message = f"growth from {before.label} to {after.label}: " + "; ".join(problems)
+            if before.heap is not None and after.heap is not None:
+                message += "\n" + self.heap_diff(before, after, top=5)
+            raise LeakError(message)
+
+    def assert_at_most(self, sample, limits):
+        """Raise LeakError if any counter in limits is above its limit."""
+        over = [f"{name} {sample.get(name):g} > {limit}" for name, limit in limits.items()
+                if sample.get(name) > limit]
+        if over:
+            raise LeakError(f"{sample.label}: " + "; ".join(over))
+
+    @staticmethod
+    def heap_diff(before, after, top=10):
+        """Allocation sites whose traced size grew the most between two samples."""
+        if before.heap is None or after.heap is None:
+            return "heap diff needs tracemalloc (Diagnostics(trace=True)) for both samples"
+        lines = [f"top heap growth {before.label} -> {after.label}:"]
+        for stat in after.heap.compare_to(before.heap, "lineno")[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        return "\n".join(lines)
+
+    def report(self, sample=None):
+        """Counters of a sample (default: a new one) as aligned lines."""
+        sample = sample or self.sample()
+        width = max((len(n) for n in sample.counts), default=0)
+        return "\n".join(f"{n:<{width}}  {v:,.0f}" for n, v in sorted(sample.counts.items()))
+
+
+# Soak counters that rise and fall with where the players stand (the
+# collision world holds only the zones the ball can reach, at most one per
+# player). They are capped, not compared.
+SOAK_GAUGES = {"collision.zones": 12}     # one per player at 6v6
+
+
+def soak(points=100, seed=0, team_size=2, warmup=20):
+    """
+    Play points of a headless bot match and check the sim doesn't grow:
+    after warmup points, further points must not add objects or heap, and
+    SOAK_GAUGES must stay under their caps.
+    """
+    import random
+
+    import sim
+
+    diag = Diagnostics()
+    match = sim.Match(rng=random.Random(seed), player_bot=True, serve_delay=0.1, team_size=team_size)
+    diag.watch("collision", lambda: {"zones": len(match.collision.zones)})
+    diag.watch("planner", lambda: {"plans": len(match.planner.plans)})
+    diag.watch("match", lambda: {"listeners": len(match.listeners)})
+    for _ in range(warmup):
+        match.play_point()
+    tracemalloc.start(1)    # after the warmup: cheaper, and only new allocations are traced
+    before = diag.sample(f"after {warmup} points")
+    for _ in range(points):
+        match.play_point()
+    after = diag.sample(f"after {warmup + points} points")
+    tracemalloc.stop()
+    return diag, before, after
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Leak diagnostics.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("soak", help="play headless points and fail if anything keeps growing")
+    p.add_argument("--points", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--team-size", type=int, default=2)
+    p.add_argument("--heap-kib", type=float, default=64, help="allowed traced heap growth")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    diag, before, after = soak(args.points, args.seed, args.team_size)
+    print(f"{args.points} points in {time.perf_counter() - start:.1f} s")
+    print(diag.heap_diff(before, after, top=5))
+    try:
+        diag.assert_no_growth(before, after, heap_kib=args.heap_kib, ignore=("gc_objects", *SOAK_GAUGES))
+        diag.assert_at_most(after, SOAK_GAUGES)
+    except LeakError as e:
+        sys.exit(f"LEAK: {e}")
+    print("no growth")
+
+
+if __name__ == "__main__":
+    main()
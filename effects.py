@@ -0,0 +1,133 @@
+"""
+Pooled hit effects.
+
+bump_effect/spike_effect used to build new entities and animation
+sequences on every touch and destroy() them a moment later. The pool
+builds a fixed number of bump, shockwave and flash entities up front,
+hides them when they finish and plays their tween from a single update()
+instead of a Sequence per effect.
+"""
+from ursina import Entity, color, curve, lerp, time
+
+
+class EffectKind:
+    """Tween settings for one kind of effect. Sizes are scales, times are seconds."""
+
+    def __init__(self, model, scale, end_scale=None, scale_time=0, scale_curve=curve.linear,
+                 color=color.white, end_color=None, color_time=0, life=0.25, rotation_x=0):
+        self.model = model
+        self.scale = scale
+        self.end_scale = scale if end_scale is None else end_scale
+        self.scale_time = scale_time
+        self.scale_curve = scale_curve
+        self.color = color
+        self.end_color = end_color
+        self.color_time = color_time
+        self.life = life
+        self.rotation_x = rotation_x
+
+
+BUMP = EffectKind('sphere', .2, end_scale=1, scale_time=0.15, life=0.25)
+SHOCKWAVE = EffectKind('circle', 0.5, end_scale=4, scale_time=0.25, scale_curve=curve.out_expo,
+                       color=color.red, end_color=color.clear, color_time=0.25, life=0.3,
+                       rotation_x=90)
+FLASH = EffectKind('sphere', 0.5, color=color.rgb(255,80,80), end_color=color.clear,
+                   color_time=0.15, life=0.2)
+
+
+class EffectChannel:
+    """Fixed set of entities for one effect kind. Oldest effect is reused when full."""
+
+    def __init__(self, kind, size):
+        self.kind = kind
+        self.free = []
+        self.active = []    # [entity, age, color], oldest first
+        self.hits = 0
+        self.misses = 0
+        for _ in range(size):
+            e = Entity(model=kind.model, scale=kind.scale, rotation_x=kind.rotation_x,
+                       color=kind.color, emissive=True, enabled=False)
+            self.free.append(e)
+
+    def play(self, position, color=None):
+        if self.free:
+            e = self.free.pop()
+            self.hits += 1
+        else:
+            # Pool too small: steal the oldest one still playing
+            e = self.active.pop(0)[0]
+            self.misses += 1
+
+        c = self.kind.color if color is None else color
+        e.position = position
+        e.scale = self.kind.scale
+        e.color = c
+        e.enabled = True
+        self.active.append([e, 0.0, c])
+        return e
+
+    def update(self, dt):
+        kind = self.kind
+        still_active = []
+        for item in self.active:
+            e, age, c = item
+            age += dt
+            if age >= kind.life:
+                e.enabled = False
+                self.free.append(e)
+                continue
+            item[1] = age
+
+            if kind.scale_time:
+                t = min(age / kind.scale_time, 1)
+                e.scale = lerp(kind.scale, kind.end_scale, kind.scale_curve(t))
+            if kind.end_color is not None:
+                t = min(age / kind.color_time, 1)
+                e.color = lerp(c, kind.end_color, t)
+            still_active.append(item)
+        self.active = still_active
+
+    def clear(self):
+        for e, _, _ in self.active:
+            e.enabled = False
+            self.free.append(e)
+        self.active = []
+
+
+class EffectPool(Entity):
+    def __init__(self, bumps=8, shockwaves=4, flashes=4, **kwargs):
+        super().__init__(**kwargs)
+        self.channels = {
+            'bump': EffectChannel(BUMP, bumps),
+            'shockwave': EffectChannel(SHOCKWAVE, shockwaves),
+            'flash': EffectChannel(FLASH, flashes),
+        }
+
+    def bump(self, position, color=None):
+        return self.channels['bump'].play(position, color)
+
+    def shockwave(self, position):
+        return self.channels['shockwave'].play(position)
+
+    def flash(self, position):
+        return self.channels['flash'].play(position)
+
+    def update(self):
+        for channel in self.channels.values():
+            channel.update(time.dt)
+
+    def clear(self):
+        for channel in self.channels.values():
+            channel.clear()
+
+    def stats(self):
+        """Pool hits/misses per effect; any misses mean the pool is too small."""
+        return {
+            name: {
+                'size': len(ch.free) + len(ch.active),
+                'active': len(ch.active),
+                'hits': ch.hits,
+                'misses': ch.misses,
+            }
+            for name, ch in self.channels.items()
+        }
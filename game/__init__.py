@@ -0,0 +1,30 @@
+"""
+The Ursina front end, importable without side effects.
+
+The rules live outside this package, in the top-level sim module, which
+the headless tools use on their own. Importing game costs only its config
+and startup timer; Ursina, Panda3D, the scene and sim are pulled in by
+create_game(), so tools and tests can import it in milliseconds.
+
+    from game import GameConfig, create_game
+    game = create_game(GameConfig(crowd_rows=10))
+    game.run()
+"""
+from game.config import GameConfig, build_parser
+from game.startup import StartupTimer
+
+
+def create_game(config=None, timer=None):
+    """Open the window, build the scene and return a Game ready to run()."""
+    timer = timer or StartupTimer()
+    with timer.stage("import ursina"):
+        import ursina  # noqa: F401
+    with timer.stage("import game modules"):
+        from game.app import Game
+    return Game(config or GameConfig(), timer)
+
+
+def main(argv=None):
+    timer = StartupTimer()
+    game = create_game(GameConfig.from_args(argv), timer)
+    game.run()
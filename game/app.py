@@ -0,0 +1,517 @@
+"""
+The running game: window, scene, audio and the per-frame loop around a
+sim.Match. Everything that used to happen at import time of Volleyball.py
+happens in Game.__init__, one timed startup stage at a time.
+"""
+from ursina import *
+from ursina.shaders.colored_lights_shader import colored_lights_shader
+from ursina.shaders.unlit_shader import unlit_shader
+
+import atexit
+import json
+import random
+
+import assets
+import diagnostics
+import lod
+import sim
+from bench.metrics import FrameStats
+from bench.scenarios import SCENARIOS
+from crowd import Crowd
+from effects import EffectPool
+from mixer import Mixer
+from net import protocol
+from net.client import Client
+from profiler import Profiler
+from quality import TIER_NAMES, TIERS, QualityGovernor
+from replay import Recorder, Replay, ReplayPlayer
+from stats import RallyStats, StatsSink
+from timestep import FixedTimestep, lerp3
+from trajectory import TrajectoryPredictor
+from tween import Clip, Timeline
+
+from game.views import (Opponent, Player, SquadView, Teammate, play_bump_animation,
+                        play_spike_animation)
+
+CROWD_SPACING = 1
+COURT_X_MIN, COURT_X_MAX = -32, 32
+COURT_Z_MIN, COURT_Z_MAX = -30, 30  # approximate court boundaries
+
+PROFILER_REFRESH = 0.25   # seconds between overlay redraws
+
+
+# Quick punch shake: jump to a random offset, snap back to rest. The camera
+# sits at (0,0,0) on the player's eye entity, so rest is always the origin.
+SHAKE_CLIP = Clip("shake", {"position": [(0, "shaken", "step"), (0.2, (0, 0, 0), "step")]})
+
+# The jump itself runs in the crowd shader; the clip just starts it.
+CHEER_CLIP = Clip("cheer", {"events": [(0, "cheer")]})
+
+
+def camera_shake(timeline, intensity=.4):
+    timeline.play(SHAKE_CLIP, camera, key="shake",
+                  shaken=(random.uniform(-intensity, intensity), random.uniform(-intensity, intensity), 0))
+
+
+class Game:
+    def __init__(self, config, timer):
+        self.config = config
+        self.timer = timer
+        stage = timer.stage
+
+        with stage("window"):
+            self.app = Ursina()
+
+        with stage("match"):
+            # All game state (ball, players, touches, score, serving) lives in
+            # the render-free sim; the scene mirrors it every frame.
+            self.profiler = Profiler(enabled=config.profile, trace=config.profile)
+            self.bench = None
+            if config.bench:
+                if config.bench not in SCENARIOS:
+                    raise SystemExit(f"unknown scenario {config.bench!r}; choose from {', '.join(SCENARIOS)}")
+                self.bench = SCENARIOS[config.bench]()
+                self.match = self.bench.make_match(config.bench_seed, self.profiler, config.team_size)
+            else:
+                if config.team_size != 2 and (config.record or config.replay or config.connect):
+                    raise SystemExit("replays and network play are 2v2 only")
+                try:
+                    self.match = sim.Match(profiler=self.profiler, team_size=config.team_size,
+                                           opponent=config.opponent, dt=1.0 / config.tick_rate)
+                except ValueError as e:
+                    raise SystemExit(str(e))
+
+            # Physics runs at a fixed tick rate regardless of the display refresh rate
+            self.stepper = FixedTimestep(config.tick_rate, config.max_substeps)
+
+            self.recorder = None
+            if config.record:
+                self.recorder = Recorder(config.record, config.tick_rate)
+                self.match.listeners.append(self.recorder.on_event)
+                atexit.register(self.recorder.close)   # app.run() exits the process on quit
+
+            # Per-rally statistics, written by a background thread
+            self.stats_sink = None
+            if config.stats:
+                self.stats_sink = StatsSink(config.stats)
+                self.match.listeners.append(RallyStats(self.stats_sink).on_event)
+                atexit.register(self.stats_sink.close)
+
+            # Networked: the server owns the match, this one only mirrors it
+            self.client = None
+            self.buttons = 0
+            self.last_hello = None
+            if config.connect:
+                host, _, port = config.connect.rpartition(":")
+                self.client = Client((host or "127.0.0.1", int(port)))
+
+            self.playback = None
+            self.rally = config.rally
+            if config.replay:
+                self.playback = ReplayPlayer(Replay(config.replay))
+                if self.playback.replay.rallies:
+                    self.playback.seek_rally(min(config.rally, len(self.playback.replay.rallies) - 1))
+
+        # Every arm, camera and crowd animation is a clip on this one timeline
+        self.timeline = Timeline()
+
+        # F6 compares scene and heap counters against the previous F6
+        self.diagnostics = diagnostics.Diagnostics(trace=config.diagnostics)
+        self.diagnostics.watch("tweens", self.timeline.stats)
+        self.diagnostics_mark = None
+
+        with stage("audio"):
+            # One-shots play through small voice pools so quick touches don't
+            # cut each other off; the crowd loop streams from disk.
+            self.mixer = Mixer()
+            self.mixer.one_shot('bump', 'audio/bump.mp3', voices=6)
+            self.mixer.one_shot('spike', 'audio/spike.mp3', voices=4)
+            self.mixer.one_shot('clap', 'audio/clap.mp3', voices=2)
+            self.mixer.ambience('crowd', 'audio/crowd.mp3')
+
+        with stage("scene"):
+            with stage("environment"):
+                self.build_environment()
+            with stage("effects"):
+                # Bump, shockwave and flash entities are built once and recycled
+                self.effects = EffectPool(bumps=8, shockwaves=4, flashes=4)
+                self.diagnostics.watch("effects", lambda: {f"{name}.active": ch["active"]
+                                                           for name, ch in self.effects.stats().items()})
+            with stage("ball"):
+                self.build_ball()
+            with stage("views"):
+                match = self.match
+                self.player = Player(match.player)
+                self.views = (
+                    self.player,
+                    Teammate(match.player_teammate),
+                    Opponent(match.opponent),
+                    Teammate(match.opponent_teammate, is_player=False),
+                )
+                self.squad_view = SquadView(match.squad) if match.squad is not None else None
+            with stage("crowd"):
+                # Culled sections of merged meshes; idle bob and cheer jumps run in the shader
+                self.spectators = Crowd(config.crowd_rows, config.crowd_cols, COURT_X_MIN, COURT_X_MAX,
+                                        COURT_Z_MIN, COURT_Z_MAX, CROWD_SPACING)
+            with stage("hud"):
+                self.build_hud()
+            with stage("quality"):
+                self.setup_quality()
+
+        self.match.listeners.append(self.on_match_event)
+
+        self.bench_stats = None
+        self.bench_frame = 0
+        if self.bench:
+            self.bench_stats = FrameStats()
+            self.match.listeners.append(self.bench_stats.on_event)
+
+        self.startup_reported = not config.startup_report
+
+        # Ursina calls update()/input() on entities that have them
+        self.loop = Entity()
+        self.loop.update = self.update
+        self.loop.input = self.input
+
+    # -------------------------------------------
+    # SCENE
+    # -------------------------------------------
+
+    def build_environment(self):
+        Sky()
+
+        # Models come from the .bam cache (see assets.py). Hidden scenery is a
+        # LazyEntity: its model loads the first time it's made visible.
+        # The big models are converted into culled, LOD'd chunks (see lod.py).
+        for name in ('models/stadium', 'models/park', 'models/court'):
+            assets.prepare_with(name, lod.prepare_model, f'lod{lod.CAMERA_FOV}')
+        self.ground = assets.LazyEntity(model='cube', texture='white_cube', scale=(30,1,20), color=color.light_gray,shader=colored_lights_shader)
+        self.court = Entity(model=assets.load('models/court') or 'models/court', scale=2, shader=colored_lights_shader,position=(0,1.1,0))
+        self.court.rotation=(0,90,0)
+        self.court.visible=True
+        self.out = assets.LazyEntity(model='cube', texture='grass', scale=(80,1,80), color=color.rgb(0,255,0),shader=colored_lights_shader)
+        self.net = assets.LazyEntity(model='cube', color=color.rgb(150,150,150), scale=(0.2,8,20), position=sim.NET_POS, shader=colored_lights_shader)
+        self.park=assets.LazyEntity(model='models/park',scale=4,position=(-10,-5,50), shader=colored_lights_shader)
+        self.stadium=assets.LazyEntity(model='models/stadium', scale=.5, position=(0,-2,0), shader=colored_lights_shader)
+        self.stadium.rotation=(0,90,0)
+
+        # --preload warms the hidden scenery on the loader thread behind a splash
+        if self.config.preload:
+            splash = Text("Loading...", origin=(0,0), scale=2, background=True)
+            assets.preload(['models/stadium', 'models/park'], on_done=lambda: destroy(splash))
+
+    def build_ball(self):
+        self.ball_model=Entity(model=assets.load('models/volleyball') or 'models/volleyball',scale=.02)
+        self.ball = Entity(
+            model = 'sphere',
+            scale=1,
+            position=sim.BALL_START,
+        )
+        self.ball_model.parent=self.ball
+
+        # The path is solved in closed form and only rebuilt when the ball's
+        # flight changes; it's drawn as a single point mesh.
+        self.predictor = TrajectoryPredictor(dt=self.stepper.dt)
+        self.trajectory_length = self.config.trajectory_length
+        self.trajectory_line = Entity(
+            model=self.trajectory_mesh(),
+            color=color.yellow,
+            enabled=False
+        )
+
+    def trajectory_mesh(self):
+        return Mesh(vertices=[(0,0,0)] * self.trajectory_length, mode='point', thickness=8, static=False)
+
+    def build_hud(self):
+        self.score_text = Text("0    -    0", origin=(0,0), y=.45, scale=2)
+        self.serve_text = Text("Press E to Serve", origin=(0,0), y=0.4, scale=2)
+        self.profiler_text = Text("", position=window.top_left + Vec2(.01, -.01), origin=(-.5, .5),
+                                  scale=.75, font='VeraMono.ttf', enabled=self.profiler.enabled)
+        self.profiler_refresh = 0.0
+
+    def run(self):
+        self.app.run()
+
+    # -------------------------------------------
+    # QUALITY
+    # -------------------------------------------
+
+    def setup_quality(self):
+        """Fixed tier from --quality, or a governor that steps tiers to hold --target-fps."""
+        config = self.config
+        self.lit_entities = (self.ground, self.court, self.out, self.net, self.park, self.stadium)
+        self.stadium_shown = self.stadium.visible
+        self.governor = None
+        if config.quality != "auto":
+            tier = TIERS[TIER_NAMES.index(config.quality)]
+        elif self.bench:
+            tier = TIERS[0]     # benchmarks compare like with like
+        else:
+            self.governor = QualityGovernor(target_ms=1000 / config.target_fps)
+            tier = self.governor.tier
+        self.quality = None
+        self.apply_quality(tier)
+
+    def apply_quality(self, tier):
+        old = self.quality
+        self.quality = tier
+        self.spectators.set_density(tier.crowd_density)
+        self.spectators.set_motion(tier.crowd_motion)
+        if old is None or tier.lit != old.lit:
+            shader = colored_lights_shader if tier.lit else unlit_shader
+            for entity in self.lit_entities:
+                entity.shader = shader
+        self.stadium.visible = self.stadium_shown and tier.stadium
+        length = min(self.config.trajectory_length, tier.trajectory_length)
+        if length != self.trajectory_length:
+            self.trajectory_length = length
+            self.trajectory_line.model = self.trajectory_mesh()
+            self.predictor.version = None   # resample into the new mesh
+
+    # -------------------------------------------
+    # VISUAL EFFECTS
+    # -------------------------------------------
+
+    def bump_effect(self, position, color=None):
+        """Small bump explosion."""
+        with self.profiler.section("effects"):
+            self.effects.bump(position, color)
+            self.mixer.play('bump')
+
+    def spike_effect(self, position):
+        """Big shockwave for strong attacks."""
+        with self.profiler.section("effects"):
+            self.effects.shockwave(position)
+
+            # Bright flash on ball
+            if self.quality.flashes:
+                self.effects.flash(position)
+            self.mixer.play('spike')
+
+    def crowd_cheer(self):
+        with self.profiler.section("crowd"):
+            self.timeline.play(CHEER_CLIP, self.spectators, key="cheer")
+
+    def update_trajectory(self):
+        if self.match.serve_mode:
+            self.trajectory_line.enabled = False
+            return
+        if self.predictor.update(self.match.ball, self.match.time):
+            self.trajectory_line.model.vertices = self.predictor.trajectory.sample(self.trajectory_length)
+            self.trajectory_line.model.generate()
+        self.trajectory_line.enabled = True
+
+    # -------------------------------------------
+    # PROFILER OVERLAY
+    # -------------------------------------------
+
+    def toggle_profiler(self):
+        profiler = self.profiler
+        profiler.enabled = profiler.trace = not profiler.enabled
+        profiler.reset()
+        self.profiler_text.enabled = profiler.enabled
+
+    def update_profiler_overlay(self):
+        self.profiler_refresh -= time.dt
+        if self.profiler_refresh <= 0:
+            self.profiler_refresh = PROFILER_REFRESH
+            self.profiler_text.text = (f"{self.profiler.report()}\nquality {self.quality.name}  "
+                                       f"tweens {self.timeline.active_count}")
+
+    def report_diagnostics(self):
+        diag = self.diagnostics
+        sample = diag.sample(f"F6 #{len(diag.samples)}")
+        print(diag.report(sample))
+        mark = self.diagnostics_mark
+        if mark is not None:
+            growth = diag.growth(mark, sample)
+            print(f"changed since {mark.label}: " +
+                  (", ".join(f"{n} {d:+g}" for n, d in growth.items()) or "nothing"))
+            if diag.tracing:
+                print(diag.heap_diff(mark, sample))
+        self.diagnostics_mark = sample
+
+    # -------------------------------------------
+    # INPUT
+    # -------------------------------------------
+
+    def input(self, key):
+        if key == 'f3':
+            self.toggle_profiler()
+        elif key == 'f4' and self.profiler.enabled:
+            count = self.profiler.export_chrome_trace("trace.json")
+            print(f"wrote {count} trace events to trace.json")
+        elif key == 'f6':
+            self.report_diagnostics()
+        if self.playback:
+            self.replay_input(key)
+            return
+        if self.client:
+            # sent with the next input command
+            if key == 'left mouse down':
+                self.buttons |= protocol.BUTTON_SWING
+            if key == 'e':
+                self.buttons |= protocol.BUTTON_SERVE
+            return
+        if key == 'left mouse down':
+            self.match.player.swing(self.match)
+        if key == 'e':
+            self.match.request_serve()
+
+    def replay_input(self, key):
+        rallies = self.playback.replay.rallies
+        if key == 'space':
+            self.playback.paused = not self.playback.paused
+        elif key in ('n', 'p') and rallies:
+            self.rally = max(0, min(self.rally + (1 if key == 'n' else -1), len(rallies) - 1))
+            self.playback.seek_rally(self.rally)
+
+    @staticmethod
+    def read_controls():
+        return sim.Controls(
+            forward=held_keys['w'] - held_keys['s'],
+            right=held_keys['d'] - held_keys['a'],
+            jump=bool(held_keys['space']),
+        )
+
+    # -------------------------------------------
+    # MATCH EVENTS
+    # -------------------------------------------
+
+    def on_match_event(self, event, data):
+        if event == "bump":
+            self.bump_effect(tuple(data["position"]))
+            if data["actor"] == "player":
+                play_bump_animation(self.timeline, self.player)
+        elif event == "spike":
+            self.spike_effect(tuple(data["position"]))
+            camera_shake(self.timeline)
+            if data["actor"] == "player":
+                play_spike_animation(self.timeline, self.player)
+        elif event == "point":
+            self.mixer.play('clap')
+            self.score_text.text = f"{data['player_score']}    -    {data['ai_score']}"
+            self.crowd_cheer()
+        elif event == "reset":
+            self.serve_text.text = "Press E to Serve" if data["server"] == "player" else "AI Serving..."
+            self.serve_text.enabled = True
+        elif event == "serve":
+            self.serve_text.enabled = False
+
+    # -------------------------------------------
+    # UPDATE LOOP
+    # -------------------------------------------
+
+    def tick(self, dt, controls):
+        self.match.step(dt, controls)
+        if self.recorder:
+            self.recorder.capture(self.match)
+
+    def update_client(self):
+        """Networked frame: take snapshots, send one input per tick, present the interpolated state."""
+        client = self.client
+        match = self.match
+        client.poll(match)
+        if not client.connected:
+            now = time.time()
+            if self.last_hello is None or now - self.last_hello > 0.5:
+                client.connect()
+                self.last_hello = now
+        elif not client.driving:
+            self.stepper.advance(time.dt, lambda dt: client.send_ack())
+        else:
+            match.player.look(mouse.velocity[0], mouse.velocity[1])
+            controls = self.read_controls()
+
+            def send(dt):
+                buttons = self.buttons | (protocol.BUTTON_JUMP if controls.jump else 0)
+                self.buttons = 0
+                client.send_input(controls.forward, controls.right, buttons,
+                                  match.player.yaw, match.player.pitch, match)
+
+            self.stepper.advance(time.dt, send)
+        alpha = client.apply(match)
+        client.link.flush()
+        self.score_text.text = f"{match.player_score}    -    {match.ai_score}"
+        return 1.0 if alpha is None else alpha
+
+    def update_bench(self):
+        """Called at the top of update(): time the last frame, script this one, stop when done."""
+        config = self.config
+        self.bench_stats.frame_end()
+        if self.bench_frame == config.bench_frames:
+            summary = self.bench_stats.summary()
+            if config.bench_out:
+                with open(config.bench_out, "w") as f:
+                    json.dump(summary, f)
+            else:
+                print(json.dumps(summary, indent=2))
+            application.quit()
+            return
+        self.bench_stats.frame_begin()
+        self.bench.frame(self.match, self.bench_frame)
+        self.bench_frame += 1
+
+    def report_startup(self):
+        """Stage timings up to the first frame, plus cold (converted) and warm model loads."""
+        self.startup_reported = True
+        kind = "cold" if any(k == "cold" for _, k, _ in assets.timings) else "warm"
+        print(f"{kind} start")
+        print(self.timer.report(first_frame=self.timer.elapsed()))
+        print(assets.report())
+
+    def update(self):
+        profiler = self.profiler
+        match = self.match
+
+        # A profiler frame runs from one update() to the next, so it includes rendering
+        profiler.end_frame()
+        profiler.begin_frame()
+        if not self.startup_reported:
+            self.report_startup()
+        elif self.governor:
+            tier = self.governor.frame(time.dt)
+            if tier is not None:
+                self.apply_quality(tier)
+        if self.bench:
+            self.update_bench()
+
+        if self.client:
+            with profiler.section("net"):
+                alpha = self.update_client()
+        elif self.playback:
+            self.playback.advance(time.dt, match)
+            self.score_text.text = f"{match.player_score}    -    {match.ai_score}"
+            alpha = self.playback.alpha
+        elif self.bench:
+            # One tick per frame, so every scenario does the same work per frame
+            with profiler.section("sim"):
+                self.tick(self.stepper.dt, None)
+            alpha = 1.0
+        else:
+            match.player.look(mouse.velocity[0], mouse.velocity[1])
+            controls = self.read_controls()
+            with profiler.section("sim"):
+                self.stepper.advance(time.dt, lambda dt: self.tick(dt, controls))
+            alpha = self.stepper.alpha
+
+        # Draw between the last two ticks
+        with profiler.section("sync"):
+            for v in self.views:
+                v.sync(alpha)
+            if self.squad_view:
+                self.squad_view.sync(alpha)
+            self.ball.position = lerp3(match.ball.prev_position, match.ball.position, alpha)
+
+            # apply rotation
+            self.ball_model.rotation = lerp3(match.ball.prev_rotation, match.ball.rotation, alpha)
+
+        with profiler.section("trajectory"):
+            self.update_trajectory()
+
+        # Arm swings, camera shake and crowd cheers
+        with profiler.section("tweens"):
+            self.timeline.update(time.dt)
+
+        if profiler.enabled:
+            self.update_profiler_overlay()
@@ -0,0 +1,75 @@
+"""Game settings and the command line that fills them in."""
+
+class GameConfig:
+    """Everything create_game() needs. Keyword arguments override the defaults."""
+
+    def __init__(self, **overrides):
+        self.tick_rate = 60             # physics ticks per second, independent of display rate
+        self.max_substeps = 5
+        self.record = None              # write a replay here
+        self.replay = None              # play this replay instead of a live match
+        self.rally = 0                  # replay: rally to start from
+        self.profile = False            # profiler overlay on at start
+        self.bench = None               # scripted benchmark scenario
+        self.bench_frames = 1800
+        self.bench_seed = 0
+        self.bench_out = None
+        self.connect = None             # "host:port" of a net server to play on
+        self.team_size = 2              # players per side, 2 to 6 (6v6 rotates)
+        self.stats = None               # stream per-rally statistics to this file
+        self.preload = False            # load hidden scenery in the background behind a splash
+        self.crowd_rows = 5
+        self.crowd_cols = 35
+        self.trajectory_length = 20     # points drawn along the predicted path (at most)
+        self.quality = "auto"           # a quality.TIERS name, or auto to hold target_fps
+        self.target_fps = 60
+        self.startup_report = True      # print stage timings on the first frame
+        self.diagnostics = False        # trace the Python heap for F6 leak reports
+        self.opponent = None            # sim.Opponent to use as the AI spiker (training.watch)
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"unknown setting {name!r}")
+            setattr(self, name, value)
+
+    @classmethod
+    def from_args(cls, argv=None):
+        args = build_parser().parse_args(argv)     # a mistyped flag is an error, not the default
+        return cls(**vars(args))
+
+
+def build_parser():
+    import argparse
+
+    from quality import TIER_NAMES
+
+    # python Volleyball.py --record match.vbr      play and record (every other tick, ~5.5 MB/hour)
+    # python Volleyball.py --replay match.vbr      watch a recording (keys: space pause, n/p next/previous rally)
+    # python Volleyball.py --bench spike_heavy     scripted benchmark run (see python -m bench)
+    # python Volleyball.py --connect host:27015    play on a server (see python -m net)
+    # python Volleyball.py --team-size 6           6v6 with rotation
+    # python Volleyball.py --stats rallies.jsonl   per-rally statistics
+    # python Volleyball.py --quality low           fixed quality tier (default: auto)
+    # python Volleyball.py --diagnostics           F6 prints entity/node/heap growth since the last F6
+    parser = argparse.ArgumentParser(description="First-person 2v2 volleyball.")
+    parser.add_argument("--record", metavar="FILE")
+    parser.add_argument("--replay", metavar="FILE")
+    parser.add_argument("--rally", type=int, default=0, help="replay: rally to start from")
+    parser.add_argument("--profile", action="store_true", help="start with the profiler overlay on (F3 toggles, F4 saves a trace)")
+    parser.add_argument("--bench", metavar="SCENARIO", help="run a scripted benchmark scenario and quit (python -m bench list)")
+    parser.add_argument("--bench-frames", type=int, default=1800)
+    parser.add_argument("--bench-seed", type=int, default=0)
+    parser.add_argument("--bench-out", metavar="FILE", help="benchmark summary JSON (default: print)")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="play on a networked server instead of locally")
+    parser.add_argument("--team-size", type=int, default=2, help="players per side, 2 to 6")
+    parser.add_argument("--stats", metavar="FILE", help="stream per-rally statistics as JSONL (see stats.py)")
+    parser.add_argument("--preload", action="store_true", help="load hidden scenery in the background behind a splash")
+    parser.add_argument("--crowd-rows", type=int, default=5)
+    parser.add_argument("--crowd-cols", type=int, default=35)
+    parser.add_argument("--trajectory-length", type=int, default=20)
+    parser.add_argument("--quality", choices=("auto",) + TIER_NAMES, default="auto",
+                        help="fixed quality tier, or auto to step tiers to hold --target-fps")
+    parser.add_argument("--target-fps", type=float, default=60)
+    parser.add_argument("--no-startup-report", dest="startup_report", action="store_false")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="trace the Python heap so F6 leak reports include allocation sites (slower)")
+    return parser
@@ -0,0 +1,45 @@
+"""
+Startup stage timing, reported like `python -X importtime`.
+
+    timer = StartupTimer()
+    with timer.stage("scene"):
+        with timer.stage("models"):
+            ...
+    print(timer.report())
+"""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.stages = []    # [name, depth, cumulative seconds, child seconds], in start order
+        self.open = []      # stages currently running, innermost last
+
+    @contextmanager
+    def stage(self, name):
+        entry = [name, len(self.open), 0.0, 0.0]
+        self.stages.append(entry)
+        parent = self.open[-1] if self.open else None
+        self.open.append(entry)
+        start = self.clock()
+        try:
+            yield entry
+        finally:
+            entry[2] = self.clock() - start
+            self.open.pop()
+            if parent is not None:
+                parent[3] += entry[2]
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def report(self, first_frame=None):
+        lines = ["startup: self [ms] | cumulative | stage"]
+        for name, depth, total, children in self.stages:
+            lines.append(f"startup: {1000 * (total - children):9.1f} | {1000 * total:10.1f} | {'  ' * depth}{name}")
+        if first_frame is not None:
+            lines.append(f"startup: {'':9} | {1000 * first_frame:10.1f} | first frame")
+        return "\n".join(lines)
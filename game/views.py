@@ -0,0 +1,152 @@
+"""
+Entities that draw the sim actors, and the first-person arm animations.
+They have no update() of their own; Game calls sync() every frame.
+"""
+from ursina import *
+
+from lod import CAMERA_FOV
+from timestep import lerp3
+from tween import Clip
+
+
+# First-person arm clips, played on the Player view by the game's timeline.
+IDLE_LEFT = (-.75, -.6, -1)
+IDLE_RIGHT = (.75, -.6, 1)
+IDLE_RIGHT_ROTATION = (0, 45, -45)  # where the spike swing comes back to
+
+BUMP_CLIP = Clip("bump", {
+    # forward bump push, slight dip, return to idle
+    "arm_left.position": [(0, None), (0.08, (-0.25, -0.25, 0.4)), (0.18, (-0.25, -0.55, 0.6)),
+                          (0.30, IDLE_LEFT, "out_expo")],
+    "arm_right.position": [(0, None), (0.08, (0.25, -0.25, 0.4)), (0.18, (0.25, -0.55, 0.6)),
+                           (0.30, IDLE_RIGHT, "out_expo")],
+    # a bump can cut a spike off mid-swing: bring the wrist back with the push
+    "arm_right.rotation": [(0, None), (0.08, IDLE_RIGHT_ROTATION, "out_expo")],
+})
+
+SPIKE_CLIP = Clip("spike", {
+    # wind up, swing through, return to idle
+    "arm_right.position": [(0, None), (0.2, (0.55, 1, 0.4)), (0.3, (0.55, 1, 0.4)), (0.4, (0.25, -0.55, 0.6)),
+                           (0.6, (0.25, -0.55, 0.6)), (0.72, IDLE_RIGHT, "out_expo")],
+    "arm_right.rotation": [(0.3, None), (0.5, (0, -90, -45)), (0.6, (0, -90, -45)),
+                           (0.68, IDLE_RIGHT_ROTATION, "out_expo")],
+})
+
+
+def play_bump_animation(timeline, player):
+    timeline.play(BUMP_CLIP, player, key="arms")
+
+
+def play_spike_animation(timeline, player):
+    timeline.play(SPIKE_CLIP, player, key="arms")
+
+# -------------------------------------------
+# PLAYER VIEWS
+# -------------------------------------------
+# Entities below only draw the sim actors; they have no update() of their own.
+
+class Teammate(Entity):
+    def __init__(self, actor, is_player=True):
+        super().__init__(
+            model='cube',
+            color=color.azure if is_player else color.orange,
+            scale=(1,2,1),
+            position=tuple(actor.position),
+        )
+        self.actor = actor
+        self.hit_zone = Entity(
+            parent=self,
+            model='cube',
+            scale=(1,1,1.5),
+            position=(0,1,-1),
+            color=color.rgba(255,255,255,40),
+        )
+
+    def sync(self, alpha):
+        self.position = lerp3(self.actor.prev_position, self.actor.position, alpha)
+
+
+class Opponent(Teammate):
+    def __init__(self, actor):
+        super().__init__(actor)
+        self.color = color.red
+        self.hit_zone.color = color.rgba(255,0,0,40)
+
+
+class SquadView:
+    """
+    Render proxies for squad.Squad: one plain Entity per row, positioned
+    from the interpolated arrays. All the state and logic stay in the arrays.
+    """
+
+    def __init__(self, squad):
+        self.squad = squad
+        self.bodies = [
+            Entity(model='cube', color=color.azure if team == 0 else color.orange,
+                   scale=(1,2,1), position=tuple(p))
+            for team, p in zip(squad.team, squad.position)
+        ]
+
+    def sync(self, alpha):
+        squad = self.squad
+        positions = squad.prev_position + (squad.position - squad.prev_position) * alpha
+        for body, p in zip(self.bodies, positions.tolist()):
+            body.position = p
+
+
+class Player(Entity):
+    def __init__(self, actor):
+        super().__init__(visible=False)
+
+        self.actor = actor
+        self.position = tuple(actor.position)
+
+        # First-person camera
+        self.camera = Entity(parent=self, position=(0,actor.eye_height,0))
+        camera.parent = self.camera
+        camera.fov = CAMERA_FOV
+        camera.position = (0,0,0)
+        camera.rotation = (0,0,0)
+
+        mouse.locked = True
+
+        # Hit zone in front of camera
+        self.hit_zone = Entity(
+            parent=camera,
+            model='cube',
+            scale=(0.5,0.5,2),
+            position=(0,0,actor.zone_distance),
+            color=color.rgba(255,255,255,40),
+        )
+
+        # -----------------------------------------
+#  First-Person Volleyball Arms
+# -----------------------------------------
+
+        # in Player.__init__ after camera setup
+        # First-person arms
+        self.arm_left = Entity(
+            model='cube',
+            texture='white_cube',
+            color=color.rgb(255,229,180),
+            position=Vec3(-.75,-.6,-1),
+            rotation=Vec3(0,-45,45),
+            parent=camera.ui,
+            scale=(.3,.5,.3),
+            visible=True
+        )
+        self.arm_right = Entity(
+            model='cube',
+            texture='white_cube',
+            color=color.rgb(255,229,180),
+            position=Vec3(.75,-.6,1),
+            rotation=Vec3(45,-45,0),
+            parent=camera.ui,
+            scale=(.3,.5,.3),
+            visible=True
+        )
+
+    def sync(self, alpha):
+        self.position = lerp3(self.actor.prev_position, self.actor.position, alpha)
+        self.rotation_y = self.actor.yaw
+        camera.rotation_x = self.actor.pitch
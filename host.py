@@ -0,0 +1,271 @@
+"""
+Always-on match host: many headless matches in one process.
+
+Every hosted match is its own sim.Match with the player side on autopilot
+(bot vs AI). One asyncio tick scheduler steps them all at a fixed rate,
+yielding to the event loop every `batch` matches. That lets other tasks,
+such as the periodic report and the metrics endpoint, keep running while
+hundreds of matches tick. A finished match (first to 25, win by 2)
+records its result and restarts with the next seed.
+
+Backpressure: if stepping every match takes longer than a tick, the host
+falls behind. It catches up by at most `max_catchup` ticks in a row. Any
+lag beyond that is dropped, so the matches run slower than real time
+instead of spiralling. Each tick starts one match further along than the
+last, so the same matches are not always the late ones. Overruns, dropped ticks
+and lag are all reported.
+
+    python host.py --matches 300 --seconds 60 --report-every 5
+    python host.py --matches 200 --metrics-port 8765     # nc localhost 8765 for JSON stats
+    python host.py --matches 200 --stats rallies.jsonl   # per-rally records (see stats.py)
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+
+import sim
+from profiler import percentile
+from stats import FORMATS, RallyStats, StatsSink
+from tournament import POINTS_TO_WIN, WIN_BY, match_seed
+
+WINDOW = 600            # tick times kept per match and for the host
+AGGREGATE_SAMPLES = 60  # newest step times per match that go into the aggregate percentiles
+STUCK_RALLY = 60.0      # seconds before a rally is abandoned and replayed
+
+
+def _ms(values):
+    """mean and p99 of a window of seconds, in milliseconds."""
+    if not values:
+        return 0.0, 0.0
+    v = sorted(values)
+    return 1000 * sum(v) / len(v), 1000 * percentile(v, 99)
+
+
+class HostedMatch:
+    def __init__(self, index, master_seed, team_size=2, sink=None, touches=False):
+        self.index = index
+        self.master_seed = master_seed
+        self.team_size = team_size
+        self.sink = sink
+        self.touches = touches
+        self.generation = 0
+        self.step_times = deque(maxlen=WINDOW)
+        self.ticks = 0
+        self.points = 0
+        self.timeouts = 0
+        self.results = []           # (player score, ai score) of finished matches
+        self.start()
+
+    def start(self):
+        self.seed = match_seed(self.master_seed, self.index * 1_000_003 + self.generation)
+        self.match = sim.Match(rng=random.Random(self.seed), player_bot=True, serve_delay=0.5,
+                               team_size=self.team_size)
+        if self.sink is not None:
+            rally_stats = RallyStats(self.sink, match_id=self.index, touches=self.touches)
+            self.match.listeners.append(rally_stats.on_event)
+
+    def step(self, dt, clock):
+        match = self.match
+        start = clock()
+        match.step(dt)
+        self.step_times.append(clock() - start)
+        self.ticks += 1
+
+        if match.rally_time > STUCK_RALLY:
+            self.timeouts += 1
+            match.reset_for_serve()
+        if match.points_played != self.points:
+            self.points = match.points_played
+            p, a = match.player_score, match.ai_score
+            if max(p, a) >= POINTS_TO_WIN and abs(p - a) >= WIN_BY:
+                self.results.append((p, a))
+                self.generation += 1
+                self.points = 0
+                self.start()
+
+    def stats(self):
+        mean, p99 = _ms(self.step_times)
+        return {
+            "index": self.index,
+            "seed": self.seed,
+            "ticks": self.ticks,
+            "step_ms_mean": mean,
+            "step_ms_p99": p99,
+            "score": (self.match.player_score, self.match.ai_score),
+            "finished": len(self.results),
+            "timeouts": self.timeouts,
+        }
+
+
+class MatchHost:
+    def __init__(self, tick_rate=60, max_catchup=3, batch=32, clock=time.perf_counter, sink=None):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_catchup = max_catchup
+        self.batch = batch
+        self.clock = clock
+        self.matches = []
+        self.sink = sink            # stats.StatsSink shared by every match, or None
+        self.cursor = 0             # where the next tick starts stepping
+        self.running = False
+
+        self.ticks = 0
+        self.tick_times = deque(maxlen=WINDOW)
+        self.overruns = 0           # ticks that took longer than dt
+        self.dropped = 0            # ticks skipped to shed lag
+        self.lag = 0.0              # seconds behind schedule at the last tick
+        self.started = None
+
+    def add(self, count, master_seed=0, team_size=2, touches=False):
+        first = len(self.matches)
+        for i in range(first, first + count):
+            self.matches.append(HostedMatch(i, master_seed, team_size, self.sink, touches))
+
+    async def tick(self):
+        """Step every match once, in batches, starting after where the last tick began."""
+        start = self.clock()
+        matches = self.matches
+        n = len(matches)
+        dt, clock, batch = self.dt, self.clock, self.batch
+        for i in range(n):
+            matches[(self.cursor + i) % n].step(dt, clock)
+            if (i + 1) % batch == 0:
+                await asyncio.sleep(0)
+        if n:
+            self.cursor = (self.cursor + 1) % n
+        elapsed = self.clock() - start
+        self.tick_times.append(elapsed)
+        self.ticks += 1
+        if elapsed > dt:
+            self.overruns += 1
+
+    async def run(self, seconds=None):
+        self.running = True
+        self.started = start = self.clock()
+        next_tick = start
+        while self.running and (seconds is None or self.clock() - start < seconds):
+            now = self.clock()
+            if now < next_tick:
+                await asyncio.sleep(next_tick - now)
+                continue
+            behind = int((now - next_tick) / self.dt)
+            if behind > self.max_catchup:
+                # too far behind to catch up: drop the backlog
+                skipped = behind - self.max_catchup
+                self.dropped += skipped
+                next_tick += skipped * self.dt
+            self.lag = now - next_tick
+            await self.tick()
+            next_tick += self.dt
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def stats(self, per_match=False):
+        mean, p99 = _ms(self.tick_times)
+        steps = sorted(t for m in self.matches
+                       for t in itertools.islice(m.step_times, max(len(m.step_times) - AGGREGATE_SAMPLES, 0), None))
+        elapsed = self.clock() - self.started if self.started else 0.0
+        out = {
+            "matches": len(self.matches),
+            "ticks": self.ticks,
+            "tick_rate": self.tick_rate,
+            "achieved_tick_rate": self.ticks / elapsed if elapsed else 0.0,
+            "tick_ms_mean": mean,
+            "tick_ms_p99": p99,
+            "budget_ms": 1000 * self.dt,
+            "overruns": self.overruns,
+            "dropped_ticks": self.dropped,
+            "lag_ms": 1000 * self.lag,
+            "step_ms_mean": 1000 * sum(steps) / len(steps) if steps else 0.0,
+            "step_ms_p99": 1000 * percentile(steps, 99),
+            "finished_matches": sum(len(m.results) for m in self.matches),
+            "timeouts": sum(m.timeouts for m in self.matches),
+        }
+        if self.sink is not None:
+            out["stats_sink"] = self.sink.stats()
+        if per_match:
+            out["per_match"] = [m.stats() for m in self.matches]
+        return out
+
+
+def format_stats(stats):
+    return (f"{stats['matches']} matches  {stats['achieved_tick_rate']:5.1f}/{stats['tick_rate']} ticks/s  "
+            f"tick {stats['tick_ms_mean']:.2f} ms mean {stats['tick_ms_p99']:.2f} ms p99 "
+            f"(budget {stats['budget_ms']:.2f})  step {stats['step_ms_mean'] * 1000:.0f} us mean  "
+            f"overruns {stats['overruns']}  dropped {stats['dropped_ticks']}  lag {stats['lag_ms']:.1f} ms  "
+            f"finished {stats['finished_matches']}"
+            + (f"  stats dropped {stats['stats_sink']['dropped']}" if "stats_sink" in stats else ""))
+
+
+async def report(host, every):
+    while True:
+        await asyncio.sleep(every)
+        print(format_stats(host.stats()), flush=True)
+
+
+async def serve_metrics(host, port):
+    """Write the full stats (per match too) as JSON to anyone who connects."""
+    async def handle(reader, writer):
+        writer.write(json.dumps(host.stats(per_match=True)).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+async def amain(host, args):
+    tasks = [asyncio.create_task(report(host, args.report_every))]
+    server = await serve_metrics(host, args.metrics_port) if args.metrics_port else None
+    try:
+        await host.run(args.seconds)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if server is not None:
+            server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many headless bot-vs-AI matches in one process.")
+    parser.add_argument("--matches", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=None, help="default: run until interrupted")
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--max-catchup", type=int, default=3, help="ticks to catch up before dropping lag")
+    parser.add_argument("--batch", type=int, default=32, help="matches stepped between event-loop yields")
+    parser.add_argument("--team-size", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--report-every", type=float, default=5.0)
+    parser.add_argument("--metrics-port", type=int, help="serve JSON stats on this port")
+    parser.add_argument("--stats", metavar="FILE", help="stream per-rally records here")
+    parser.add_argument("--stats-format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--stats-touches", action="store_true", help="also write a record per touch")
+    parser.add_argument("--stats-max-mb", type=float, help="rotate stats files at this size")
+    parser.add_argument("--json", action="store_true", help="print final stats (per match too) as JSON")
+    args = parser.parse_args(argv)
+
+    sink = None
+    if args.stats:
+        max_bytes = int(args.stats_max_mb * 2**20) if args.stats_max_mb else None
+        sink = StatsSink(args.stats, args.stats_format, max_bytes=max_bytes)
+    host = MatchHost(args.tick_rate, args.max_catchup, args.batch, sink=sink)
+    host.add(args.matches, args.seed, args.team_size, args.stats_touches)
+    try:
+        asyncio.run(amain(host, args))
+    except KeyboardInterrupt:
+        pass
+    if sink is not None:
+        sink.close()
+    if args.json:
+        print(json.dumps(host.stats(per_match=True), indent=2))
+    else:
+        print(format_stats(host.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Level of detail and culling for the big static models.
+
+Panda3D already skips any node whose bounding volume is outside the view
+frustum, but only per node: a stadium that is one GeomNode, or a crowd that
+is one mesh, is always drawn whole. prepare_model() splits a model into one
+node per Geom, gives each chunk an LODNode with vertex-clustered copies, and
+arranges the chunks in a bounding volume hierarchy (build_bvh) so the cull
+pass drops whole branches behind the camera at once.
+
+LOD switch distances come from screen-space size: a chunk of radius r
+covers a fraction f of the screen height at distance r / (f * tan(fov/2)).
+
+All of this runs once when a model is converted; assets.py caches the
+result as .bam.
+"""
+import math
+
+from panda3d.core import (Geom, GeomNode, GeomTriangles, GeomVertexReader, LODNode,
+                          NodePath, PandaNode, Point3)
+
+CAMERA_FOV = 95     # the first-person camera's vertical fov
+
+# (cluster cell as a fraction of the chunk radius, smallest screen fraction
+# this level is used for). Level 0 is the original mesh.
+LOD_LEVELS = ((0.0, 0.30), (0.05, 0.08), (0.15, 0.0))
+
+
+def lod_distance(radius, screen_fraction, fov=CAMERA_FOV):
+    """Distance at which something of this radius covers screen_fraction of the screen height."""
+    if screen_fraction <= 0:
+        return float("inf")
+    return radius / (screen_fraction * math.tan(math.radians(fov) / 2))
+
+
+def decimate(geom, cell):
+    """
+    Copy of geom simplified by vertex clustering: vertices are snapped to a
+    grid of the given cell size, each cell keeps its first vertex, and
+    triangles that collapse are dropped. The vertex data is shared with the
+    original; only the index buffer shrinks.
+    """
+    geom = geom.makeCopy()
+    if cell <= 0:
+        return geom
+    vdata = geom.getVertexData()
+    reader = GeomVertexReader(vdata, "vertex")
+    inv = 1.0 / cell
+    cells = {}
+    rep = []
+    for row in range(vdata.getNumRows()):
+        p = reader.getData3()
+        key = (math.floor(p.x * inv), math.floor(p.y * inv), math.floor(p.z * inv))
+        rep.append(cells.setdefault(key, row))
+
+    tris = GeomTriangles(Geom.UHStatic)
+    seen = set()
+    for i in range(geom.getNumPrimitives()):
+        prim = geom.getPrimitive(i).decompose()
+        if not isinstance(prim, GeomTriangles):
+            continue
+        for t in range(prim.getNumPrimitives()):
+            s = prim.getPrimitiveStart(t)
+            a, b, c = rep[prim.getVertex(s)], rep[prim.getVertex(s + 1)], rep[prim.getVertex(s + 2)]
+            if a == b or b == c or a == c:
+                continue
+            key = frozenset((a, b, c))
+            if key in seen:
+                continue
+            seen.add(key)
+            tris.addVertices(a, b, c)
+    geom.clearPrimitives()
+    geom.addPrimitive(tris)
+    return geom
+
+
+def make_lod(geom, state, name="chunk", levels=LOD_LEVELS, fov=CAMERA_FOV):
+    """LODNode holding one decimated copy of geom per level."""
+    bounds = geom.getBounds()   # a BoundingSphere
+    empty = bounds.isEmpty()
+    radius = 1e-3 if empty else max(bounds.getRadius(), 1e-3)
+    lod = LODNode(name)
+    lod_np = NodePath(lod)
+    lod.setCenter(Point3(0, 0, 0) if empty else bounds.getCenter())
+    near = 0.0
+    for cell_fraction, screen_fraction in levels:
+        far = lod_distance(radius, screen_fraction, fov)
+        level = GeomNode(f"{name}-lod{lod.getNumSwitches()}")
+        level.addGeom(decimate(geom, cell_fraction * radius), state)
+        lod.addSwitch(far, near)
+        lod_np.attachNewNode(level)
+        near = far
+    return lod_np
+
+
+def split_geoms(model):
+    """One NodePath per Geom, transforms baked in, so each can be culled on its own."""
+    model = model.copyTo(NodePath("split"))
+    model.flattenLight()    # bake transforms into vertices
+    chunks = []
+    for gnp in model.findAllMatches("**/+GeomNode"):
+        node = gnp.node()
+        state = gnp.getNetState()
+        for i in range(node.getNumGeoms()):
+            chunks.append((node.getGeom(i), state.compose(node.getGeomState(i))))
+    return chunks
+
+
+def build_bvh(leaves, leaf_size=2, name="bvh"):
+    """
+    Parent NodePaths under a binary tree of plain nodes, split at the median
+    of the longest axis of their centres. Panda3D keeps each node's bounds
+    as the union of its children, so the tree is the BVH.
+    """
+    root = NodePath(PandaNode(name))
+    centers = []
+    for leaf in leaves:
+        b = leaf.getBounds()
+        centers.append(tuple(b.getCenter()) if not b.isEmpty() else (0.0, 0.0, 0.0))
+
+    def split(items, parent):
+        if len(items) <= leaf_size:
+            for leaf, _ in items:
+                leaf.reparentTo(parent)
+            return
+        spans = [max(c[axis] for _, c in items) - min(c[axis] for _, c in items) for axis in range(3)]
+        axis = spans.index(max(spans))
+        items = sorted(items, key=lambda item: item[1][axis])
+        mid = len(items) // 2
+        for half in (items[:mid], items[mid:]):
+            split(half, parent.attachNewNode(PandaNode(name)))
+
+    split(list(zip(leaves, centers)), root)
+    return root
+
+
+def prepare_model(model, levels=LOD_LEVELS, fov=CAMERA_FOV):
+    """Chunked, LOD'd, BVH-ordered copy of a loaded model."""
+    leaves = [make_lod(geom, state, f"chunk{i}", levels, fov)
+              for i, (geom, state) in enumerate(split_geoms(model))]
+    return build_bvh(leaves, name=model.getName() or "model")
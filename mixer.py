@@ -0,0 +1,89 @@
+"""
+Sound playback: pooled one-shots and streamed ambience.
+
+A single Audio per sound cuts itself off when two touches come close
+together. Each one-shot here gets a small pool of voices instead; when all
+of them are busy the one that started first is stopped and reused. Voices
+are loaded in sample mode, and Panda3D's OpenAL manager keeps one decoded
+buffer per file and shares it between them, so a sound is decoded once
+however many voices it has.
+
+The crowd loop is 2.4 MB of mp3 that would decode to far more PCM, so it's
+opened in stream mode: Panda3D decodes it from disk a chunk at a time.
+"""
+import builtins
+
+from panda3d.core import AudioManager, AudioSound, Filename
+
+
+class VoicePool:
+    """Fixed number of voices for one sound; the oldest voice is stolen when all are busy."""
+
+    def __init__(self, manager, path, voices=4, volume=1.0):
+        filename = Filename.fromOsSpecific(path)
+        self.voices = [manager.getSound(filename, False, AudioManager.SM_sample) for _ in range(voices)]
+        self.started = [0] * voices     # play counter value when each voice last started
+        self.volume = volume
+        self.plays = 0
+        self.steals = 0
+
+    def play(self, volume=None, rate=1.0):
+        self.plays += 1
+        voices = self.voices
+        for i, voice in enumerate(voices):
+            if voice.status() != AudioSound.PLAYING:
+                break
+        else:
+            i = min(range(len(voices)), key=self.started.__getitem__)
+            voices[i].stop()
+            self.steals += 1
+        voice = voices[i]
+        voice.setVolume(self.volume if volume is None else volume)
+        voice.setPlayRate(rate)
+        voice.play()
+        self.started[i] = self.plays
+        return voice
+
+    def stop(self):
+        for voice in self.voices:
+            voice.stop()
+
+    @property
+    def active(self):
+        return sum(v.status() == AudioSound.PLAYING for v in self.voices)
+
+
+class Mixer:
+    """Named one-shot pools plus streamed loops, on ShowBase's sfx manager."""
+
+    def __init__(self, manager=None):
+        self.manager = manager or builtins.base.sfxManagerList[0]
+        self.pools = {}
+        self.loops = {}
+
+    def one_shot(self, name, path, voices=4, volume=1.0):
+        self.pools[name] = VoicePool(self.manager, path, voices, volume)
+        return self.pools[name]
+
+    def play(self, name, volume=None, rate=1.0):
+        return self.pools[name].play(volume, rate)
+
+    def ambience(self, name, path, volume=1.0, play=True):
+        """Looping sound streamed from disk."""
+        sound = self.manager.getSound(Filename.fromOsSpecific(path), False, AudioManager.SM_stream)
+        sound.setLoop(True)
+        sound.setVolume(volume)
+        if play:
+            sound.play()
+        self.loops[name] = sound
+        return sound
+
+    def stop_all(self):
+        for pool in self.pools.values():
+            pool.stop()
+        for sound in self.loops.values():
+            sound.stop()
+
+    def stats(self):
+        return {name: {"voices": len(p.voices), "active": p.active, "plays": p.plays, "steals": p.steals}
+                for name, p in self.pools.items()}
@@ -0,0 +1,17 @@
+"""
+Networked 2v2: an authoritative server and thin clients over UDP.
+
+The server runs the only sim.Match and sends quantised snapshots, each a
+delta against the last one the client acknowledged. Clients send input
+commands, draw everyone else interpolated between snapshots, and predict
+their own player (movement and touches) so it responds without waiting a
+round trip. Link adds latency, jitter and loss on localhost.
+
+    python -m net server --port 27015
+    python -m net client 127.0.0.1:27015
+    python -m net local --seconds 20 --latency 0.05 --jitter 0.02 --loss 0.05 --spectators 2
+    python Volleyball.py --connect 127.0.0.1:27015
+"""
+from net.client import Client
+from net.link import Link
+from net.server import Server
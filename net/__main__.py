@@ -0,0 +1,171 @@
+"""
+    python -m net server [--port N] [--seconds S] [--latency L --jitter J --loss P]
+    python -m net client HOST:PORT [--seconds S] [--latency L --jitter J --loss P]
+    python -m net local [--seconds S] [--spectators N] [--latency L --jitter J --loss P]
+
+client runs a headless bot in place of a human. local runs a server, a bot
+client and some spectators in one process and reports bandwidth per client
+and the server's tick cost.
+"""
+import argparse
+import sys
+import time
+
+import sim
+
+from net import protocol
+from net.client import Client
+from net.server import Server
+
+HELLO_RETRY = 0.5   # seconds between HELLOs until WELCOME arrives
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def bot_command(match):
+    """(forward, right, buttons, yaw, pitch) for a client-side bot: chase the ball, swing when close."""
+    player = match.player
+    ball = match.ball
+    if match.serve_mode:
+        buttons = protocol.BUTTON_SERVE if match.server == "player" else 0
+        return 0, 0, buttons, 90.0, 0.0
+    forward = right = 0
+    buttons = 0
+    if ball.x < 0:
+        # facing +x: forward is +x, right is -z
+        target_x = ball.x + ball.velocity.x * 0.1 - player.zone_distance
+        target_z = ball.z + ball.velocity.z * 0.1
+        forward = 1 if target_x > player.x + 0.2 else -1 if target_x < player.x - 0.2 else 0
+        right = -1 if target_z > player.z + 0.2 else 1 if target_z < player.z - 0.2 else 0
+        if player.touching(ball):
+            buttons |= protocol.BUTTON_SWING
+    return forward, right, buttons, 90.0, 0.0
+
+
+class Bot:
+    """A Client plus the local match it presents, driven by bot_command."""
+
+    def __init__(self, address, **link):
+        self.client = Client(address, **link)
+        self.match = sim.Match()
+        self.events = {}
+        self.match.listeners.append(self.on_event)
+        self.last_hello = None
+
+    def on_event(self, event, data):
+        self.events[event] = self.events.get(event, 0) + 1
+
+    def update(self, now):
+        client = self.client
+        client.poll(self.match)
+        if not client.connected:
+            if self.last_hello is None or now - self.last_hello > HELLO_RETRY:
+                client.connect()
+                self.last_hello = now
+        elif client.driving:
+            forward, right, buttons, yaw, pitch = bot_command(self.match)
+            client.send_input(forward, right, buttons, yaw, pitch, self.match)
+        else:
+            client.send_ack()
+        client.apply(self.match)
+        client.link.flush()
+
+
+def run_clients(bots, seconds, tick_rate=60, server=None):
+    """Tick server (if any) and bots in real time for seconds."""
+    dt = 1.0 / tick_rate
+    start = next_tick = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if server is not None:
+            server.poll()
+        now = time.perf_counter()
+        if now >= next_tick:
+            if server is not None:
+                server.step()
+            for bot in bots:
+                bot.update(now)
+            next_tick += dt
+            if now - next_tick > 0.25:
+                next_tick = now
+        else:
+            time.sleep(min(next_tick - now, 0.002))
+        if server is not None:
+            server.link.flush()
+
+
+def print_report(server, bots):
+    stats = server.stats()
+    print(f"server: {stats['tick']} ticks, {stats['tick_ms_mean']:.3f} ms mean, "
+          f"{stats['tick_ms_p99']:.3f} ms p99 per tick")
+    for c in stats["clients"]:
+        print(f"  {c['address']:<21} {c['slot']:<9} {c['bytes_per_second'] / 1024:6.2f} KiB/s  "
+              f"{c['bytes_per_snapshot']:5.1f} B/snapshot  {c['full_snapshots']}/{c['snapshots']} full")
+    for bot in bots:
+        s = bot.client.stats()
+        role = "player" if bot.client.driving else "spectator"
+        print(f"  client {role:<9} {s['snapshots']} snapshots, {s['undecodable']} undecodable, "
+              f"{s['bytes_sent'] / 1024:.1f} KiB sent, events {bot.events}")
+    print(f"score {server.match.player_score} - {server.match.ai_score}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m net", description="Networked 2v2 volleyball.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("server", "client", "local"):
+        p = sub.add_parser(name)
+        p.add_argument("--seconds", type=float, default=None if name == "server" else 10.0)
+        p.add_argument("--latency", type=float, default=0.0, help="one-way delay added to sends (s)")
+        p.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this (s)")
+        p.add_argument("--loss", type=float, default=0.0, help="fraction of sends dropped")
+        p.add_argument("--seed", type=int)
+        if name == "client":
+            p.add_argument("address", metavar="HOST:PORT")
+        else:
+            p.add_argument("--port", type=int, default=27015 if name == "server" else 0)
+            p.add_argument("--tick-rate", type=int, default=60)
+            p.add_argument("--snapshot-interval", type=int, default=3, help="ticks between snapshots")
+        if name == "local":
+            p.add_argument("--spectators", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    link = dict(latency=args.latency, jitter=args.jitter, loss=args.loss, seed=args.seed)
+
+    if args.command == "client":
+        bot = Bot(parse_address(args.address), **link)
+        try:
+            run_clients([bot], args.seconds)
+        finally:
+            bot.client.close()
+        print(bot.client.stats(), bot.events)
+        return 0
+
+    bind = ("0.0.0.0" if args.command == "server" else "127.0.0.1", args.port)
+    server = Server(bind, args.tick_rate, args.snapshot_interval, **link)
+    if args.command == "server":
+        print(f"listening on {server.address[0]}:{server.address[1]}")
+        try:
+            server.run(args.seconds)
+        except KeyboardInterrupt:
+            pass
+        print_report(server, [])
+        server.close()
+        return 0
+
+    seeds = [None if args.seed is None else args.seed + i + 1 for i in range(1 + args.spectators)]
+    bots = [Bot(server.address, latency=args.latency, jitter=args.jitter, loss=args.loss, seed=s)
+            for s in seeds]
+    try:
+        run_clients(bots, args.seconds, args.tick_rate, server)
+        print_report(server, bots)
+    finally:
+        for bot in bots:
+            bot.client.close()
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
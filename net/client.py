@@ -0,0 +1,261 @@
+"""
+Client side: send inputs, receive snapshots, and present a sim.Match the
+renderer can draw as usual.
+
+Remote state is drawn `interp_delay` seconds in the past, interpolated
+between the two snapshots around that time. The local player is
+predicted instead: its movement runs locally on every input, and when a
+snapshot says which input the server reached, the player is reset to the
+server's position and the inputs since are replayed. A swing that looks
+like a touch plays its bump/spike straight away; the server's copy of
+that event is then skipped so it isn't shown twice.
+"""
+import time
+from collections import deque
+
+import sim
+from replay import ANGLE_SCALE, POS_SCALE, SPIN_SCALE, VEL_SCALE
+
+from net import protocol
+from net.link import Link
+
+KEEP_SNAPSHOTS = 64
+REDUNDANT_INPUTS = 4      # each input packet repeats this many recent commands
+PREDICTION_WINDOW = 0.5   # seconds a predicted touch suppresses the server's echo
+
+
+def _vec(q, scale):
+    return sim.Vec3(q[0] / scale, q[1] / scale, q[2] / scale)
+
+
+class Client:
+    def __init__(self, server, interp_delay=0.1, latency=0.0, jitter=0.0, loss=0.0, seed=None,
+                 clock=time.perf_counter):
+        self.server = server
+        self.link = Link(("0.0.0.0", 0), latency, jitter, loss, seed, clock)
+        self.clock = clock
+        self.interp_delay = interp_delay
+
+        self.slot = None
+        self.tick_rate = 60
+        self.snapshot_interval = 3
+        self.states = {}            # tick -> state, for delta decoding
+        self.timeline = deque()     # (tick, state), ascending, for interpolation
+        self.latest_tick = 0
+        self.server_tick_time = None    # local clock time that server tick 0 maps to
+
+        self.seq = 0
+        self.pending = deque()      # commands not yet acknowledged: (seq, fwd, right, buttons, yaw, pitch)
+        self.acked_seq = 0
+        self.seen_events = set()
+        self.predicted = []         # (time, kind) touches we already showed
+
+        self.snapshots_received = 0
+        self.snapshots_dropped = 0
+
+    @property
+    def connected(self):
+        return self.slot is not None
+
+    @property
+    def driving(self):
+        return self.slot == protocol.SLOT_PLAYER
+
+    def connect(self):
+        """Send HELLO; repeat until poll() sees the WELCOME."""
+        self.link.send(protocol.header(protocol.HELLO) + protocol.HELLO_BODY.pack(protocol.PROTOCOL_VERSION),
+                       self.server)
+
+    def close(self):
+        self.link.send(protocol.header(protocol.BYE), self.server)
+        self.link.flush()
+        self.link.close()
+
+    # ----- receive -----
+
+    def poll(self, match=None):
+        """Handle waiting packets. Server events are emitted through match if given."""
+        for data, addr in self.link.receive():
+            kind = protocol.read_header(data)
+            if kind == protocol.WELCOME:
+                self.slot, self.tick_rate, self.snapshot_interval = protocol.WELCOME_BODY.unpack_from(
+                    data, protocol.HEADER.size)
+            elif kind == protocol.SNAPSHOT:
+                self.receive_snapshot(data, match)
+
+    def receive_snapshot(self, data, match):
+        decoded = protocol.unpack_snapshot(data, self.states)
+        if decoded is None:
+            self.snapshots_dropped += 1     # its baseline is gone; the next full one will do
+            return
+        tick, state, input_seq, events = decoded
+        self.snapshots_received += 1
+        if tick <= self.latest_tick:
+            return      # late duplicate or reordered
+        self.states[tick] = state
+        while len(self.states) > KEEP_SNAPSHOTS:
+            del self.states[min(self.states)]
+        self.latest_tick = tick
+        self.timeline.append((tick, state))
+        while len(self.timeline) > KEEP_SNAPSHOTS:
+            self.timeline.popleft()
+
+        # Map server ticks to our clock, drifting toward the newest arrival
+        arrival = self.clock() - tick / self.tick_rate
+        if self.server_tick_time is None or arrival < self.server_tick_time:
+            self.server_tick_time = arrival
+        else:
+            self.server_tick_time += 0.01 * (arrival - self.server_tick_time)
+
+        if input_seq > self.acked_seq:
+            self.acked_seq = input_seq
+            while self.pending and self.pending[0][0] <= input_seq:
+                self.pending.popleft()
+        if match is not None:
+            self.emit_events(events, match)
+            if self.driving:
+                self.reconcile(state, match)
+
+    def emit_events(self, events, match):
+        now = self.clock()
+        self.predicted = [(t, k) for t, k in self.predicted if now - t < PREDICTION_WINDOW]
+        for event in events:
+            if event in self.seen_events:
+                continue
+            self.seen_events.add(event)
+            tick, kind, actor = event
+            if kind in ("bump", "spike"):
+                name = protocol.ACTORS[actor]
+                if name == "player" and self.driving:
+                    hit = next((p for p in self.predicted if p[1] == kind), None)
+                    if hit is not None:
+                        self.predicted.remove(hit)
+                        continue
+                position = self.states[self.latest_tick][0]
+                match.emit(kind, actor=name, position=_vec(position, POS_SCALE))
+            elif kind == "serve":
+                match.emit(kind, server=protocol.SIDES[actor])
+            else:
+                state = self.states[self.latest_tick]
+                match.emit(kind, to=protocol.SIDES[actor], player_score=state[8][0],
+                           ai_score=state[8][1], rally_time=0.0)
+                match.emit("reset", server=protocol.SIDES[actor])    # the winner serves next
+        if len(self.seen_events) > 1024:
+            oldest = self.latest_tick - 10 * self.tick_rate
+            self.seen_events = {e for e in self.seen_events if e[0] > oldest}
+
+    # ----- send -----
+
+    def send_ack(self):
+        """Acknowledge snapshots without sending commands (spectators)."""
+        self.link.send(protocol.pack_input(self.latest_tick, ()), self.server)
+
+    def send_input(self, forward=0, right=0, buttons=0, yaw=0.0, pitch=0.0, match=None):
+        """Queue one tick of input, send it with the last few, and predict it locally."""
+        self.seq += 1
+        command = (self.seq, int(forward), int(right), buttons, yaw, pitch)
+        self.pending.append(command)
+        recent = list(self.pending)[-REDUNDANT_INPUTS:]
+        self.link.send(protocol.pack_input(self.latest_tick, recent), self.server)
+        if match is not None and self.driving:
+            self.predict(command, match)
+
+    def predict(self, command, match):
+        seq, forward, right, buttons, yaw, pitch = command
+        player = match.player
+        player.yaw, player.pitch = yaw, pitch
+        player.prev_position = player.position.copy()
+        player.update(match, 1.0 / self.tick_rate, sim.Controls(forward, right, bool(buttons & protocol.BUTTON_JUMP)))
+        if (buttons & protocol.BUTTON_SWING and not match.serve_mode and player.hit_cooldown <= 0
+                and player.touching(match.ball)):
+            kind = "bump" if player.on_ground else "spike"
+            player.hit_cooldown = player.cooldown_duration
+            self.predicted.append((self.clock(), kind))
+            match.emit(kind, actor="player", position=match.ball.position.copy())
+
+    def reconcile(self, state, match):
+        """Snap the local player to the server and replay inputs it hasn't seen."""
+        player = match.player
+        yaw, pitch, cooldown = player.yaw, player.pitch, player.hit_cooldown
+        player.position = _vec(state[3], POS_SCALE)
+        player.vy = state[7][2] / VEL_SCALE
+        player.on_ground = player.position.y <= 1 and player.vy == 0
+        dt = 1.0 / self.tick_rate
+        for seq, forward, right, buttons, player.yaw, player.pitch in self.pending:
+            player.update(match, dt, sim.Controls(forward, right, bool(buttons & protocol.BUTTON_JUMP)))
+        # replaying isn't new time passing: keep the live view and hit cooldown
+        player.yaw, player.pitch, player.hit_cooldown = yaw, pitch, cooldown
+
+    # ----- present -----
+
+    def render_tick(self):
+        """Fractional server tick being shown now."""
+        if self.server_tick_time is None:
+            return 0.0
+        return (self.clock() - self.server_tick_time - self.interp_delay) * self.tick_rate
+
+    def apply(self, match):
+        """
+        Write the interpolated remote state into match (positions into
+        prev_* and current, alpha into the return value) for the renderer.
+        Returns alpha, or None before the first snapshot.
+        """
+        timeline = self.timeline
+        if not timeline:
+            return None
+        t = self.render_tick()
+        older = newer = timeline[-1]
+        for entry in reversed(timeline):
+            if entry[0] <= t:
+                older = entry
+                break
+            newer = entry
+        span = newer[0] - older[0]
+        alpha = min(max((t - older[0]) / span, 0.0), 1.0) if span else 1.0
+
+        self._write(older[1], match, prev=True)
+        self._write(newer[1], match)
+        ball = match.ball
+        ball.prev_rotation = ball.rotation
+        ball.rotation = ball.rotation + ball.angular_velocity * (1.0 / self.tick_rate)
+        return alpha
+
+    def _write(self, state, match, prev=False):
+        ball = match.ball
+        actors = match.actors
+        for i, actor in enumerate(actors):
+            if actor is match.player and self.driving:
+                continue    # predicted locally
+            if prev:
+                actor.prev_position = _vec(state[3 + i], POS_SCALE)
+            else:
+                actor.position = _vec(state[3 + i], POS_SCALE)
+        if prev:
+            ball.prev_position = _vec(state[0], POS_SCALE)
+            return
+        ball.position = _vec(state[0], POS_SCALE)
+        vx, vy, vz = state[1]
+        ball.sync_velocity(vx / VEL_SCALE, vy / VEL_SCALE, vz / VEL_SCALE)    # rebuilds the trajectory only on hits
+        ball.angular_velocity = _vec(state[2], SPIN_SCALE)
+        if not self.driving:
+            match.player.yaw = state[7][0] / ANGLE_SCALE + 180
+            match.player.pitch = state[7][1] / ANGLE_SCALE
+        match.player_score, match.ai_score = state[8]
+        t = state[9]
+        match.touches = {"player": t[0], "ai": t[1]}
+        match.team_touches = {"player": t[2], "ai": t[3]}
+        flags = state[10][0]
+        match.serve_mode = bool(flags & protocol.FLAG_SERVE_MODE)
+        match.server = "ai" if flags & protocol.FLAG_AI_SERVES else "player"
+        match.last_hitter = "ai" if flags & protocol.FLAG_AI_LAST_HIT else "player"
+
+    def stats(self):
+        return {
+            "slot": self.slot,
+            "latest_tick": self.latest_tick,
+            "snapshots": self.snapshots_received,
+            "undecodable": self.snapshots_dropped,
+            "bytes_received": self.link.bytes_received,
+            "bytes_sent": self.link.bytes_sent,
+            "pending_inputs": len(self.pending),
+        }
@@ -0,0 +1,85 @@
+"""
+Non-blocking UDP endpoint with simulated network conditions.
+
+Outgoing packets can be delayed (latency plus random jitter) and dropped
+at random, so a server and clients on localhost behave like they're on a
+bad connection. Each side only delays what it sends; set both sides for
+a round trip.
+"""
+import heapq
+import random
+import socket
+import time
+
+MAX_PACKET = 1400
+
+
+class Link:
+    def __init__(self, bind=("127.0.0.1", 0), latency=0.0, jitter=0.0, loss=0.0, seed=None,
+                 clock=time.perf_counter):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind(bind)
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.queue = []         # (due, order, data, addr)
+        self.order = 0
+
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.sent_to = {}       # addr -> bytes
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def send(self, data, addr):
+        self.bytes_sent += len(data)
+        self.packets_sent += 1
+        self.sent_to[addr] = self.sent_to.get(addr, 0) + len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.packets_dropped += 1
+            return
+        if self.latency or self.jitter:
+            due = self.clock() + self.latency + self.rng.uniform(0, self.jitter)
+            heapq.heappush(self.queue, (due, self.order, data, addr))
+            self.order += 1
+        else:
+            self._send(data, addr)
+
+    def _send(self, data, addr):
+        try:
+            self.sock.sendto(data, addr)
+        except OSError:
+            pass    # e.g. the peer went away; UDP doesn't care
+
+    def flush(self):
+        """Send delayed packets that are due."""
+        now = self.clock()
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            _, _, data, addr = heapq.heappop(queue)
+            self._send(data, addr)
+
+    def receive(self):
+        """Every packet waiting right now, as (data, addr)."""
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(MAX_PACKET)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue    # Windows reports ICMP port unreachable this way
+            self.bytes_received += len(data)
+            packets.append((data, addr))
+        return packets
+
+    def close(self):
+        self.sock.close()
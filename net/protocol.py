@@ -0,0 +1,171 @@
+"""
+Wire format. Every packet starts with HEADER (magic, type); all integers are
+little endian and every layout is fixed, so packing is one struct call per
+part.
+
+A snapshot is the match state quantised into FIELDS (the same fixed point
+as replay.py). It is sent as a delta against the last snapshot the client
+acknowledged: a bitmask says which fields follow, and unchanged fields
+cost nothing. With no usable baseline the mask is all ones (a full
+snapshot).
+"""
+import struct
+
+from replay import ANGLE_SCALE, POS_SCALE, SPIN_SCALE, VEL_SCALE, _q
+
+MAGIC = 0x5642   # "VB"
+PROTOCOL_VERSION = 1
+
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(5)
+
+HEADER = struct.Struct("<HB")
+HELLO_BODY = struct.Struct("<H")                 # protocol version
+WELCOME_BODY = struct.Struct("<BHH")             # slot, tick rate, snapshot interval (ticks)
+INPUT_BODY = struct.Struct("<IB")                # acked snapshot tick, command count
+COMMAND = struct.Struct("<IbbBhh")               # seq, forward, right, buttons, yaw, pitch
+SNAPSHOT_BODY = struct.Struct("<IIIH")           # tick, baseline tick (0 = full), last input seq, field mask
+EVENT_COUNT = struct.Struct("<B")
+EVENT = struct.Struct("<IBB")                    # tick, kind, actor
+
+SLOT_PLAYER = 0
+SLOT_SPECTATOR = 255
+
+BUTTON_JUMP = 1
+BUTTON_SWING = 2
+BUTTON_SERVE = 4
+
+ACTORS = ("player", "player_teammate", "opponent", "opponent_teammate")
+EVENT_KINDS = ("serve", "bump", "spike", "point")
+SIDES = ("player", "ai")
+
+# name, layout. Order is the bit order of the field mask.
+FIELDS = (
+    ("ball", struct.Struct("<3h")),
+    ("ball_velocity", struct.Struct("<3h")),
+    ("ball_spin", struct.Struct("<3h")),
+    ("player", struct.Struct("<3h")),
+    ("player_teammate", struct.Struct("<3h")),
+    ("opponent", struct.Struct("<3h")),
+    ("opponent_teammate", struct.Struct("<3h")),
+    ("view", struct.Struct("<3h")),              # player yaw, pitch, vertical speed
+    ("scores", struct.Struct("<2H")),
+    ("touches", struct.Struct("<4B")),
+    ("flags", struct.Struct("<B")),              # serve mode, ai serves, ai hit last
+)
+FULL_MASK = (1 << len(FIELDS)) - 1
+
+FLAG_SERVE_MODE = 1
+FLAG_AI_SERVES = 2
+FLAG_AI_LAST_HIT = 4
+
+
+def header(kind):
+    return HEADER.pack(MAGIC, kind)
+
+
+def read_header(data):
+    """Packet type, or None if this isn't one of ours."""
+    if len(data) < HEADER.size:
+        return None
+    magic, kind = HEADER.unpack_from(data)
+    return kind if magic == MAGIC else None
+
+
+# ----- commands -----
+
+def pack_input(ack_tick, commands):
+    """commands: (seq, forward, right, buttons, yaw, pitch), oldest first."""
+    parts = [header(INPUT), INPUT_BODY.pack(ack_tick, len(commands))]
+    for seq, forward, right, buttons, yaw, pitch in commands:
+        parts.append(COMMAND.pack(seq, forward, right, buttons,
+                                  _q(yaw % 360 - 180, ANGLE_SCALE), _q(pitch, ANGLE_SCALE)))
+    return b"".join(parts)
+
+
+def unpack_input(data):
+    ack_tick, count = INPUT_BODY.unpack_from(data, HEADER.size)
+    offset = HEADER.size + INPUT_BODY.size
+    commands = []
+    for i in range(count):
+        seq, forward, right, buttons, yaw, pitch = COMMAND.unpack_from(data, offset + i * COMMAND.size)
+        commands.append((seq, forward, right, buttons, yaw / ANGLE_SCALE + 180, pitch / ANGLE_SCALE))
+    return ack_tick, commands
+
+
+# ----- state -----
+
+def quantize(match):
+    """The match as a tuple of per-field tuples of ints (what goes on the wire)."""
+    ball = match.ball
+    p, v, s = ball.position, ball.velocity, ball.angular_velocity
+    player = match.player
+    actors = tuple((_q(a.position.x, POS_SCALE), _q(a.position.y, POS_SCALE), _q(a.position.z, POS_SCALE))
+                   for a in match.actors)
+    flags = ((FLAG_SERVE_MODE if match.serve_mode else 0)
+             | (FLAG_AI_SERVES if match.server == "ai" else 0)
+             | (FLAG_AI_LAST_HIT if match.last_hitter == "ai" else 0))
+    return (
+        (_q(p.x, POS_SCALE), _q(p.y, POS_SCALE), _q(p.z, POS_SCALE)),
+        (_q(v.x, VEL_SCALE), _q(v.y, VEL_SCALE), _q(v.z, VEL_SCALE)),
+        (_q(s.x, SPIN_SCALE), _q(s.y, SPIN_SCALE), _q(s.z, SPIN_SCALE)),
+        *actors,
+        (_q(player.yaw % 360 - 180, ANGLE_SCALE), _q(player.pitch, ANGLE_SCALE), _q(player.vy, VEL_SCALE)),
+        (min(match.player_score, 65535), min(match.ai_score, 65535)),
+        (min(match.touches["player"], 255), min(match.touches["ai"], 255),
+         min(match.team_touches["player"], 255), min(match.team_touches["ai"], 255)),
+        (flags,),
+    )
+
+
+def pack_snapshot(tick, state, baseline_tick=0, baseline=None, input_seq=0, events=()):
+    """Snapshot of state, as a delta against baseline if one is given."""
+    mask = 0
+    parts = []
+    for i, (value, (_, layout)) in enumerate(zip(state, FIELDS)):
+        if baseline is None or value != baseline[i]:
+            mask |= 1 << i
+            parts.append(layout.pack(*value))
+    if baseline is None:
+        baseline_tick = 0
+    events = events[-255:]
+    return b"".join([header(SNAPSHOT), SNAPSHOT_BODY.pack(tick, baseline_tick, input_seq, mask),
+                     *parts, EVENT_COUNT.pack(len(events)),
+                     *(EVENT.pack(t, EVENT_KINDS.index(kind), actor) for t, kind, actor in events)])
+
+
+def unpack_snapshot(data, baselines):
+    """
+    (tick, state, input_seq, events), or None if the baseline it was
+    delta'd against is no longer in baselines ({tick: state}).
+    """
+    tick, baseline_tick, input_seq, mask = SNAPSHOT_BODY.unpack_from(data, HEADER.size)
+    if baseline_tick:
+        baseline = baselines.get(baseline_tick)
+        if baseline is None:
+            return None
+        state = list(baseline)
+    else:
+        state = [None] * len(FIELDS)
+    offset = HEADER.size + SNAPSHOT_BODY.size
+    for i, (_, layout) in enumerate(FIELDS):
+        if mask & (1 << i):
+            state[i] = layout.unpack_from(data, offset)
+            offset += layout.size
+    (count,) = EVENT_COUNT.unpack_from(data, offset)
+    offset += EVENT_COUNT.size
+    events = []
+    for i in range(count):
+        t, kind, actor = EVENT.unpack_from(data, offset + i * EVENT.size)
+        events.append((t, EVENT_KINDS[kind], actor))
+    return tick, tuple(state), input_seq, events
+
+
+def event_code(event, data):
+    """(kind, actor byte) for a match event worth sending, else None."""
+    if event in ("bump", "spike"):
+        return event, ACTORS.index(data["actor"])
+    if event == "serve":
+        return event, SIDES.index(data["server"])
+    if event == "point":
+        return event, SIDES.index(data["to"])
+    return None
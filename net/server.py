@@ -0,0 +1,224 @@
+"""
+Authoritative match server.
+
+The server owns the only real sim.Match. The first client to join drives
+the first-person Player; anyone after that spectates, and the
+longest-connected spectator takes over when the driver leaves or times
+out. AI plays the other three actors, exactly as in the local game.
+HELLOs from another PROTOCOL_VERSION are ignored.
+
+Each tick the server applies the driving client's next input command (a
+tick with none queued moves the player as if no key were held), steps
+the match, and every `snapshot_interval` ticks sends each client a
+snapshot delta'd against the last snapshot that client acknowledged.
+"""
+import random
+import time
+from collections import deque
+
+import sim
+from profiler import percentile
+
+from net import protocol
+from net.link import Link
+
+HISTORY = 64            # snapshots kept per client as possible baselines
+MAX_QUEUED_INPUTS = 8   # drop the oldest commands beyond this (client is running ahead)
+TIMEOUT = 5.0           # seconds without a packet before a client is dropped
+
+
+class ClientState:
+    def __init__(self, addr, slot, now):
+        self.addr = addr
+        self.slot = slot
+        self.last_heard = now
+        self.inputs = deque()       # commands waiting to be applied, oldest first
+        self.last_seq = 0           # newest command seq received
+        self.applied_seq = 0        # newest command seq applied
+        self.acked_tick = 0         # newest snapshot the client has
+        self.history = {}           # tick -> state sent
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+        self.joined = now
+
+
+class Server:
+    def __init__(self, bind=("127.0.0.1", 0), tick_rate=60, snapshot_interval=3,
+                 latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.link = Link(bind, latency, jitter, loss, seed)
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.snapshot_interval = snapshot_interval
+        self.match = sim.Match(rng=random.Random(seed), dt=self.dt)
+        self.tick = 0
+        self.clients = {}           # addr -> ClientState
+        self.events = deque(maxlen=64)   # (tick, kind, actor byte), recent
+        self.tick_times = deque(maxlen=600)
+        self.rejected_hellos = 0
+        self.match.listeners.append(self.on_event)
+
+    @property
+    def address(self):
+        return self.link.address
+
+    def on_event(self, event, data):
+        code = protocol.event_code(event, data)
+        if code is not None:
+            self.events.append((self.tick, *code))
+
+    # ----- receive -----
+
+    def poll(self):
+        now = time.perf_counter()
+        for data, addr in self.link.receive():
+            kind = protocol.read_header(data)
+            if kind is None:
+                continue
+            client = self.clients.get(addr)
+            if kind == protocol.HELLO:
+                if not self.compatible(data):
+                    self.rejected_hellos += 1     # would decode our snapshots as garbage
+                    continue
+                client = client or self.join(addr, now)
+                self.welcome(client)
+            elif client is None:
+                continue
+            elif kind == protocol.INPUT:
+                self.receive_input(client, data)
+            elif kind == protocol.BYE:
+                self.leave(addr)
+                continue
+            if client is not None:
+                client.last_heard = now
+        for addr, client in list(self.clients.items()):
+            if now - client.last_heard > TIMEOUT:
+                self.leave(addr)
+
+    @staticmethod
+    def compatible(hello):
+        if len(hello) < protocol.HEADER.size + protocol.HELLO_BODY.size:
+            return False
+        version, = protocol.HELLO_BODY.unpack_from(hello, protocol.HEADER.size)
+        return version == protocol.PROTOCOL_VERSION
+
+    def welcome(self, client):
+        self.link.send(protocol.header(protocol.WELCOME)
+                       + protocol.WELCOME_BODY.pack(client.slot, self.tick_rate, self.snapshot_interval),
+                       client.addr)
+
+    def join(self, addr, now):
+        driving = any(c.slot == protocol.SLOT_PLAYER for c in self.clients.values())
+        slot = protocol.SLOT_SPECTATOR if driving else protocol.SLOT_PLAYER
+        client = self.clients[addr] = ClientState(addr, slot, now)
+        return client
+
+    def leave(self, addr):
+        """Drop a client. If it was driving, the longest-connected spectator takes over."""
+        client = self.clients.pop(addr)
+        if client.slot != protocol.SLOT_PLAYER or not self.clients:
+            return
+        successor = min(self.clients.values(), key=lambda c: c.joined)
+        successor.slot = protocol.SLOT_PLAYER
+        self.welcome(successor)     # the new slot reaches the client like the first one did
+
+    def receive_input(self, client, data):
+        ack_tick, commands = protocol.unpack_input(data)
+        if ack_tick > client.acked_tick and ack_tick in client.history:
+            client.acked_tick = ack_tick
+            # anything older than the ack can't be a baseline any more
+            for tick in [t for t in client.history if t < ack_tick]:
+                del client.history[tick]
+        if client.slot != protocol.SLOT_PLAYER:
+            return
+        # commands are sent redundantly; keep only the new ones
+        for command in commands:
+            if command[0] > client.last_seq:
+                client.inputs.append(command)
+                client.last_seq = command[0]
+        while len(client.inputs) > MAX_QUEUED_INPUTS:
+            client.applied_seq = client.inputs.popleft()[0]
+
+    # ----- simulate -----
+
+    def driver(self):
+        for client in self.clients.values():
+            if client.slot == protocol.SLOT_PLAYER:
+                return client
+        return None
+
+    def step(self):
+        """One server tick: apply input, step, maybe send snapshots."""
+        start = time.perf_counter()
+        self.tick += 1
+        match = self.match
+        controls = None
+        client = self.driver()
+        if client is not None and client.inputs:
+            seq, forward, right, buttons, yaw, pitch = client.inputs.popleft()
+            client.applied_seq = seq
+            player = match.player
+            player.yaw, player.pitch = yaw, pitch
+            controls = sim.Controls(forward, right, bool(buttons & protocol.BUTTON_JUMP))
+            if buttons & protocol.BUTTON_SERVE:
+                match.request_serve()
+            if buttons & protocol.BUTTON_SWING:
+                player.swing(match)
+        match.step(self.dt, controls)
+
+        if self.tick % self.snapshot_interval == 0:
+            self.send_snapshots()
+        self.tick_times.append(time.perf_counter() - start)
+
+    def send_snapshots(self):
+        state = protocol.quantize(self.match)
+        for client in self.clients.values():
+            baseline = client.history.get(client.acked_tick)
+            events = [e for e in self.events if e[0] > client.acked_tick]
+            packet = protocol.pack_snapshot(self.tick, state, client.acked_tick, baseline,
+                                            client.applied_seq, events)
+            client.history[self.tick] = state
+            if len(client.history) > HISTORY:
+                del client.history[min(client.history)]
+            client.snapshots += 1
+            client.full_snapshots += baseline is None
+            client.bytes_sent += len(packet)
+            self.link.send(packet, client.addr)
+
+    def run(self, seconds=None):
+        """Tick in real time until seconds pass (or forever)."""
+        next_tick = start = time.perf_counter()
+        while seconds is None or time.perf_counter() - start < seconds:
+            self.poll()
+            now = time.perf_counter()
+            if now >= next_tick:
+                self.step()
+                next_tick += self.dt
+                if now - next_tick > 0.25:
+                    next_tick = now     # fell far behind; don't spiral
+            else:
+                time.sleep(min(next_tick - now, 0.002))
+            self.link.flush()
+
+    # ----- reporting -----
+
+    def stats(self):
+        now = time.perf_counter()
+        times = sorted(self.tick_times)
+        return {
+            "tick": self.tick,
+            "tick_ms_mean": 1000 * sum(times) / len(times) if times else 0.0,
+            "tick_ms_p99": 1000 * percentile(times, 99),
+            "rejected_hellos": self.rejected_hellos,
+            "clients": [{
+                "address": f"{c.addr[0]}:{c.addr[1]}",
+                "slot": "player" if c.slot == protocol.SLOT_PLAYER else "spectator",
+                "bytes_per_second": c.bytes_sent / max(now - c.joined, 1e-9),
+                "bytes_per_snapshot": c.bytes_sent / c.snapshots if c.snapshots else 0.0,
+                "full_snapshots": c.full_snapshots,
+                "snapshots": c.snapshots,
+            } for c in self.clients.values()],
+        }
+
+    def close(self):
+        self.link.close()
@@ -0,0 +1,154 @@
+"""
+AI movement planner.
+
+Instead of every AI player chasing the ball's current position each tick,
+the planner solves the ball's path (trajectory.Trajectory) once whenever
+the flight changes, works out where and when each AI player on the side
+the ball is heading for could first reach it, and hands the ball to
+whoever gets there first. That player runs to the intercept point; the
+others drift back to cover. Between trajectory changes a tick is just a
+version check plus one steering step per player.
+
+Squad players (team_size > 2) are planned in the same pass: their
+intercepts are found for all rows at once (Squad.intercepts) and their
+targets go to Squad.set_targets for Squad.update to steer toward.
+
+Steering is an arrive behaviour with limited acceleration, so players
+speed up, slow into their mark and stop instead of flicking back and
+forth across it.
+"""
+import math
+
+from trajectory import TrajectoryPredictor
+
+SAMPLE_STEP = 1 / 30    # seconds between the ball positions tested as intercepts
+ARRIVE_TIME = 0.25      # slow down when closer than this many seconds of running
+ACCELERATION = 30.0     # units/s^2
+REACTION = 0.1          # seconds of slack required before an intercept counts as reachable
+SETTLE = 0.05           # closer than this and (nearly) stopped counts as arrived
+
+
+class Plan:
+    __slots__ = ('target', 'contact_time', 'chasing', 'arrived')
+
+    def __init__(self, target, contact_time=None, chasing=False):
+        self.target = target                # (x, z) to run to
+        self.contact_time = contact_time    # match time we expect to touch the ball
+        self.chasing = chasing
+        self.arrived = False
+
+
+class Planner:
+    """Plans for the AI-driven actors of a match. Call update() once per tick, then steer() per actor."""
+
+    def __init__(self, match, dt=1 / 60):
+        self.predictor = TrajectoryPredictor(dt, bounces=0)
+        self.serving = None
+        self.plans = {}
+        self.velocity = {}      # actor name -> [vx, vz]
+        self.replans = 0
+        teams = {"player": [], "ai": []}
+        for actor in match.actors:
+            if actor.planned:
+                teams[actor.team].append(actor)
+                self.velocity[actor.name] = [0.0, 0.0]
+        self.teams = teams
+
+    def update(self, match):
+        """Replan if the ball's flight (or the serve state) changed since last tick."""
+        if match.serve_mode:
+            if not self.serving:
+                self.serving = True
+                self.predictor.version = None
+                for actors in self.teams.values():
+                    for actor in actors:
+                        self.plans[actor.name] = Plan(actor.home(match))
+                        self.velocity[actor.name] = [0.0, 0.0]
+                if match.squad is not None:
+                    match.squad.set_targets(match.squad.homes())
+            return
+        self.serving = False
+        if self.predictor.update(match.ball, match.time):
+            self.replan(match)
+
+    def replan(self, match):
+        self.replans += 1
+        trajectory = self.predictor.trajectory
+        now = match.time
+        landing = trajectory.landing_time if trajectory.landing_time is not None else trajectory.end
+        steps = max(int((landing - now) / SAMPLE_STEP), 0)
+        samples = [(t, *trajectory.position_at(t)) for t in (now + i * SAMPLE_STEP for i in range(steps + 1))]
+        squad = match.squad
+        if squad is not None:
+            squad_times, squad_stands = squad.intercepts(samples, now)
+            targets = squad.homes()
+        for t, (team, actors) in enumerate(self.teams.items()):
+            # Whoever can reach the ball first plays it
+            best = None
+            for actor in actors:
+                if actor.freeze or actor.has_hit:
+                    continue
+                hit = self.intercept(actor, samples, now)
+                if hit is not None and (best is None or hit[0] < best[1][0]):
+                    best = (actor, hit)
+            if squad is not None:
+                row, time = squad.earliest(t, squad_times)
+                if row is not None and (best is None or time < best[1][0]):
+                    targets[row] = squad_stands[row]
+                    best = None
+            for actor in actors:
+                if best is not None and actor is best[0]:
+                    contact_time, target = best[1]
+                    self.plans[actor.name] = Plan(target, contact_time, chasing=True)
+                else:
+                    self.plans[actor.name] = Plan(actor.home(match))
+        if squad is not None:
+            squad.set_targets(targets)
+
+    @staticmethod
+    def intercept(actor, samples, now):
+        """
+        (time, (x, z)) of the earliest ball position on our side that actor
+        can reach in time. samples are (t, x, y, z) along the ball's path.
+        """
+        dx, dz, low, high = actor.contact_band()
+        speed = actor.speed
+        px, pz = actor.position.x, actor.position.z
+        for t, x, y, z in samples:
+            if not low <= y <= high or not actor.own_side(x):
+                continue
+            sx, sz = x - dx, z - dz
+            if not actor.own_side(sx):
+                continue
+            if math.hypot(sx - px, sz - pz) / speed + REACTION <= t - now:
+                return t, (sx, sz)
+        return None
+
+    def steer(self, actor, dt):
+        """Move actor one tick toward its planned spot."""
+        plan = self.plans.get(actor.name)
+        if plan is None or plan.arrived:
+            return
+        v = self.velocity[actor.name]
+        p = actor.position
+        ex, ez = plan.target[0] - p.x, plan.target[1] - p.z
+        dist = math.hypot(ex, ez)
+        if dist < SETTLE and abs(v[0]) + abs(v[1]) < ACCELERATION * dt:
+            # stop dead so the position (and the cached hit zone) stays put
+            v[0] = v[1] = 0.0
+            plan.arrived = True
+            return
+        speed = min(actor.speed, dist / ARRIVE_TIME)
+        if dist > 1e-6:
+            want_x, want_z = ex / dist * speed, ez / dist * speed
+        else:
+            want_x = want_z = 0.0
+        ax, az = want_x - v[0], want_z - v[1]
+        change = math.hypot(ax, az)
+        limit = ACCELERATION * dt
+        if change > limit:
+            ax, az = ax * limit / change, az * limit / change
+        v[0] += ax
+        v[1] += az
+        p.x += v[0] * dt
+        p.z += v[1] * dt
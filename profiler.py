@@ -0,0 +1,158 @@
+"""
+Per-stage frame profiler.
+
+Code marks stages with `with profiler.section("name"):`. While the
+profiler is disabled section() hands back one shared do-nothing context,
+so instrumented code costs a method call per stage and nothing else.
+
+When enabled it keeps a rolling window of per-frame stage totals for the
+overlay (mean and p50/p95/p99) and, if tracing, a bounded list of events
+that export_chrome_trace() writes in Chrome trace-event JSON (open it in
+chrome://tracing or ui.perfetto.dev).
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSection()
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.profiler.clock()
+        return self
+
+    def __exit__(self, *exc):
+        p = self.profiler
+        end = p.clock()
+        p._add(self.name, self.start, end)
+        return False
+
+
+def percentile(sorted_values, q):
+    """q in 0..100 of an already sorted list (nearest rank)."""
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=300, trace=False, trace_limit=200_000,
+                 clock=time.perf_counter):
+        self.enabled = enabled
+        self.trace = trace
+        self.clock = clock
+        self.window = window
+        self.origin = clock()
+
+        self.sections = {}                  # name -> _Section, reused
+        self.current = {}                   # name -> seconds in the frame being timed
+        self.history = {}                   # name -> deque of per-frame seconds
+        self.frames = deque(maxlen=window)  # whole-frame seconds
+        self.events = deque(maxlen=trace_limit)
+        self.frame_start = None
+        self.frame_count = 0
+        self.pid = os.getpid()
+
+    # ----- instrumentation -----
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL
+        s = self.sections.get(name)
+        if s is None:
+            s = self.sections[name] = _Section(self, name)
+        return s
+
+    def _add(self, name, start, end):
+        self.current[name] = self.current.get(name, 0.0) + (end - start)
+        if self.trace:
+            self.events.append((name, start, end, threading.get_ident()))
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = self.clock()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        end = self.clock()
+        self.frames.append(end - self.frame_start)
+        if self.trace:
+            self.events.append(("frame", self.frame_start, end, threading.get_ident()))
+        for name in self.history.keys() | self.current.keys():
+            h = self.history.get(name)
+            if h is None:
+                h = self.history[name] = deque(maxlen=self.window)
+            h.append(self.current.get(name, 0.0))
+        self.current.clear()
+        self.frame_start = None
+        self.frame_count += 1
+
+    def reset(self):
+        self.current.clear()
+        self.history.clear()
+        self.frames.clear()
+        self.events.clear()
+        self.frame_start = None
+        self.frame_count = 0
+
+    # ----- reporting -----
+
+    def stats(self):
+        """{name: {mean, p50, p95, p99}} in milliseconds, with "frame" for whole frames."""
+        out = {}
+        for name, values in [("frame", self.frames)] + sorted(self.history.items()):
+            if not values:
+                continue
+            v = sorted(values)
+            out[name] = {
+                "mean": 1000 * sum(v) / len(v),
+                "p50": 1000 * percentile(v, 50),
+                "p95": 1000 * percentile(v, 95),
+                "p99": 1000 * percentile(v, 99),
+            }
+        return out
+
+    def report(self):
+        """Fixed-width text table for an overlay or a terminal."""
+        lines = [f"{'stage':<28}{'mean':>7}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, s in self.stats().items():
+            lines.append(f"{name:<28}{s['mean']:7.2f}{s['p50']:7.2f}{s['p95']:7.2f}{s['p99']:7.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Trace events as a Chrome trace-event dict."""
+        origin = self.origin
+        events = [{
+            "name": name, "cat": "frame" if name == "frame" else "stage", "ph": "X",
+            "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6,
+            "pid": self.pid, "tid": tid,
+        } for name, start, end, tid in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return len(self.events)
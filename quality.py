@@ -0,0 +1,115 @@
+"""
+Adaptive quality: hold a target frame time by stepping through tiers.
+
+QualityGovernor watches a rolling window of frame times. When the window's
+p95 stays over the target it drops one tier; when it sits well under it
+climbs one back. Hysteresis keeps it from flapping:
+
+  - the thresholds are apart (drop over 110% of the target, climb under
+    75%), and the window is refilled after every change before the next
+    decision, so one change is judged on frames rendered with it;
+  - climbing also waits `climb_after` seconds, and that wait doubles every
+    time a climb has to be undone within `backoff_window` seconds (reset
+    after a climb sticks).
+
+Every change is logged, with the window it was decided on, so the
+thresholds can be tuned per venue.
+
+This module is render-free; game.app applies a Tier to the scene.
+
+    governor = QualityGovernor(target_ms=1000 / 60)
+    ...every frame: tier = governor.frame(time.dt)   # a Tier when it changed, else None
+"""
+import time
+from collections import deque
+
+from profiler import percentile
+
+
+class Tier:
+    __slots__ = ('name', 'crowd_density', 'crowd_motion', 'trajectory_length', 'flashes', 'lit', 'stadium')
+
+    def __init__(self, name, crowd_density, crowd_motion, trajectory_length, flashes, lit, stadium):
+        self.name = name
+        self.crowd_density = crowd_density          # fraction of crowd sections drawn
+        self.crowd_motion = crowd_motion            # idle bob and cheer jumps
+        self.trajectory_length = trajectory_length  # points in the predicted-path line
+        self.flashes = flashes                      # flash on spikes
+        self.lit = lit                              # colored_lights_shader, else unlit
+        self.stadium = stadium                      # stadium mesh allowed
+
+    def __repr__(self):
+        return f"Tier({self.name!r})"
+
+
+# Best first. Each step gives up the cheapest-looking thing left.
+TIERS = (
+    Tier("high",    1.0,  True,  20, True,  True,  True),
+    Tier("medium",  1.0,  True,  12, False, True,  True),
+    Tier("low",     0.5,  False, 8,  False, True,  True),
+    Tier("lower",   0.5,  False, 8,  False, False, True),
+    Tier("minimum", 0.25, False, 4,  False, False, False),
+)
+TIER_NAMES = tuple(tier.name for tier in TIERS)
+
+
+class QualityGovernor:
+    def __init__(self, target_ms=1000 / 60, tiers=TIERS, start=0, window=90,
+                 drop_above=1.1, climb_below=0.75, climb_after=5.0, backoff_window=10.0,
+                 max_climb_after=120.0, log=print, clock=time.perf_counter):
+        self.target = target_ms / 1000
+        self.tiers = tiers
+        self.index = start
+        self.frames = deque(maxlen=window)
+        self.drop_above = drop_above
+        self.climb_below = climb_below
+        self.base_climb_after = self.climb_after = climb_after
+        self.backoff_window = backoff_window
+        self.max_climb_after = max_climb_after
+        self.log = log
+        self.clock = clock
+
+        self.changed_at = clock()
+        self.last_climb = None      # time of the last climb, until it sticks or is undone
+        self.changes = []           # (time, from name, to name, p95 ms)
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def frame(self, dt):
+        """Add one frame time (seconds). Returns the new Tier if it changed, else None."""
+        frames = self.frames
+        frames.append(dt)
+        if len(frames) < frames.maxlen:
+            return None
+        now = self.clock()
+        p95 = percentile(sorted(frames), 95)
+
+        if self.last_climb is not None and now - self.last_climb > self.backoff_window:
+            # the last climb held: climbing is cheap to try again
+            self.last_climb = None
+            self.climb_after = self.base_climb_after
+
+        if p95 > self.target * self.drop_above and self.index < len(self.tiers) - 1:
+            if self.last_climb is not None:
+                # undoing a climb: wait longer before the next one
+                self.climb_after = min(self.climb_after * 2, self.max_climb_after)
+                self.last_climb = None
+            return self._change(self.index + 1, now, p95, "over")
+        if (p95 < self.target * self.climb_below and self.index > 0
+                and now - self.changed_at >= self.climb_after):
+            self.last_climb = now
+            return self._change(self.index - 1, now, p95, "under")
+        return None
+
+    def _change(self, index, now, p95, reason):
+        old = self.tier
+        self.index = index
+        self.changed_at = now
+        self.frames.clear()
+        self.changes.append((now, old.name, self.tier.name, 1000 * p95))
+        if self.log is not None:
+            self.log(f"quality: {old.name} -> {self.tier.name} (p95 {1000 * p95:.1f} ms {reason} "
+                     f"{1000 * self.target:.1f} ms target; next climb after {self.climb_after:.0f}s)")
+        return self.tier
@@ -0,0 +1,370 @@
+"""
+Compact binary match recording and memory-mapped playback.
+
+A recording is a fixed header, then one fixed-width record per tick, then
+an index of rallies and touch/point events written when the recorder is
+closed. Positions and velocities are stored as int16 fixed point, which is
+plenty for a 80 x 80 court, so a record is 53 bytes. The default every=2
+keeps every other tick (playback interpolates between records): about
+5.5 MB per hour at 60 ticks a second, 11 MB with every=1.
+
+The header is written when recording starts and completed by close(), so
+a recording cut short by a crash still opens: its whole records are
+played back and the rally index is rebuilt from the scores.
+
+Playback memory-maps the file, so opening is instant whatever the length,
+and any rally is one index lookup away.
+
+    recorder = Recorder("match.vbr", tick_rate=60)
+    match.listeners.append(recorder.on_event)
+    ...after every tick: recorder.capture(match)
+    recorder.close()
+
+    replay = Replay("match.vbr")
+    player = ReplayPlayer(replay)
+    player.seek_rally(3)
+    player.advance(dt, match)   # writes the recorded state into a sim.Match for the renderer
+"""
+import bisect
+import mmap
+import os
+import struct
+
+from sim import Vec3
+
+MAGIC = b"VBREPLAY"
+VERSION = 1
+
+POS_SCALE = 100     # 1 cm
+VEL_SCALE = 100
+SPIN_SCALE = 10     # 0.1 deg/s
+ANGLE_SCALE = 100
+
+# magic, version, record size, tick rate, every, records, index offset, index count, event offset, event count
+HEADER = struct.Struct("<8sHHfHQQIQI")
+HEADER_SIZE = 64
+
+# tick, ball pos, ball vel, ball spin, 4 x (x, z), player y, yaw, pitch,
+# touches (player, ai, team player, team ai), scores, flags
+RECORD = struct.Struct("<I3h3h3h8hhhh4B2HB")
+
+# first record, last record, winner, player score, ai score, touches
+RALLY = struct.Struct("<IIbHHB")
+# record, kind, actor (point: winning side, serve: serving side)
+EVENT = struct.Struct("<IBB")
+
+ACTORS = ("player", "player_teammate", "opponent", "opponent_teammate")
+EVENT_KINDS = ("serve", "bump", "spike", "point")
+SIDES = {None: -1, "player": 0, "ai": 1}
+
+FLAG_SERVE_MODE = 1
+FLAG_AI_SERVES = 2
+FLAG_AI_LAST_HIT = 4
+
+
+def _q(v, scale):
+    return max(-32768, min(32767, int(round(v * scale))))
+
+
+class Recorder:
+    """Writes one record per `every` ticks into a buffered file."""
+
+    def __init__(self, path, tick_rate=60, every=2, buffer_records=4096):
+        self.path = path
+        self.tick_rate = tick_rate
+        self.every = every
+        self.file = open(path, "wb")
+        self._write_header(0, 0, 0, 0, 0)     # no index yet: readers scan the records
+        self.file.flush()
+
+        self.buffer = bytearray(RECORD.size * buffer_records)
+        self.buffered = 0
+        self.capacity = buffer_records
+        self.records = 0
+        self.ticks = 0
+
+        self.rallies = []           # (first, last, winner, player_score, ai_score, touches)
+        self.events = []            # (record, kind, actor)
+        self.rally_start = 0
+        self.rally_touches = 0
+
+    # ----- capture -----
+
+    def on_event(self, event, data):
+        """Match listener: keeps the rally/event index."""
+        if event not in EVENT_KINDS:
+            return
+        if "actor" in data:
+            actor = ACTORS.index(data["actor"])
+        elif event == "point":
+            actor = SIDES[data["to"]] & 0xFF
+        else:
+            actor = SIDES[data["server"]]
+        self.events.append((self.records, EVENT_KINDS.index(event), actor))
+        if event == "serve":
+            self.rally_start = self.records
+            self.rally_touches = 0
+        elif event in ("bump", "spike"):
+            self.rally_touches += 1
+        elif event == "point":
+            self.rallies.append((self.rally_start, self.records, SIDES[data["to"]],
+                                 data["player_score"], data["ai_score"], min(self.rally_touches, 255)))
+
+    def capture(self, match):
+        self.ticks += 1
+        if self.ticks % self.every:
+            return
+
+        ball = match.ball
+        p, v, s = ball.position, ball.velocity, ball.angular_velocity
+        actors = match.actors
+        player = match.player
+        flags = ((FLAG_SERVE_MODE if match.serve_mode else 0)
+                 | (FLAG_AI_SERVES if match.server == "ai" else 0)
+                 | (FLAG_AI_LAST_HIT if match.last_hitter == "ai" else 0))
+        xz = []
+        for a in actors:
+            xz.append(_q(a.position.x, POS_SCALE))
+            xz.append(_q(a.position.z, POS_SCALE))
+
+        RECORD.pack_into(
+            self.buffer, self.buffered * RECORD.size,
+            self.ticks,
+            _q(p.x, POS_SCALE), _q(p.y, POS_SCALE), _q(p.z, POS_SCALE),
+            _q(v.x, VEL_SCALE), _q(v.y, VEL_SCALE), _q(v.z, VEL_SCALE),
+            _q(s.x, SPIN_SCALE), _q(s.y, SPIN_SCALE), _q(s.z, SPIN_SCALE),
+            *xz,
+            _q(player.position.y, POS_SCALE),
+            _q(player.yaw % 360 - 180, ANGLE_SCALE), _q(player.pitch, ANGLE_SCALE),
+            min(match.touches["player"], 255), min(match.touches["ai"], 255),
+            min(match.team_touches["player"], 255), min(match.team_touches["ai"], 255),
+            min(match.player_score, 65535), min(match.ai_score, 65535),
+            flags,
+        )
+        self.buffered += 1
+        self.records += 1
+        if self.buffered == self.capacity:
+            self.flush()
+
+    def flush(self):
+        if self.buffered:
+            self.file.write(memoryview(self.buffer)[:self.buffered * RECORD.size])
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        index_offset = self.file.tell()
+        for rally in self.rallies:
+            self.file.write(RALLY.pack(*rally))
+        event_offset = self.file.tell()
+        for event in self.events:
+            self.file.write(EVENT.pack(*event))
+
+        self.file.seek(0)
+        self._write_header(self.records, index_offset, len(self.rallies), event_offset, len(self.events))
+        self.file.close()
+
+    def _write_header(self, records, index_offset, rally_count, event_offset, event_count):
+        header = HEADER.pack(MAGIC, VERSION, RECORD.size, self.tick_rate, self.every,
+                             records, index_offset, rally_count, event_offset, event_count)
+        self.file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Frame:
+    """One decoded record."""
+    __slots__ = ("tick", "ball", "ball_velocity", "ball_spin", "actors", "player_y",
+                 "yaw", "pitch", "touches", "team_touches", "player_score", "ai_score",
+                 "serve_mode", "server", "last_hitter")
+
+    def __init__(self, raw):
+        self.tick = raw[0]
+        self.ball = (raw[1] / POS_SCALE, raw[2] / POS_SCALE, raw[3] / POS_SCALE)
+        self.ball_velocity = (raw[4] / VEL_SCALE, raw[5] / VEL_SCALE, raw[6] / VEL_SCALE)
+        self.ball_spin = (raw[7] / SPIN_SCALE, raw[8] / SPIN_SCALE, raw[9] / SPIN_SCALE)
+        self.actors = [(raw[10 + 2 * i] / POS_SCALE, raw[11 + 2 * i] / POS_SCALE) for i in range(4)]
+        self.player_y = raw[18] / POS_SCALE
+        self.yaw = raw[19] / ANGLE_SCALE + 180
+        self.pitch = raw[20] / ANGLE_SCALE
+        self.touches = {"player": raw[21], "ai": raw[22]}
+        self.team_touches = {"player": raw[23], "ai": raw[24]}
+        self.player_score = raw[25]
+        self.ai_score = raw[26]
+        flags = raw[27]
+        self.serve_mode = bool(flags & FLAG_SERVE_MODE)
+        self.server = "ai" if flags & FLAG_AI_SERVES else "player"
+        self.last_hitter = "ai" if flags & FLAG_AI_LAST_HIT else "player"
+
+
+class Replay:
+    """Read-only, memory-mapped view of a recording."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        if size < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a replay file")
+        (magic, version, record_size, self.tick_rate, self.every, records,
+         index_offset, rally_count, event_offset, event_count) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a replay file")
+        if version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path}: unsupported replay version {version}")
+
+        if index_offset:
+            self.count = records
+            self.rallies = [RALLY.unpack_from(self.map, index_offset + i * RALLY.size)
+                            for i in range(rally_count)]
+            self.events = [EVENT.unpack_from(self.map, event_offset + i * EVENT.size)
+                           for i in range(event_count)]
+        else:
+            # Recorder never closed (crash): use whatever whole records made it to disk
+            self.count = (size - HEADER_SIZE) // RECORD.size
+            self.rallies = self._scan_rallies()
+            self.events = []
+
+    @property
+    def dt(self):
+        return self.every / self.tick_rate
+
+    @property
+    def duration(self):
+        return self.count * self.dt
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, i):
+        return RECORD.unpack_from(self.map, HEADER_SIZE + i * RECORD.size)
+
+    def frame(self, i):
+        return Frame(self.raw(i))
+
+    def rally_start(self, k):
+        """Record index where rally k was served."""
+        return self.rallies[k][0]
+
+    def _scan_rallies(self):
+        """Rebuild the rally index from score changes (slow path for unclosed files)."""
+        rallies = []
+        start = 0
+        last = None
+        for i in range(self.count):
+            raw = self.raw(i)
+            scores = (raw[25], raw[26])
+            if last is not None and scores != last:
+                winner = 0 if scores[0] > last[0] else 1
+                rallies.append((start, i, winner, scores[0], scores[1], 0))
+                start = i
+            last = scores
+        return rallies
+
+    def close(self):
+        if hasattr(self.map, "close"):
+            self.map.close()
+        self.file.close()
+
+
+class ReplayPlayer:
+    """Plays a Replay back by writing each frame into a sim.Match the renderer already draws."""
+
+    def __init__(self, replay, speed=1.0):
+        self.replay = replay
+        self.speed = speed
+        self.position = 0.0     # in records, fractional
+        self.paused = False
+        self.next_event = 0
+        self.event_records = [e[0] for e in replay.events]
+
+    @property
+    def index(self):
+        return min(int(self.position), len(self.replay) - 1)
+
+    @property
+    def alpha(self):
+        return self.position - int(self.position)
+
+    @property
+    def finished(self):
+        return self.position >= len(self.replay) - 1
+
+    def seek(self, record):
+        self.position = float(max(0, min(record, len(self.replay) - 1)))
+        self.next_event = bisect.bisect_left(self.event_records, int(self.position))
+
+    def seek_rally(self, k):
+        self.seek(self.replay.rally_start(k))
+
+    def advance(self, dt, match):
+        """Move playback on by dt seconds and load the surrounding frames into match."""
+        if not self.paused and not self.finished:
+            self.position = min(self.position + dt * self.speed / self.replay.dt, len(self.replay) - 1)
+        i = self.index
+        self.apply(self.replay.frame(max(i, 0)), match, prev=True)
+        self.apply(self.replay.frame(min(i + 1, len(self.replay) - 1)), match)
+        self._emit_events(i, match)
+
+        # Spin isn't worth storing as a rotation; integrate it for the look
+        ball = match.ball
+        if not self.paused:
+            ball.prev_rotation = ball.rotation
+            ball.rotation = ball.rotation + ball.angular_velocity * dt * self.speed
+
+    def _emit_events(self, upto, match):
+        """Re-emit recorded events up to record upto through match's listeners."""
+        events = self.replay.events
+        while self.next_event < len(events) and events[self.next_event][0] <= upto:
+            record, kind, actor = events[self.next_event]
+            self.next_event += 1
+            event = EVENT_KINDS[kind]
+            frame = self.replay.frame(min(record, len(self.replay) - 1))
+            if event in ("bump", "spike"):
+                match.emit(event, actor=ACTORS[actor], position=Vec3(*frame.ball))
+            elif event == "serve":
+                match.emit(event, server="ai" if actor else "player")
+            else:
+                to = {0: "player", 1: "ai"}.get(actor)
+                match.emit(event, to=to, player_score=frame.player_score,
+                           ai_score=frame.ai_score, rally_time=0.0)
+
+    @staticmethod
+    def apply(frame, match, prev=False):
+        """Write a frame into match (or into its prev_* fields for interpolation)."""
+        ball = match.ball
+        if prev:
+            ball.prev_position = Vec3(*frame.ball)
+        else:
+            ball.position = Vec3(*frame.ball)
+            ball.sync_velocity(*frame.ball_velocity)     # keeps the trajectory cache between hits
+            ball.angular_velocity = Vec3(*frame.ball_spin)
+        for actor, (x, z) in zip(match.actors, frame.actors):
+            y = frame.player_y if actor is match.player else actor.position.y
+            if prev:
+                actor.prev_position = Vec3(x, y, z)
+            else:
+                actor.position = Vec3(x, y, z)
+        if prev:
+            return
+        match.player.yaw = frame.yaw
+        match.player.pitch = frame.pitch
+        match.touches = dict(frame.touches)
+        match.team_touches = dict(frame.team_touches)
+        match.player_score = frame.player_score
+        match.ai_score = frame.ai_score
+        match.serve_mode = frame.serve_mode
+        match.server = frame.server
+        match.last_hitter = frame.last_hitter
@@ -0,0 +1,922 @@
+"""
+Render-free volleyball simulation.
+
+Everything needed to play a point lives here as plain Python: the ball,
+the four players, touch counting, scoring and the serve state machine.
+Nothing in this module imports Ursina, so a match can be stepped on a box
+with no display. The game package builds the scene and mirrors this state.
+
+One Match steps about 80k ticks/s on one core; a bot rally runs ~850
+ticks, so that is ~90 points/s (`python sim.py` prints both). Sweeps of
+thousands of rallies per second go through batch_sim, which steps many
+simplified matches at once as arrays.
+"""
+import math
+import random
+
+from collision import Box, CollisionWorld, Plane, Sphere, sphere_shape
+from profiler import Profiler
+
+# -------------------------------------------
+# CONSTANTS
+# -------------------------------------------
+
+# Physics is in units per second. The old per-frame numbers assumed 60 fps.
+GRAVITY = 9.0           # ball, was 0.15 per frame
+PLAYER_GRAVITY = 48.0   # jumping player, was 0.8 * dt per frame
+JUMP_SPEED = 21.0       # was 0.35 per frame
+BALL_RADIUS = 0.5
+BALL_START = (0, 10, 0)
+BOUNCE = -0.6
+NET_BOUNCE = -0.5
+
+# Court (the invisible 'ground' cube): scale (30,1,20) at the origin
+COURT_HALF_X = 15
+COURT_HALF_Z = 10
+FLOOR_Y = 0.5           # top face of the ground cube
+
+# Net: scale (0.2,8,20) at (0,2,0)
+NET_POS = (0, 2, 0)
+NET_HALF = (0.1, 4, 10)
+NET_TOP = NET_POS[1] + NET_HALF[1]
+
+AI_SERVE_DELAY = 1.2
+
+PLAYER_START = (-10, 1, 0)
+PLAYER_TEAMMATE_START = (-12, 1, 2)
+OPPONENT_START = (10, 1, 0)
+OPPONENT_TEAMMATE_START = (12, 1, 2)
+
+MAX_TEAM_SIZE = 6
+MAX_CONTACTS = 4        # ball contacts resolved within one tick
+
+
+# -------------------------------------------
+# VECTORS
+# -------------------------------------------
+
+class Vec3:
+    """Tiny stand-in for ursina.Vec3 so the sim has no engine dependency."""
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __add__(self, o):
+        if type(o) is Vec3:
+            return Vec3(self.x + o.x, self.y + o.y, self.z + o.z)
+        return Vec3(self.x + o[0], self.y + o[1], self.z + o[2])
+
+    def __sub__(self, o):
+        if type(o) is Vec3:
+            return Vec3(self.x - o.x, self.y - o.y, self.z - o.z)
+        return Vec3(self.x - o[0], self.y - o[1], self.z - o[2])
+
+    def __mul__(self, s):
+        return Vec3(self.x * s, self.y * s, self.z * s)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Vec3(-self.x, -self.y, -self.z)
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, o):
+        return tuple(self) == tuple(o)
+
+    def __repr__(self):
+        return f"Vec3({self.x:.3f}, {self.y:.3f}, {self.z:.3f})"
+
+    def copy(self):
+        return Vec3(self.x, self.y, self.z)
+
+    def dot(self, o):
+        return self.x * o.x + self.y * o.y + self.z * o.z
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalized(self):
+        l = self.length()
+        if l == 0:
+            return Vec3(0, 0, 0)
+        return Vec3(self.x / l, self.y / l, self.z / l)
+
+
+def random_spin(rng, x=200, y=200, z=200):
+    return Vec3(rng.uniform(-x, x), rng.uniform(-y, y), rng.uniform(-z, z))
+
+
+# -------------------------------------------
+# BALL
+# -------------------------------------------
+
+class Ball:
+    def __init__(self):
+        self.version = 0    # bumped whenever the flight path changes (hit, bounce, net)
+        self.position = Vec3(*BALL_START)
+        self.velocity = Vec3(0, 0, 0)
+        self.angular_velocity = Vec3(0, 0, 0)
+        self.rotation = Vec3(0, 0, 0)
+        self.prev_position = self.position.copy()
+        self.prev_rotation = self.rotation.copy()
+
+    @property
+    def velocity(self):
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, v):
+        self._velocity = v
+        self.version += 1
+
+    def sync_velocity(self, x, y, z):
+        """
+        Take a velocity from a replay or a server snapshot. Free flight only
+        ever lowers y, so that is written in place like step_ball's gravity;
+        anything else is a hit, bounce or net and bumps version.
+        """
+        v = self._velocity
+        if x != v.x or z != v.z or y > v.y:
+            self.velocity = Vec3(x, y, z)
+        else:
+            v.y = y
+
+    @property
+    def x(self):
+        return self.position.x
+
+    @property
+    def y(self):
+        return self.position.y
+
+    @property
+    def z(self):
+        return self.position.z
+
+
+# -------------------------------------------
+# PLAYERS
+# -------------------------------------------
+
+class Controls:
+    """One frame of human input for the first-person player."""
+    __slots__ = ('forward', 'right', 'jump')
+
+    def __init__(self, forward=0, right=0, jump=False):
+        self.forward = forward  # w - s
+        self.right = right      # d - a
+        self.jump = jump
+
+
+NO_INPUT = Controls()   # a tick with no command: stand still, but still fall
+
+
+class Actor:
+    """Anything that can touch the ball. team is "player" or "ai"."""
+
+    # Hit zone relative to the body, matching the child hit_zone entities
+    # (local (0,1,-1) * (1,2,1) body scale, size (1,1,1.5) * body scale).
+    zone_offset = (0, 2, -1)
+    zone_half = (0.5, 1, 0.75)
+    zone_radius = math.hypot(*zone_half)    # bounding sphere of the zone, about its centre
+    planned = False     # moved by match.planner rather than by hand
+    court_index = 0     # order in the team's rotation (squad players come after 0 and 1)
+
+
+    def __init__(self, name, team, position, speed):
+        self.name = name
+        self.team = team
+        self.start = tuple(position)
+        self.position = Vec3(*position)
+        self.prev_position = self.position.copy()
+        self.speed = speed
+        self.has_hit = False
+        self.freeze = False
+        self._zone_key = None
+        self._zone = None
+
+    @property
+    def x(self):
+        return self.position.x
+
+    @property
+    def z(self):
+        return self.position.z
+
+    def own_side(self, x):
+        return x < 0 if self.team == "player" else x > 0
+
+    def zone(self):
+        """Hit zone shape for this tick (reused while we stand still)."""
+        p = self.position
+        key = (p.x, p.y, p.z)
+        if key != self._zone_key:
+            self._zone_key = key
+            self._zone = self.make_zone(p)
+        return self._zone
+
+    def make_zone(self, p):
+        o = self.zone_offset
+        return Box((p.x + o[0], p.y + o[1], p.z + o[2]), self.zone_half)
+
+    def zone_bound(self):
+        """(x, y, z, radius) of a sphere holding the hit zone, without building it."""
+        p, o = self.position, self.zone_offset
+        return p.x + o[0], p.y + o[1], p.z + o[2], self.zone_radius
+
+    def touching(self, ball):
+        return sphere_shape(ball.position, BALL_RADIUS, self.zone()) is not None
+
+    def contact_band(self):
+        """(dx, dz, y_min, y_max): where the ball centre sits, relative to our feet, when we can touch it."""
+        o, h = self.zone_offset, self.zone_half
+        y = self.position.y + o[1]
+        return o[0], o[2], y - h[1], y + h[1]
+
+    def home(self, match):
+        """(x, z) to wait at while someone else plays the ball."""
+        if match.squad is not None:
+            return match.squad.spot(self.team, self.court_index)
+        return self.start[0], self.start[2]
+
+    def on_contact(self, match):
+        """The ball is inside our hit zone this tick."""
+
+
+class Player(Actor):
+    """The first-person player. The hit zone follows the camera."""
+
+    eye_height = 1.7
+    zone_distance = 1.5
+    zone_camera_half = (0.25, 0.25, 1)
+    zone_radius = zone_distance + math.hypot(*zone_camera_half)    # about the eye, any camera angle
+
+    def __init__(self, position=PLAYER_START):
+        super().__init__("player", "player", position, speed=10)
+        self.jump_force = JUMP_SPEED
+        self.vy = 0
+        self.on_ground = True
+        self.mouse_sensitivity = 80
+        self.hit_cooldown = 0         # Time remaining until next allowed hit
+        self.cooldown_duration = 0.2  # 0.2 seconds between hits
+        self.yaw = 0                  # rotation_y of the body
+        self.pitch = 0                # rotation_x of the camera
+
+    def forward(self):
+        r = math.radians(self.yaw)
+        return Vec3(math.sin(r), 0, math.cos(r))
+
+    def right(self):
+        r = math.radians(self.yaw)
+        return Vec3(math.cos(r), 0, -math.sin(r))
+
+    def camera_axes(self):
+        """Unit right/up/forward of the camera (yaw, then pitch)."""
+        y, p = math.radians(self.yaw), math.radians(self.pitch)
+        sy, cy, sp, cp = math.sin(y), math.cos(y), math.sin(p), math.cos(p)
+        right = Vec3(cy, 0, -sy)
+        up = Vec3(sy * sp, cp, cy * sp)
+        forward = Vec3(sy * cp, -sp, cy * cp)
+        return right, up, forward
+
+    def camera_forward(self):
+        return self.camera_axes()[2]
+
+    def zone(self):
+        p = self.position
+        key = (p.x, p.y, p.z, self.yaw, self.pitch)
+        if key != self._zone_key:
+            self._zone_key = key
+            axes = self.camera_axes()
+            eye = p + (0, self.eye_height, 0)
+            center = eye + axes[2] * self.zone_distance
+            self._zone = Box(center, self.zone_camera_half, axes)
+        return self._zone
+
+    def zone_bound(self):
+        p = self.position
+        return p.x, p.y + self.eye_height, p.z, self.zone_radius
+
+    def on_contact(self, match):
+        if match.player_bot:
+            self.hit(match, in_zone=True)
+
+    def update(self, match, dt, controls):
+        # Reduce cooldown timer
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= dt
+
+        if match.serve_mode:
+            return
+
+        if controls is None:
+            controls = NO_INPUT
+
+        # ----- MOVEMENT -----
+        move = (self.forward() * controls.forward + self.right() * controls.right) * (self.speed * dt)
+        self.position.x += move.x
+        self.position.z += move.z
+
+        # ----- JUMP / GRAVITY -----
+        self.vy -= PLAYER_GRAVITY * dt
+        self.position.y += self.vy * dt
+
+        if self.position.y <= 1:
+            self.position.y = 1
+            self.vy = 0
+            self.on_ground = True
+
+        if controls.jump and self.on_ground:
+            self.vy = self.jump_force
+            self.on_ground = False
+
+    def look(self, dx, dy):
+        """Mouse look. Applied once per rendered frame, not per tick."""
+        self.pitch -= dy * self.mouse_sensitivity
+        self.yaw += dx * self.mouse_sensitivity
+        self.pitch = max(-80, min(80, self.pitch))
+
+    def update_bot(self, match, dt):
+        """Autopilot for headless AI-vs-AI matches: chase and bump like the Opponent."""
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= dt
+        if match.serve_mode:
+            return
+
+        self.yaw = 90
+        self.pitch = 0
+        ball = match.ball
+        if ball.x < 0:
+            target_x = ball.x + ball.velocity.x * 0.1 - self.zone_distance
+            target_z = ball.z + ball.velocity.z * 0.1
+            step = self.speed * dt
+            self.position.x += step if target_x > self.x else -step
+            self.position.z += step if target_z > self.z else -step
+
+    def _touch(self, match, in_zone):
+        if match.serve_mode or self.hit_cooldown > 0:
+            return False
+        if not in_zone and not self.touching(match.ball):
+            return False
+
+        match.last_hitter = "player"
+        match.touches["player"] += 1
+
+        # Reset cooldown
+        self.hit_cooldown = self.cooldown_duration
+
+        # Check 3-touch limit
+        if match.touches["player"] > 3:
+            match.award_point("ai")
+            return False
+        return True
+
+    def hit(self, match, in_zone=False):
+        if not self._touch(match, in_zone):
+            return
+        ball = match.ball
+        ball.velocity = (self.camera_forward() + (0, 1, 0)).normalized() * 12
+        ball.angular_velocity = random_spin(match.rng)
+        match.emit("bump", actor=self.name, position=ball.position.copy())
+
+    def spike(self, match, in_zone=False):
+        if not self._touch(match, in_zone):
+            return
+        ball = match.ball
+        ball.velocity = (self.camera_forward() + (0, -.5, 0)).normalized() * 15
+        ball.angular_velocity = random_spin(match.rng, 400, 200, 150)
+        match.emit("spike", actor=self.name, position=self.position.copy())
+
+    def swing(self, match):
+        """Left click: bump on the ground, spike in the air."""
+        if self.on_ground:
+            self.hit(match)
+        else:
+            self.spike(match)
+
+
+class Opponent(Actor):
+    planned = True
+
+    def __init__(self, position=OPPONENT_START):
+        super().__init__("opponent", "ai", position, speed=6)
+        self.hit_cooldown = 0         # Time remaining until next allowed hit
+        self.cooldown_duration = 0.5  # Half a second cooldown
+
+    def update_ai(self, match, dt):
+        if match.serve_mode:
+            return
+
+        # Reduce cooldown timer
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= dt
+
+        # Run to the planned intercept (or back to cover)
+        match.planner.steer(self, dt)
+
+    def on_contact(self, match):
+        # Hit ball if cooldown allows
+        if match.ball.x > 0 and self.hit_cooldown <= 0:
+            self.hit_ball(match)
+            self.hit_cooldown = self.cooldown_duration
+
+    def hit_ball(self, match):
+        rng = match.rng
+        ball = match.ball
+        match.last_hitter = "ai"
+        match.touches["ai"] += 1
+
+        # Check 3-touch limit
+        if match.touches["ai"] > 3:
+            match.award_point("player")
+            return
+
+        match.opp_spike, aim = self.choose_attack(match)
+        if match.opp_spike:
+            ball.velocity = Vec3(-1, 1, aim).normalized() * 13
+            ball.angular_velocity = random_spin(rng, 400, 200, 150)
+            match.emit("spike", actor=self.name, position=self.position.copy())
+        else:
+            ball.velocity = Vec3(-1, 1.25, aim).normalized() * 12
+            ball.angular_velocity = random_spin(rng)
+            match.emit("bump", actor=self.name, position=self.position.copy())
+
+    def choose_attack(self, match):
+        """(spike?, sideways aim in -0.3..0.3) for this touch."""
+        rng = match.rng
+        return rng.choice([False, True]), rng.uniform(-0.3, 0.3)
+
+
+class Teammate(Actor):
+    """Support player. Receives once per point, then freezes."""
+
+    planned = True
+    court_index = 1
+
+    def __init__(self, name, team, position):
+        super().__init__(name, team, position, speed=5)
+
+    def update_ai(self, match, dt):
+        if match.serve_mode or self.freeze:
+            return
+        match.planner.steer(self, dt)
+
+    def on_contact(self, match):
+        if not self.freeze and not self.has_hit and self.own_side(match.ball.x):
+            self.receive_ball(match)
+
+    def pass_target(self, match, touch):
+        """Where to send the ball for this team touch number."""
+        return team_pass_target(match, self.team, touch)
+
+    def receive_ball(self, match):
+        if self.has_hit:
+            return  # Already touched this rally
+
+        match.team_touches[self.team] += 1
+        touch = match.team_touches[self.team]
+        self.has_hit = True
+        match.last_hitter = self.team
+
+        bump_toward(match, self.name, self.position, self.pass_target(match, touch))
+        self.on_received(touch)
+
+    def on_received(self, touch):
+        self.freeze = True  # freeze after hitting
+
+
+def team_pass_target(match, team, touch):
+    """Where a support player sends the ball on this team touch number."""
+    if touch <= 2:
+        # First touch → receive, second → set toward our spiker
+        return match.spiker(team).position + (0, 1, 0)
+    # Third touch → attack over the net
+    side = 1 if team == "player" else -1
+    rng = match.rng
+    return Vec3(side * rng.uniform(5, 10), 1, rng.uniform(-3, 3))
+
+
+def bump_toward(match, name, position, target):
+    """A support player's bump from position toward target."""
+    bump_dir = (target - position).normalized()
+    bump_dir.y += 0.5  # add lift
+    match.ball.velocity = bump_dir * 12
+    match.ball.angular_velocity = random_spin(match.rng)
+    match.emit("bump", actor=name, position=position.copy())
+
+
+class PlayerTeammate(Teammate):
+    """The human's partner: keeps moving after a touch, touches by distance instead of hit zone."""
+
+    reach = 1.5     # ball centre within this distance of our centre
+
+    def update_ai(self, match, dt):
+        if match.serve_mode:
+            return
+        match.planner.steer(self, dt)
+
+    def make_zone(self, p):
+        return Sphere((p.x, p.y, p.z), self.reach - BALL_RADIUS)
+
+    def zone_bound(self):
+        p = self.position
+        return p.x, p.y, p.z, self.reach - BALL_RADIUS
+
+    def contact_band(self):
+        # stay well inside the sphere so the touch isn't a graze
+        y = self.position.y
+        return 0, 0, y - self.reach * 0.7, y + self.reach * 0.7
+
+    def on_contact(self, match):
+        if not self.has_hit:
+            self.receive_ball(match)
+
+    def pass_target(self, match, touch):
+        if touch <= 2:
+            # Just lift it for the player
+            return self.position + (0, 3, 0)
+        return super().pass_target(match, touch)
+
+    def on_received(self, touch):
+        # Freeze after first touch
+        if touch == 1:
+            self.freeze = True
+
+
+# -------------------------------------------
+# MATCH
+# -------------------------------------------
+
+class Match:
+    """
+    One match: ball, four players, scores and serve state.
+
+    With team_size above 2 each side also gets team_size - 2 squad players
+    (squad.Squad, held in NumPy arrays) and teams rotate on a side-out.
+
+    Listeners are called as listener(event, data) for "bump", "spike",
+    "serve", "point" and "reset" so a renderer (or logger) can react
+    without the sim knowing about it.
+    """
+
+    def __init__(self, rng=None, player_bot=False, serve_delay=AI_SERVE_DELAY, profiler=None, team_size=2,
+                 opponent=None, dt=1 / 60):
+        if not 2 <= team_size <= MAX_TEAM_SIZE:
+            raise ValueError(f"team_size must be 2 to {MAX_TEAM_SIZE}, got {team_size}")
+        self.rng = rng if rng is not None else random.Random()
+        self.profiler = profiler if profiler is not None else Profiler()   # disabled by default
+        self.player_bot = player_bot
+        self.serve_delay = serve_delay
+        self.listeners = []
+
+        self.ball = Ball()
+        self.player = Player()
+        self.player_teammate = PlayerTeammate("player_teammate", "player", PLAYER_TEAMMATE_START)
+        self.opponent = opponent if opponent is not None else Opponent()    # e.g. a learned policy
+        self.opponent_teammate = Teammate("opponent_teammate", "ai", OPPONENT_TEAMMATE_START)
+        self.team_size = team_size
+        self.squad = None
+        if team_size > 2:
+            from squad import Squad     # NumPy is only needed for big teams
+            self.squad = Squad(team_size)
+        self.squad_zones = []   # squad rows with a hit zone in the collision world
+
+        self.player_score = 0
+        self.ai_score = 0
+        self.touches = {"player": 0, "ai": 0}
+        self.team_touches = {"player": 0, "ai": 0}
+        self.last_hitter = None  # "player" or "ai"
+        self.opp_spike = False
+
+        self.serve_mode = True
+        self.server = "player"
+        self.serve_timer = None
+
+        self.time = 0.0
+        self.rally_time = 0.0
+        self.points_played = 0
+
+        self.collision = CollisionWorld()
+        self.collision.add_static("net", Box(NET_POS, NET_HALF))
+        self.collision.add_static("floor", Plane((0, FLOOR_Y, 0), (0, 1, 0)))
+
+        from planner import Planner     # planner -> trajectory -> sim, so not at the top
+        self.planner = Planner(self, dt)   # dt: the tick step() will be called with
+
+        self.reset_for_serve()
+
+    @property
+    def actors(self):
+        return (self.player, self.player_teammate, self.opponent, self.opponent_teammate)
+
+    def spiker(self, team):
+        return self.player if team == "player" else self.opponent
+
+    def emit(self, event, **data):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def snap(self):
+        """Make the previous-tick state equal the current one (no interpolation)."""
+        ball = self.ball
+        ball.prev_position = ball.position.copy()
+        ball.prev_rotation = ball.rotation.copy()
+        for actor in self.actors:
+            actor.prev_position = actor.position.copy()
+        if self.squad is not None:
+            self.squad.snap()
+
+    # ----- SERVING -----
+
+    def reset_for_serve(self):
+        self.serve_mode = True
+        self.ball.velocity = Vec3(0, 0, 0)
+        self.touches["player"] = 0
+        self.touches["ai"] = 0
+        self.rally_time = 0.0
+
+        # Reset teammates
+        for mate in (self.player_teammate, self.opponent_teammate):
+            mate.has_hit = False
+            mate.freeze = False
+
+        if self.server == "player":
+            self.player.position = Vec3(*PLAYER_START)
+            self.player_teammate.position = Vec3(*PLAYER_TEAMMATE_START)
+            self.ball.position = self.player.position + (1, 3, 0)
+        else:
+            self.opponent.position = Vec3(*OPPONENT_START)
+            self.opponent_teammate.position = Vec3(*OPPONENT_TEAMMATE_START)
+            self.ball.position = self.opponent.position + (-1, 10, 0)
+
+        if self.squad is not None:
+            # Everyone but the server lines up on their rotation spot
+            server = self.spiker(self.server)
+            for actor in self.actors:
+                if actor is not server:
+                    x, z = actor.home(self)
+                    actor.position = Vec3(x, actor.position.y, z)
+            self.squad.reset()
+
+        # The AI (and the bot) serve on their own after a short pause
+        if self.server == "ai" or self.player_bot:
+            self.serve_timer = self.serve_delay
+        else:
+            self.serve_timer = None
+        self.snap()
+        self.emit("reset", server=self.server)
+
+    def request_serve(self):
+        """The human pressed E."""
+        if self.serve_mode and self.server == "player":
+            self.do_serve()
+
+    def do_serve(self):
+        self.serve_mode = False
+        self.serve_timer = None
+
+        if self.server == "player":
+            self.player.position = Vec3(*PLAYER_START)
+            self.ball.velocity = Vec3(0.5, 10, self.rng.uniform(-1, 1))
+        else:
+            self.opponent.position = Vec3(*OPPONENT_START)
+            self.ball.velocity = Vec3(-0.5, 10, self.rng.uniform(-1, 1))
+        self.emit("serve", server=self.server)
+
+    # ----- SCORING -----
+
+    def award_point(self, to):
+        if self.squad is not None and to != self.server:
+            self.squad.rotate(to)   # side-out: the team winning the serve back rotates
+        if to == "player":
+            self.player_score += 1
+            self.server = "player"
+        else:
+            self.ai_score += 1
+            self.server = "ai"
+
+        self.team_touches["player"] = 0
+        self.team_touches["ai"] = 0
+        self.points_played += 1
+
+        self.emit("point", to=to, player_score=self.player_score,
+                  ai_score=self.ai_score, rally_time=self.rally_time)
+        self.reset_for_serve()
+
+    # ----- STEP -----
+
+    def step(self, dt, controls=None):
+        """Advance the match by one tick of dt seconds. controls drive the human player."""
+        self.time += dt
+
+        # Keep last tick's state so the renderer can interpolate
+        self.snap()
+
+        if self.serve_mode:
+            if self.serve_timer is not None:
+                self.serve_timer -= dt
+                if self.serve_timer <= 0:
+                    self.do_serve()
+        else:
+            self.rally_time += dt
+
+        section = self.profiler.section
+        with section("planner"):
+            self.planner.update(self)
+        with section("player.update"):
+            if self.player_bot:
+                self.player.update_bot(self, dt)
+            else:
+                self.player.update(self, dt, controls)
+        with section("player_teammate.update"):
+            self.player_teammate.update_ai(self, dt)
+        with section("opponent.update_ai"):
+            self.opponent.update_ai(self, dt)
+        with section("opponent_teammate.update_ai"):
+            self.opponent_teammate.update_ai(self, dt)
+        if self.squad is not None:
+            with section("squad.update"):
+                self.squad.update(self, dt)
+
+        if self.serve_mode:
+            # Ball waits in the server's hand
+            return
+
+        with section("collisions"):
+            self.check_touches(dt)
+        if self.serve_mode:
+            return  # a touch ended the point
+
+        with section("ball"):
+            self.step_ball(dt)
+
+    def check_touches(self, dt):
+        """
+        Let every player whose hit zone holds the ball react, in actor order,
+        then the first squad player who can.
+
+        Only zones the ball can reach this tick are built and kept in the
+        collision world (for step_ball's sweeps); the rest are dropped
+        after a bounding-sphere check, which is most of them most ticks.
+        Squad zones are keyed by row, actor zones by the actor.
+        """
+        world = self.collision
+        ball = self.ball
+        p, v = ball.position, ball.velocity
+        bx, by, bz = p.x, p.y, p.z
+        # step_ball moves at most this far, gravity included, before the next check
+        slack = BALL_RADIUS + (abs(v.x) + abs(v.y) + abs(v.z) + GRAVITY * dt) * dt
+        hits = []
+        for actor in self.actors:
+            x, y, z, r = actor.zone_bound()
+            dx, dy, dz = bx - x, by - y, bz - z
+            r += slack
+            if dx * dx + dy * dy + dz * dz > r * r:
+                world.remove_zone(actor)
+                continue
+            world.set_zone(actor, actor.zone())
+            if world.zone_contact(actor, p, BALL_RADIUS) is not None:
+                hits.append(actor)
+        if self.squad is not None:
+            squad = self.squad
+            rows = squad.reachable(p, slack)
+            for row in self.squad_zones:
+                if row not in rows:
+                    world.remove_zone(row)
+            self.squad_zones = rows
+            for row in rows:
+                world.set_zone(row, squad.zone(row))
+                if world.zone_contact(row, p, BALL_RADIUS) is not None:
+                    hits.append(row)
+        for key in hits:
+            if self.touch(key) and type(key) is int:
+                return      # one squad player plays the ball per tick
+            if self.serve_mode:
+                return
+
+    def touch(self, key):
+        """The ball is in hit zone key: let its owner react. True if it played the ball."""
+        version = self.ball.version
+        if type(key) is int:
+            self.squad.on_contact(self, key)
+        else:
+            key.on_contact(self)
+        return self.ball.version != version
+
+    def step_ball(self, dt):
+        """
+        Move the ball through this tick, resolving contacts in time order.
+
+        The ball's path over the tick is swept against the net, the floor and
+        the hit zones, so a fast spike or a long tick can't carry it through
+        any of them. It stops at the first contact, reacts, and carries on
+        with the rest of the tick (up to MAX_CONTACTS times). A hit zone the
+        ball would cross without ending the tick inside is touched at its
+        edge; if the touch doesn't count (a frozen player, a cooldown, the
+        wrong side) the ball flies on. Zones the ball ends inside are left
+        to check_touches() next tick.
+        """
+        ball = self.ball
+        ball.velocity.y -= GRAVITY * dt
+        ball.rotation = ball.rotation + ball.angular_velocity * dt
+
+        world = self.collision
+        remaining = dt
+        net_solid = True
+        touched = []    # zones already touched this tick
+        for _ in range(MAX_CONTACTS):
+            p, v = ball.position, ball.velocity
+            # Only sweep what the ball can reach this tick
+            floor = net = None
+            if p.y + min(v.y, 0.0) * remaining - BALL_RADIUS <= FLOOR_Y:
+                floor = world.sweep_static("floor", p, BALL_RADIUS, v, remaining)
+            if net_solid and abs(p.x - NET_POS[0]) <= abs(v.x) * remaining + BALL_RADIUS + NET_HALF[0]:
+                net = world.sweep_static("net", p, BALL_RADIUS, v, remaining)
+            if net is not None and floor is not None and floor.time <= net.time:
+                net = None
+            contact = net or floor
+            until = contact.time if contact is not None else remaining
+
+            # Crossing a hit zone completely inside one tick: touch it on its
+            # edge. Moving less than the ball's radius it could only graze a corner.
+            end = p + v * until
+            crossed = None
+            if (v.x * v.x + v.y * v.y + v.z * v.z) * until * until > BALL_RADIUS * BALL_RADIUS:
+                for key, zone in world.zone_sweeps(p, BALL_RADIUS, v, until):
+                    if (zone.time > 0 and key not in touched
+                            and world.zone_contact(key, end, BALL_RADIUS) is None):
+                        crossed = key, zone.time
+                        break
+            if crossed is not None:
+                key, until = crossed
+                ball.position = p + v * until
+                remaining -= until
+                touched.append(key)
+                self.touch(key)
+                if self.serve_mode:
+                    return      # the touch ended the point
+                continue
+
+            ball.position = end
+            remaining -= until
+            if contact is None:
+                return
+            if contact is floor:
+                # Floor contact: in → point to the other side, out → against last hitter
+                in_court = (abs(ball.x) <= COURT_HALF_X + BALL_RADIUS
+                            and abs(ball.z) <= COURT_HALF_Z + BALL_RADIUS)
+                if in_court:
+                    self.award_point("ai" if ball.x < 0 else "player")
+                elif self.last_hitter == "ai":
+                    self.award_point("player")
+                else:
+                    self.award_point("ai")
+                return
+            # Net: knock the ball back if it's moving into the net below the tape
+            if ball.y <= NET_TOP and v.x * net.normal[0] < 0:
+                v.x *= NET_BOUNCE
+                ball.version += 1
+            else:
+                net_solid = False   # over the tape (or its top edge): let it through
+
+    def play_point(self, dt=1 / 60, max_time=60.0):
+        """Step until a point is scored (or max_time passes). Returns the winner or None."""
+        start = self.points_played
+        winner = []
+        grab = lambda event, data: winner.append(data["to"]) if event == "point" else None
+        self.listeners.append(grab)
+        try:
+            t = 0.0
+            while self.points_played == start and t < max_time:
+                self.step(dt)
+                t += dt
+        finally:
+            self.listeners.remove(grab)
+        return winner[0] if winner else None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    match = Match(rng=random.Random(0), player_bot=True)
+    start = time.perf_counter()
+    for _ in range(points):
+        match.play_point()
+    elapsed = time.perf_counter() - start
+    ticks = round(match.time * 60)     # play_point steps at 1/60 s
+    print(f"{points} points in {elapsed:.2f}s ({points / elapsed:.0f} points/s, "
+          f"{ticks / elapsed / 1000:.0f}k ticks/s, {ticks / points:.0f} ticks/point)  "
+          f"score {match.player_score} - {match.ai_score}")
@@ -0,0 +1,244 @@
+"""
+Squad players for teams bigger than 2v2, stored as arrays.
+
+sim.Match always has its four named actors: the human, the AI spiker and
+one support player per side. With team_size > 2 the rest of each team
+lives here, one row per player across a handful of NumPy arrays
+(structure of arrays). Moving and touch testing all of them is then a few
+vector operations per tick, however many players there are.
+
+Squad players play like Teammate. They run to the spot the planner gives
+them, receive once per point, pass to their spiker and then hold. Their
+pass is a lob timed to drop into the spiker's hit zone (lob_toward) rather
+than Teammate's fixed-speed bump.
+Their hit zones go into the match's collision world like everyone else's
+(keyed by row), so the ball is swept against them too.
+
+Each team stands in a formation of team_size spots, listed in rotation
+order: back right, then the front row from right to left, then the rest
+of the back row. When a team wins the serve back (a side-out), every
+player on it moves one spot clockwise. That includes the named actors,
+who line up on their spot for each point except when serving: the
+spiker always serves, from its usual start.
+"""
+import math
+
+import numpy as np
+
+from collision import Box
+from planner import ACCELERATION, ARRIVE_TIME, REACTION, SETTLE
+from sim import BALL_RADIUS, GRAVITY, Actor, Vec3, random_spin, team_pass_target
+
+TEAMS = ("player", "ai")
+SPEED = 5.0
+FRONT_X = 3.0       # distance of the front row from the net
+BACK_X = 10.0
+ROW_HALF_WIDTH = 6.0
+
+ZONE_OFFSET = np.array(Actor.zone_offset, dtype=np.float64)
+ZONE_HALF = np.array(Actor.zone_half, dtype=np.float64)
+ZONE_TOP = 1 + Actor.zone_offset[1] + Actor.zone_half[1] + BALL_RADIUS    # squad players don't jump
+PASS_TIME = 1.8     # seconds a squad player's pass hangs in the air
+
+
+def formation(team_size, team):
+    """Court spots (x, z) for one team, in rotation order."""
+    side = -1 if team == "player" else 1   # which half; also the sign of z on the team's right
+    front = (team_size + 1) // 2
+    back = team_size - front
+
+    def row(x, count):
+        # right to left as the team faces the net
+        if count == 1:
+            return [(side * x, 0.0)]
+        step = 2 * ROW_HALF_WIDTH / (count - 1)
+        return [(side * x, side * (ROW_HALF_WIDTH - i * step)) for i in range(count)]
+
+    back_row = row(BACK_X, back)
+    return back_row[:1] + row(FRONT_X, front) + back_row[:0:-1]
+
+
+def lob_toward(match, name, position, target, time=PASS_TIME):
+    """
+    A squad player's pass: the ball comes down on target after time
+    seconds. sim.bump_toward hits at a fixed speed, which from the front
+    row carries a pass to the spiker out over the back line.
+    """
+    ball = match.ball
+    d = target - ball.position
+    ball.velocity = Vec3(d.x / time, d.y / time + 0.5 * GRAVITY * time, d.z / time)
+    ball.angular_velocity = random_spin(match.rng)
+    match.emit("bump", actor=name, position=position.copy())
+
+
+class Squad:
+    """Players 2..team_size-1 of both teams. Rows are ordered by team, then court index."""
+
+    def __init__(self, team_size):
+        self.team_size = team_size
+        per_team = team_size - 2
+        n = 2 * per_team
+
+        self.team = np.repeat(np.arange(2, dtype=np.int8), per_team)         # 0 player side, 1 ai
+        self.court_index = np.tile(np.arange(2, team_size, dtype=np.int8), 2)
+        self.side = np.where(self.team == 0, -1.0, 1.0)
+        self.rows = (slice(0, per_team), slice(per_team, n))   # each team's rows
+        self.names = [f"{TEAMS[t]}_{i + 1}" for t, i in zip(self.team, self.court_index)]
+
+        self.position = np.zeros((n, 3))
+        self.position[:, 1] = 1.0
+        self.prev_position = self.position.copy()
+        self.velocity = np.zeros((n, 2))        # x, z
+        self.target = np.zeros((n, 2))          # where the planner wants each player
+        self.slot = np.zeros(n, dtype=np.int8)  # formation spot each row stands on
+        self.home = np.zeros((n, 2))            # ...and where that spot is
+        self.has_hit = np.zeros(n, dtype=bool)
+        self.freeze = np.zeros(n, dtype=bool)
+        self.settled = False    # nobody needs to move until the targets change
+
+        self.formations = {team: np.array(formation(team_size, team)) for team in TEAMS}
+        self.rotation = {team: 0 for team in TEAMS}
+        self._update_spots()
+        self.reset()
+
+    def __len__(self):
+        return len(self.team)
+
+    # ----- rotation -----
+
+    def spot(self, team, court_index):
+        """(x, z) of the formation spot a team's player stands on now."""
+        i = (court_index - self.rotation[team]) % self.team_size
+        x, z = self.formations[team][i]
+        return float(x), float(z)
+
+    def rotate(self, team):
+        self.rotation[team] = (self.rotation[team] + 1) % self.team_size
+        self._update_spots()
+
+    def _update_spots(self):
+        for team, rows in zip(TEAMS, self.rows):
+            self.slot[rows] = (self.court_index[rows] - self.rotation[team]) % self.team_size
+            self.home[rows] = self.formations[team][self.slot[rows]]
+
+    def homes(self):
+        """(n, 2) formation spot of every row."""
+        return self.home.copy()
+
+    # ----- per point / per tick -----
+
+    def reset(self):
+        """New point: everyone back on their spot, fresh touch flags."""
+        self.position[:, ::2] = self.home
+        self.target[:] = self.home
+        self.velocity[:] = 0.0
+        self.has_hit[:] = False
+        self.freeze[:] = False
+        self.prev_position[:] = self.position
+        self.settled = True
+
+    def snap(self):
+        if not self.settled:
+            self.prev_position[:] = self.position
+
+    def set_targets(self, targets):
+        self.target[:] = targets
+        self.settled = False
+
+    def update(self, match, dt):
+        """Steer every unfrozen player toward its target (planner.steer, vectorised)."""
+        if match.serve_mode or self.settled:
+            return
+        limit = ACCELERATION * dt
+        v = self.velocity
+        ground = self.position[:, ::2]      # x and z columns, a view
+        error = self.target - ground
+        dist = np.sqrt((error * error).sum(axis=1))
+        still = self.freeze | ((dist < SETTLE) & (np.abs(v).sum(axis=1) < limit))
+        if still.all():
+            v[:] = 0.0
+            self.settled = True
+            self.prev_position[:] = self.position
+            return
+
+        want = error * (np.minimum(SPEED, dist / ARRIVE_TIME) / np.maximum(dist, 1e-6))[:, None]
+        change = want - v
+        size = np.sqrt((change * change).sum(axis=1))
+        v += change * np.minimum(1.0, limit / np.maximum(size, 1e-12))[:, None]
+        v[still] = 0.0
+        ground += v * dt
+
+    def reachable(self, ball, reach):
+        """
+        Rows that can still receive and whose hit zone is within reach of
+        the ball's centre (ball is a position), as a list of ints.
+        """
+        if ball.y - reach > ZONE_TOP - BALL_RADIUS:
+            return []   # over everyone's head
+        ready = np.flatnonzero(~(self.has_hit | self.freeze))
+        if not len(ready):
+            return []
+        b = np.array((ball.x, ball.y, ball.z))
+        centre = self.position[ready] + ZONE_OFFSET
+        d = b - np.minimum(np.maximum(b, centre - ZONE_HALF), centre + ZONE_HALF)
+        return ready[(d * d).sum(axis=1) <= reach * reach].tolist()
+
+    def zone(self, i):
+        """Hit zone of row i for the collision world."""
+        x, y, z = (self.position[i] + ZONE_OFFSET).tolist()
+        return Box((x, y, z), Actor.zone_half)
+
+    def on_contact(self, match, i):
+        """The ball is in row i's hit zone: receive it if they still can and it is on their side."""
+        if self.has_hit[i] or self.freeze[i] or self.side[i] * match.ball.x <= 0:
+            return
+        team = TEAMS[self.team[i]]
+        match.team_touches[team] += 1
+        touch = match.team_touches[team]
+        self.has_hit[i] = True
+        self.freeze[i] = True
+        self.velocity[i] = 0.0
+        match.last_hitter = team
+        position = Vec3(*self.position[i].tolist())
+        if touch <= 2:
+            target = Vec3(*match.spiker(team).zone().center)    # into the spiker's hit zone
+        else:
+            target = team_pass_target(match, team, touch)
+        lob_toward(match, self.names[i], position, target)
+
+    # ----- planning -----
+
+    def intercepts(self, samples, now):
+        """
+        Earliest reachable intercept per row against samples (t, x, y, z)
+        of the ball's path: (times, stand points), time inf where none.
+        """
+        n = len(self)
+        times = np.full(n, math.inf)
+        stands = np.zeros((n, 2))
+        if not samples:
+            return times, stands
+        s = np.asarray(samples)
+        t, x, y, z = s[:, 0, None], s[:, 1, None], s[:, 2, None], s[:, 3, None]
+        low = self.position[:, 1] + ZONE_OFFSET[1] - ZONE_HALF[1]
+        high = self.position[:, 1] + ZONE_OFFSET[1] + ZONE_HALF[1]
+        sx, sz = x - ZONE_OFFSET[0], z - ZONE_OFFSET[2]      # (samples, 1)
+        dist = np.hypot(sx - self.position[:, 0], sz - self.position[:, 2])
+        ok = ((low <= y) & (y <= high) & (self.side * x > 0) & (self.side * sx > 0)
+              & (dist / SPEED + REACTION <= t - now) & ~(self.has_hit | self.freeze))
+        found = ok.any(axis=0)
+        first = ok.argmax(axis=0)
+        times[found] = s[first[found], 0]
+        stands[found, 0] = sx[first[found], 0]
+        stands[found, 1] = sz[first[found], 0]
+        return times, stands
+
+    def earliest(self, team, times):
+        """(row, time) of the team's first intercept in times, or (None, inf)."""
+        rows = self.rows[team]
+        if rows.start == rows.stop:
+            return None, math.inf
+        row = rows.start + int(times[rows].argmin())
+        if times[row] == math.inf:
+            return None, math.inf
+        return row, float(times[row])
@@ -0,0 +1,269 @@
+"""
+Streaming per-rally statistics.
+
+RallyStats is a match listener. It counts the touches of each rally: who
+touched the ball, bumps against spikes (the opponent's spike-or-bump pick,
+opp_spike, shows up as its spike/bump event) and who served. When the point
+is awarded it pushes one flat record with the serve outcome and rally
+duration. With touches=True it also pushes one record per touch.
+
+Records go into a StatsSink. The frame loop only ever appends to a bounded
+single-producer ring buffer: no locks, no I/O. A background writer thread
+drains it in batches to JSONL or columnar files and rotates them by size.
+If the writer falls behind and the ring fills, new records are dropped and
+counted instead of blocking the tick.
+
+    sink = StatsSink("rallies.jsonl", max_bytes=64 << 20)
+    match.listeners.append(RallyStats(sink).on_event)
+    ...
+    sink.close()    # flushes what's left
+
+Formats:
+    jsonl     one JSON object per record
+    columns   one JSON object per record type and batch:
+              {"type": "rally", "count": n, "columns": {"name": [...], ...}}
+"""
+import json
+import os
+import threading
+import time
+
+FORMATS = ("jsonl", "columns")
+
+
+def team_of(actor):
+    """Side an actor name plays for ("player_teammate", "ai_3" -> "player", "ai")."""
+    return "player" if actor.startswith("player") else "ai"
+
+
+class RingBuffer:
+    """
+    Bounded single-producer, single-consumer queue. The producer only moves
+    tail and the consumer only moves head, so each index has one writer
+    and neither side needs a lock.
+    """
+
+    def __init__(self, capacity):
+        self.slots = [None] * (capacity + 1)    # one slot stays empty to tell full from empty
+        self.head = 0
+        self.tail = 0
+
+    def __len__(self):
+        return (self.tail - self.head) % len(self.slots)
+
+    @property
+    def capacity(self):
+        return len(self.slots) - 1
+
+    def push(self, item):
+        """Append item; False (and nothing stored) if the buffer is full."""
+        tail = self.tail
+        after = tail + 1 if tail + 1 < len(self.slots) else 0
+        if after == self.head:
+            return False
+        self.slots[tail] = item
+        self.tail = after       # publish only once the slot is written
+        return True
+
+    def pop_many(self, limit):
+        """Remove and return up to limit items, oldest first."""
+        slots = self.slots
+        head, tail = self.head, self.tail
+        out = []
+        while head != tail and len(out) < limit:
+            out.append(slots[head])
+            slots[head] = None
+            head = head + 1 if head + 1 < len(slots) else 0
+        self.head = head
+        return out
+
+
+class StatsSink:
+    """
+    Bounded buffer plus a writer thread. push() never blocks; when the
+    buffer is full the record is dropped and counted.
+
+    Files rotate once they pass max_bytes: "rallies.jsonl" is written as
+    rallies.0000.jsonl, rallies.0001.jsonl, ... (no rotation and no part
+    number when max_bytes is None).
+    """
+
+    def __init__(self, path, format="jsonl", capacity=8192, batch=512, interval=0.25, max_bytes=None):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}, got {format!r}")
+        self.path = path
+        self.format = format
+        self.batch = batch
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.ring = RingBuffer(capacity)
+
+        self.pushed = 0
+        self.dropped = 0            # producer side: ring was full
+        self.written = 0            # writer side
+        self.write_errors = 0       # records lost to a failed write
+        self.error = None
+        self.files = []
+        self.file = None
+        self.part = 0
+
+        self.closing = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+        self.thread.start()
+
+    def push(self, record):
+        """Queue a record (a flat dict) for writing. Never blocks."""
+        if self.ring.push(record):
+            self.pushed += 1
+        else:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Stop the writer after it has written everything queued."""
+        if self.closing.is_set():
+            return
+        self.closing.set()
+        self.thread.join(timeout)
+
+    def stats(self):
+        return {
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "pending": len(self.ring),
+            "files": list(self.files),
+        }
+
+    # ----- writer thread -----
+
+    def _run(self):
+        try:
+            while True:
+                closing = self.closing.is_set()
+                records = self.ring.pop_many(self.batch)
+                if records:
+                    self._write(records)
+                elif closing:
+                    break
+                else:
+                    self.closing.wait(self.interval)
+        finally:
+            if self.file is not None:
+                self.file.close()
+
+    def _write(self, records):
+        if self.error is not None:
+            self.write_errors += len(records)
+            return
+        if self.format == "jsonl":
+            data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        else:
+            data = "".join(json.dumps(block, separators=(",", ":")) + "\n" for block in columns(records))
+        try:
+            f = self._file()
+            f.write(data)
+            f.flush()
+        except OSError as e:
+            self.error = e
+            self.write_errors += len(records)
+            return
+        self.written += len(records)
+
+    def _file(self):
+        f = self.file
+        if f is not None and self.max_bytes is not None and f.tell() >= self.max_bytes:
+            f.close()
+            f = self.file = None
+            self.part += 1
+        if f is None:
+            path = self.path
+            if self.max_bytes is not None:
+                stem, ext = os.path.splitext(path)
+                path = f"{stem}.{self.part:04d}{ext}"
+            f = self.file = open(path, "w", encoding="utf-8")
+            self.files.append(path)
+        return f
+
+
+def columns(records):
+    """Group records by their "type" and turn each group into column lists."""
+    groups = {}
+    for record in records:
+        groups.setdefault(record.get("type"), []).append(record)
+    for kind, group in groups.items():
+        names = []
+        for record in group:
+            for name in record:
+                if name != "type" and name not in names:
+                    names.append(name)
+        yield {"type": kind, "count": len(group),
+               "columns": {name: [r.get(name) for r in group] for name in names}}
+
+
+class RallyStats:
+    """Match listener that sends one record per rally (and optionally per touch) to a sink."""
+
+    def __init__(self, sink, match_id=0, touches=False, clock=time.time):
+        self.sink = sink
+        self.match_id = match_id
+        self.touches = touches
+        self.clock = clock
+        self.rally = 0
+        self.server = None
+        self._clear()
+
+    def _clear(self):
+        self.counts = {"player_touches": 0, "ai_touches": 0,
+                       "player_bumps": 0, "ai_bumps": 0,
+                       "player_spikes": 0, "ai_spikes": 0,
+                       "opponent_spikes": 0, "opponent_bumps": 0}
+
+    def on_event(self, event, data):
+        if event == "reset":
+            self.server = data["server"]
+            self._clear()
+        elif event == "serve":
+            self.server = data["server"]
+        elif event in ("bump", "spike"):
+            actor = data["actor"]
+            team = team_of(actor)
+            counts = self.counts
+            counts[team + "_touches"] += 1
+            counts[f"{team}_{event}s"] += 1
+            if actor == "opponent":
+                counts[f"opponent_{event}s"] += 1
+            if self.touches:
+                p = data["position"]
+                self.sink.push({"type": "touch", "match": self.match_id, "rally": self.rally,
+                                "n": counts["player_touches"] + counts["ai_touches"],
+                                "actor": actor, "team": team, "kind": event,
+                                "x": round(p.x, 3), "y": round(p.y, 3), "z": round(p.z, 3)})
+        elif event == "point":
+            self.on_point(data)
+
+    def on_point(self, data):
+        winner = data["to"]
+        server = self.server
+        receiver = "ai" if server == "player" else "player"
+        counts = self.counts
+        if counts[receiver + "_touches"] == 0:
+            outcome = "ace" if winner == server else "fault"    # receivers never touched it
+        else:
+            outcome = "hold" if winner == server else "side_out"
+        record = {
+            "type": "rally",
+            "match": self.match_id,
+            "rally": self.rally,
+            "time": self.clock(),
+            "server": server,
+            "winner": winner,
+            "serve_outcome": outcome,
+            "duration": round(data["rally_time"], 4),
+            "touches": counts["player_touches"] + counts["ai_touches"],
+            **counts,
+            "player_score": data["player_score"],
+            "ai_score": data["ai_score"],
+        }
+        self.sink.push(record)
+        self.rally += 1
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from batch_sim import BatchParams, BatchRallySim, param_grid, win_rate_by
+
+
+@pytest.mark.parametrize("n", [1, 2, 3])
+def test_direction_columns_do_not_depend_on_n(n):
+    # n == 2 used to be mistaken for a per-slot (x, y) direction
+    params = BatchParams(n)
+    assert params.column('spike_dir').shape == (n, 2)
+    assert params.column('opp_speed').shape == (n,)
+    result = BatchRallySim(params, seed=0).run(3)
+    assert result['winner'].shape == (n, 3)
+
+
+def test_per_slot_directions():
+    dirs = np.array([(-1.0, 1.0), (-1.0, 2.0)])
+    np.testing.assert_array_equal(BatchParams(2, bump_dir=dirs).column('bump_dir'), dirs)
+
+
+def test_win_rate_by_vector_param_grid():
+    params, grid = param_grid(3, bump_dir=[(-1.0, 1.25), (-1.0, 2.0)], opp_speed=[4.0, 6.0])
+    assert params.column('bump_dir').shape == (12, 2)
+    result = BatchRallySim(params, seed=0).run(1)
+    rates = win_rate_by(result, grid)
+    assert set(rates) == {
+        (('bump_dir', (-1.0, 1.25)), ('opp_speed', 4.0)),
+        (('bump_dir', (-1.0, 1.25)), ('opp_speed', 6.0)),
+        (('bump_dir', (-1.0, 2.0)), ('opp_speed', 4.0)),
+        (('bump_dir', (-1.0, 2.0)), ('opp_speed', 6.0)),
+    }
@@ -0,0 +1,48 @@
+import pytest
+
+import diagnostics
+import sim
+from diagnostics import SOAK_GAUGES, LeakError, soak
+
+
+def test_short_soak_has_no_growth():
+    diag, before, after = soak(points=5, warmup=3)
+    for name in ("collision.zones", "planner.plans", "match.listeners", "python_kib"):
+        assert name in after.counts
+    diag.assert_no_growth(before, after, heap_kib=64, ignore=("gc_objects", *SOAK_GAUGES))
+    diag.assert_at_most(after, SOAK_GAUGES)
+
+
+def test_soak_command_passes(capsys):
+    diagnostics.main(["soak", "--points", "5"])
+    assert capsys.readouterr().out.rstrip().endswith("no growth")
+
+
+def test_soak_command_fails_on_a_leak(monkeypatch):
+    play_point = sim.Match.play_point
+
+    def leaky(self, *args, **kwargs):
+        self.listeners.append(lambda event, data: None)     # never removed
+        return play_point(self, *args, **kwargs)
+
+    monkeypatch.setattr(sim.Match, "play_point", leaky)
+    with pytest.raises(SystemExit, match="LEAK: .*match.listeners \\+5"):
+        diagnostics.main(["soak", "--points", "5"])
+
+
+def test_soak_command_fails_on_a_gauge_over_its_cap(monkeypatch):
+    monkeypatch.setattr(diagnostics, "SOAK_GAUGES", {"collision.zones": -1})
+    with pytest.raises(SystemExit, match="LEAK: .*collision.zones"):
+        diagnostics.main(["soak", "--points", "5"])
+
+
+def test_growth_past_slack_raises():
+    diag = diagnostics.Diagnostics()
+    things = []
+    diag.watch("test", lambda: {"things": len(things)})
+    before = diag.sample("before")
+    things.extend(range(3))
+    after = diag.sample("after")
+    diag.assert_no_growth(before, after, slack={"test.things": 3})
+    with pytest.raises(LeakError, match="test.things \\+3 \\(allowed 2\\)"):
+        diag.assert_no_growth(before, after, slack={"test.things": 2})
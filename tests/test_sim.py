@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import sim
+from sim import Vec3
+
+
+def squad_shot(dt, ticks, frozen=False):
+    """A 60 u/s ball fired sideways through the first player-side squad player's hit zone."""
+    match = sim.Match(rng=random.Random(0), team_size=3)
+    match.do_serve()
+    squad = match.squad
+    row = squad.rows[0].start
+    squad.freeze[row] = frozen
+    x, _, z = squad.position[row].tolist()
+    for actor in match.actors:
+        actor.position = Vec3(actor.x, 1, -9)    # nobody else near
+    match.ball.position = Vec3(x, 3, z + 2.2)
+    match.ball.velocity = Vec3(0, 0, -60)
+    for _ in range(ticks):
+        match.step(dt)
+    return match, row
+
+
+@pytest.mark.parametrize("dt", [1 / 60, 1 / 20])
+def test_fast_ball_does_not_tunnel_through_squad_player(dt):
+    match, row = squad_shot(dt, round(0.1 / dt))
+    assert match.squad.has_hit[row]
+    assert match.team_touches["player"] == 1
+    assert match.ball.velocity.z > -60
+
+
+def test_frozen_squad_player_lets_the_ball_through():
+    match, row = squad_shot(1 / 20, 2, frozen=True)
+    assert not match.squad.has_hit[row]
+    assert match.team_touches["player"] == 0
+    # the ball kept its full flight: two ticks of 3 units each
+    assert match.ball.z == pytest.approx(match.squad.position[row, 2] + 2.2 - 6)
@@ -0,0 +1,9 @@
+from tournament import play_match
+
+
+def test_tie_at_max_points_is_decided_by_the_next_point():
+    stats = play_match(0, 12, points_to_win=50, max_points=4)
+    assert (stats["player_score"], stats["ai_score"]) == (2, 3)
+    assert stats["winner"] == "ai"
+    assert stats["rallies"] == 5
+    assert sum(stats["serves"].values()) == stats["rallies"]
@@ -0,0 +1,155 @@
+"""
+Headless tournament runner.
+
+Plays many full bot-vs-AI matches across a process pool. Each match gets
+its own random.Random seeded from (master seed, match index), so the whole
+run is reproducible from one number no matter how many workers there are
+or which order matches finish in.
+
+    python tournament.py --matches 512 --seed 7 --workers 64
+"""
+import argparse
+import hashlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import sim
+
+POINTS_TO_WIN = 25
+WIN_BY = 2
+
+
+def match_seed(master_seed, index):
+    """Independent 64-bit seed for match number index."""
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def play_match(index, seed, points_to_win=POINTS_TO_WIN, win_by=WIN_BY,
+               dt=1 / 60, max_points=200):
+    """
+    Play one full match headless and return its stats as a plain dict.
+
+    A rally that times out is replayed and only counted in "timeouts";
+    its serve and touches don't count. After max_points points the
+    leader wins without the win_by margin, and a tie goes to whoever wins
+    the next point.
+    """
+    match = sim.Match(rng=random.Random(seed), player_bot=True, serve_delay=0)
+    stats = {
+        "index": index,
+        "seed": seed,
+        "rallies": 0,
+        "timeouts": 0,
+        "rally_time": 0.0,
+        "touches": 0,
+        "spikes": 0,
+        "serves": {"player": 0, "ai": 0},
+        "serve_wins": {"player": 0, "ai": 0},
+    }
+    rally = {"server": None, "touches": 0, "spikes": 0}    # kept once the rally ends in a point
+
+    def on_event(event, data):
+        if event == "serve":
+            rally.update(server=data["server"], touches=0, spikes=0)
+        elif event in ("bump", "spike"):
+            rally["touches"] += 1
+            rally["spikes"] += event == "spike"
+        elif event == "point":
+            server = rally["server"]
+            stats["rallies"] += 1
+            stats["rally_time"] += data["rally_time"]
+            stats["touches"] += rally["touches"]
+            stats["spikes"] += rally["spikes"]
+            stats["serves"][server] += 1
+            if data["to"] == server:
+                stats["serve_wins"][server] += 1
+
+    match.listeners.append(on_event)
+
+    while True:
+        p, a = match.player_score, match.ai_score
+        if max(p, a) >= points_to_win and abs(p - a) >= win_by:
+            break
+        if match.points_played >= max_points and p != a:
+            break
+        if match.play_point(dt) is None:
+            # Stuck rally: replay it rather than letting the match hang
+            stats["timeouts"] += 1
+            match.reset_for_serve()
+
+    stats["player_score"] = match.player_score
+    stats["ai_score"] = match.ai_score
+    stats["winner"] = "player" if match.player_score > match.ai_score else "ai"
+    return stats
+
+
+def _play(args):
+    return play_match(*args)
+
+
+def summarize(results):
+    """Merge per-match stats into one summary dict."""
+    n = len(results)
+    rallies = sum(r["rallies"] for r in results)
+    points = sum(r["player_score"] + r["ai_score"] for r in results)
+    serves = {side: sum(r["serves"][side] for r in results) for side in ("player", "ai")}
+    serve_wins = {side: sum(r["serve_wins"][side] for r in results) for side in ("player", "ai")}
+    total_serves = serves["player"] + serves["ai"]
+    return {
+        "matches": n,
+        "player_win_rate": sum(r["winner"] == "player" for r in results) / n if n else 0.0,
+        "points": points,
+        "rallies": rallies,
+        "timeouts": sum(r["timeouts"] for r in results),
+        "timeouts_per_match": sum(r["timeouts"] for r in results) / n if n else 0.0,
+        "points_per_match": points / n if n else 0.0,
+        "touches_per_rally": sum(r["touches"] for r in results) / rallies if rallies else 0.0,
+        "spikes_per_rally": sum(r["spikes"] for r in results) / rallies if rallies else 0.0,
+        "mean_rally_time": sum(r["rally_time"] for r in results) / points if points else 0.0,
+        "serve_win_pct": 100 * (serve_wins["player"] + serve_wins["ai"]) / total_serves if total_serves else 0.0,
+        "player_serve_win_pct": 100 * serve_wins["player"] / serves["player"] if serves["player"] else 0.0,
+        "ai_serve_win_pct": 100 * serve_wins["ai"] / serves["ai"] if serves["ai"] else 0.0,
+    }
+
+
+def run_tournament(matches, master_seed=0, workers=None, points_to_win=POINTS_TO_WIN, win_by=WIN_BY):
+    """
+    Play matches on a process pool. Returns (summary, per-match results).
+
+    Results are ordered by match index, so the summary only depends on
+    master_seed and the rules, not on scheduling.
+    """
+    jobs = [(i, match_seed(master_seed, i), points_to_win, win_by) for i in range(matches)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [_play(job) for job in jobs]
+    else:
+        chunksize = max(1, matches // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play, jobs, chunksize=chunksize))
+    results.sort(key=lambda r: r["index"])
+    return summarize(results), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless bot-vs-AI matches in parallel.")
+    parser.add_argument("--matches", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--points", type=int, default=POINTS_TO_WIN, help="points to win a match")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary, _ = run_tournament(args.matches, args.seed, args.workers, args.points)
+    elapsed = time.perf_counter() - start
+
+    for key, value in summary.items():
+        print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+    print(f"{'elapsed':>22}: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Training environments for a learned AI spiker.
+
+A gym-style reset()/step() API over sim.Match, with the AI spiker
+(LearnedOpponent) driven by actions instead of Opponent.update_ai and
+hit_ball. VectorEnv steps K envs in this process; SubprocVectorEnv spreads
+them over worker processes through shared memory. watch() plays a policy
+back in the game.
+
+No gym/gymnasium dependency: the API follows Gymnasium's conventions
+(step returns obs, reward, terminated, truncated, info) so it wraps
+easily.
+
+    python -m training bench --envs 64 --steps 500 --workers 4
+    python -m training watch --policy training.env:chase_policy
+"""
+from training.env import (ACTION_SIZE, OBS_SIZE, LearnedOpponent, VolleyEnv, chase_policy,
+                          observe)
+from training.render import watch
+from training.vector import SubprocVectorEnv, VectorEnv
@@ -0,0 +1,67 @@
+"""
+python -m training bench [--envs K] [--steps N] [--workers W] [--policy MODULE:NAME]
+python -m training watch [--policy MODULE:NAME]
+
+bench steps K envs N times with the policy (default: chase_policy) and
+reports env steps and sim ticks per second plus the AI's point record.
+With --workers 0 everything runs in this process. watch plays the policy
+as the AI spiker in the game.
+"""
+import argparse
+import importlib
+
+import numpy as np
+
+from training.render import watch
+from training.vector import SubprocVectorEnv, VectorEnv
+
+
+def load_policy(spec):
+    """"package.module:name" -> the callable it names."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def bench(args):
+    policy = load_policy(args.policy)
+    if args.workers:
+        envs = SubprocVectorEnv(args.envs, args.workers, seed=args.seed)
+    else:
+        envs = VectorEnv(args.envs, seed=args.seed)
+    wins = losses = 0
+    with envs:
+        obs, _ = envs.reset()
+        for _ in range(args.steps):
+            obs, rewards, terminated, truncated, info = envs.step(policy(obs))
+            winners = info["winner"]
+            wins += int(np.count_nonzero(winners == 1))
+            losses += int(np.count_nonzero(winners == -1))
+        kind = f"{args.workers} workers" if args.workers else "in process"
+        print(f"{args.envs} envs ({kind}): {envs.steps_per_second():,.0f} steps/s  "
+              f"{envs.ticks_per_second():,.0f} ticks/s (at most)")
+    print(f"points: AI {wins}  player side {losses}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m training", description="Training environments for the AI spiker.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("bench", help="step K envs and report throughput")
+    p.add_argument("--envs", type=int, default=64)
+    p.add_argument("--steps", type=int, default=500)
+    p.add_argument("--workers", type=int, default=0, help="worker processes (0: in process)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--policy", default="training.env:chase_policy")
+
+    p = sub.add_parser("watch", help="play a policy as the AI spiker in the game")
+    p.add_argument("--policy", default="training.env:chase_policy")
+
+    args = parser.parse_args(argv)
+    if args.command == "bench":
+        bench(args)
+    else:
+        watch(load_policy(args.policy))
+
+
+if __name__ == "__main__":
+    main()
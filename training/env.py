@@ -0,0 +1,197 @@
+"""
+One training environment: a sim.Match whose AI spiker is driven by actions.
+
+LearnedOpponent takes the place of sim.Opponent. Instead of running to the
+planner's intercept and choosing spike or bump at random, it moves and
+attacks the way its action says. Everything else is plain sim.Match: the
+player side is on autopilot (player_bot), both support players are
+planned as usual, and the rules are unchanged.
+
+An episode is one rally. step() plays `action_repeat` ticks with the same
+action. When a rally ends (terminated), or runs past max_rally_time
+(truncated), the next serve is played automatically, so the observation
+returned is already the first one of the next rally. reset() only needs
+calling once, or to reseed.
+
+Observations are float32 vectors of OBS_SIZE (see observe()), written
+into a buffer the env owns or is given, with no new array per step.
+Actions are float32 vectors of ACTION_SIZE:
+
+    0, 1  move x, z           -1..1, times the opponent's speed
+    2     swing               > 0: play the ball if it is in the hit zone
+    3     attack              > 0: spike, else bump
+    4     aim                 -1..1, sideways, scaled to Opponent's +-0.3
+"""
+import random
+
+import numpy as np
+
+import sim
+
+OBS_SIZE = 20
+ACTION_SIZE = 5
+ACTION_REPEAT = 4       # ticks per step: the agent acts at 15 Hz
+MAX_RALLY_TIME = 30.0
+TOUCH_REWARD = 0.1      # per clean opponent touch, on top of +-1 for the point
+MAX_SERVE_TICKS = 600
+
+POS_SCALE = (sim.COURT_HALF_X, 10.0, sim.COURT_HALF_Z)
+VEL_SCALE = 15.0
+
+
+def observe(match, out):
+    """Write match's observation into out, a float32 array of OBS_SIZE."""
+    ball, opponent = match.ball, match.opponent
+    p, v = ball.position, ball.velocity
+    sx, sy, sz = POS_SCALE
+    mate, player, player_mate = match.opponent_teammate, match.player, match.player_teammate
+    out[:] = (
+        p.x / sx, p.y / sy, p.z / sz,
+        v.x / VEL_SCALE, v.y / VEL_SCALE, v.z / VEL_SCALE,
+        opponent.x / sx, opponent.z / sz,
+        max(opponent.hit_cooldown, 0.0) / opponent.cooldown_duration,
+        mate.x / sx, mate.z / sz,
+        player.x / sx, player.z / sz,
+        player_mate.x / sx, player_mate.z / sz,
+        match.touches["ai"] / 3, match.touches["player"] / 3,
+        1.0 if match.serve_mode else 0.0,
+        1.0 if match.server == "ai" else 0.0,
+        match.rally_time / MAX_RALLY_TIME,
+    )
+    return out
+
+
+class LearnedOpponent(sim.Opponent):
+    """
+    The AI spiker, moved and swung by self.action. With a policy it fills
+    in its own action every action_repeat ticks: policy(observation) ->
+    action. That is how a trained policy plays inside the game.
+    """
+
+    planned = False     # the planner leaves us alone
+
+    def __init__(self, policy=None, action_repeat=ACTION_REPEAT):
+        super().__init__()
+        self.policy = policy
+        self.action_repeat = action_repeat
+        self.action = np.zeros(ACTION_SIZE, dtype=np.float32)
+        self.obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        self.ticks = 0
+
+    def update_ai(self, match, dt):
+        if match.serve_mode:
+            return
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= dt
+        if self.policy is not None and self.ticks % self.action_repeat == 0:
+            self.action[:] = self.policy(observe(match, self.obs))
+        self.ticks += 1
+
+        # floats, not NumPy scalars, go into the sim
+        move_x = min(max(float(self.action[0]), -1.0), 1.0)
+        move_z = min(max(float(self.action[1]), -1.0), 1.0)
+        p = self.position
+        step = self.speed * dt
+        p.x = min(max(p.x + move_x * step, 0.5), sim.COURT_HALF_X + 5)     # stay on our side
+        p.z = min(max(p.z + move_z * step, -sim.COURT_HALF_Z - 5), sim.COURT_HALF_Z + 5)
+
+    def on_contact(self, match):
+        if self.action[2] > 0:
+            super().on_contact(match)
+
+    def choose_attack(self, match):
+        aim = min(max(float(self.action[4]), -1.0), 1.0)
+        return bool(self.action[3] > 0), 0.3 * aim
+
+
+def chase_policy(obs):
+    """
+    Hand-written baseline: stand under the ball while it is on our side,
+    otherwise go back to the start spot; always swing, spike when the ball
+    is high. Works on one observation or a batch.
+    """
+    obs = np.asarray(obs, dtype=np.float32)
+    sx, sy, sz = POS_SCALE
+    ball_x, ball_y, ball_z = obs[..., 0] * sx, obs[..., 1] * sy, obs[..., 2] * sz
+    x, z = obs[..., 6] * sx, obs[..., 7] * sz
+    ours = ball_x > 0
+    home_x, _, home_z = sim.OPPONENT_START
+    target_x = np.where(ours, ball_x, home_x)
+    target_z = np.where(ours, ball_z - sim.Actor.zone_offset[2], home_z)
+    action = np.zeros(obs.shape[:-1] + (ACTION_SIZE,), dtype=np.float32)
+    action[..., 0] = np.clip((target_x - x) * 2, -1, 1)
+    action[..., 1] = np.clip((target_z - z) * 2, -1, 1)
+    action[..., 2] = 1.0
+    action[..., 3] = np.where(ball_y > 3.0, 1.0, -1.0)
+    return action
+
+
+class VolleyEnv:
+    def __init__(self, seed=None, action_repeat=ACTION_REPEAT, max_rally_time=MAX_RALLY_TIME,
+                 touch_reward=TOUCH_REWARD, team_size=2, dt=1 / 60, obs=None):
+        self.action_repeat = action_repeat
+        self.max_rally_time = max_rally_time
+        self.touch_reward = touch_reward
+        self.team_size = team_size
+        self.dt = dt
+        self.obs = obs if obs is not None else np.zeros(OBS_SIZE, dtype=np.float32)
+        self.ticks = 0
+        self.rallies = 0
+        self.winner = None
+        self.touched = 0
+        self.new_match(seed)
+
+    def new_match(self, seed):
+        self.seed = seed
+        self.opponent = LearnedOpponent(action_repeat=self.action_repeat)
+        self.match = sim.Match(rng=random.Random(seed), player_bot=True, serve_delay=0.0,
+                               team_size=self.team_size, opponent=self.opponent, dt=self.dt)
+        self.match.listeners.append(self.on_event)
+
+    def on_event(self, event, data):
+        # a fourth touch awards the point without a bump/spike event, so it doesn't count
+        if event == "point":
+            self.winner = data["to"]
+        elif event in ("bump", "spike") and data["actor"] == "opponent":
+            self.touched += 1
+
+    def reset(self, seed=None):
+        """Start a new match if seeded, then play up to the first observation of a rally."""
+        if seed is not None:
+            self.new_match(seed)
+        self.serve()
+        return observe(self.match, self.obs), {}
+
+    def serve(self):
+        match = self.match
+        for _ in range(MAX_SERVE_TICKS):
+            if not match.serve_mode:
+                break
+            match.step(self.dt)
+            self.ticks += 1
+        self.winner = None
+        self.touched = 0
+
+    def step(self, action):
+        """(obs, reward, terminated, truncated, info). obs is the env's own buffer."""
+        match = self.match
+        self.opponent.action[:] = action
+        for _ in range(self.action_repeat):
+            match.step(self.dt)
+            self.ticks += 1
+            if self.winner is not None:
+                break
+        winner = self.winner
+        reward = self.touch_reward * self.touched
+        terminated = winner is not None
+        truncated = not terminated and match.rally_time > self.max_rally_time
+        if terminated:
+            reward += 1.0 if winner == "ai" else -1.0
+        if terminated or truncated:
+            self.rallies += 1
+            if truncated:
+                match.reset_for_serve()
+            self.serve()
+        else:
+            self.touched = 0
+        return observe(match, self.obs), reward, terminated, truncated, {"winner": winner}
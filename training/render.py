@@ -0,0 +1,19 @@
+"""
+Play a policy back in the Ursina scene.
+
+The policy drives a LearnedOpponent inside the normal game, so it can be
+watched (and played against) exactly as the training env sees it.
+
+    from training import chase_policy, watch
+    watch(chase_policy)
+"""
+from training.env import ACTION_REPEAT, LearnedOpponent
+
+
+def watch(policy, action_repeat=ACTION_REPEAT, **settings):
+    """Open the game with policy(observation) -> action playing the AI spiker."""
+    from game import GameConfig, create_game
+
+    opponent = LearnedOpponent(policy, action_repeat)
+    game = create_game(GameConfig(opponent=opponent, **settings))
+    game.run()
@@ -0,0 +1,207 @@
+"""
+K environments stepped as one.
+
+Both variants keep their results in preallocated arrays and return the
+same arrays every step, so they are overwritten by the next one. Copy
+anything you want to keep:
+
+    obs          (K, OBS_SIZE) float32
+    rewards      (K,) float32
+    terminated   (K,) bool
+    truncated    (K,) bool
+    winners      (K,) int8: 1 AI won the point, -1 the player side, 0 none
+
+VectorEnv runs every env in this process. SubprocVectorEnv splits them
+over worker processes. The arrays and the actions live in one
+shared-memory block that the workers write into directly, so a step sends
+one short message to each worker and one back, and no array is pickled.
+
+    envs = VectorEnv(64, seed=0)
+    obs, _ = envs.reset()
+    for _ in range(1000):
+        obs, rewards, terminated, truncated, info = envs.step(policy(obs))
+    print(envs.steps_per_second())
+"""
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from training.env import ACTION_REPEAT, ACTION_SIZE, OBS_SIZE, VolleyEnv
+
+WINNER_CODE = {None: 0, "ai": 1, "player": -1}
+
+
+def _fields(num_envs):
+    return (
+        ("obs", (num_envs, OBS_SIZE), np.float32),
+        ("actions", (num_envs, ACTION_SIZE), np.float32),
+        ("rewards", (num_envs,), np.float32),
+        ("terminated", (num_envs,), np.bool_),
+        ("truncated", (num_envs,), np.bool_),
+        ("winners", (num_envs,), np.int8),
+    )
+
+
+def _buffer_size(num_envs):
+    return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in _fields(num_envs))
+
+
+def _arrays(num_envs, buffer=None):
+    """name -> array, laid out one after another in buffer (or fresh memory)."""
+    if buffer is None:
+        buffer = bytearray(_buffer_size(num_envs))
+    arrays, offset = {}, 0
+    for name, shape, dtype in _fields(num_envs):
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += arrays[name].nbytes
+    return arrays
+
+
+def _make_envs(arrays, first, count, seed, env_kwargs):
+    return [VolleyEnv(seed=seed + i, obs=arrays["obs"][i], **env_kwargs) for i in range(first, first + count)]
+
+
+def _step_envs(envs, first, arrays):
+    actions, rewards = arrays["actions"], arrays["rewards"]
+    terminated, truncated, winners = arrays["terminated"], arrays["truncated"], arrays["winners"]
+    for i, env in enumerate(envs, first):
+        _, rewards[i], terminated[i], truncated[i], info = env.step(actions[i])
+        winners[i] = WINNER_CODE[info["winner"]]
+
+
+class _Vector:
+    """What both variants share: step timing and with-statement support."""
+
+    def _start_timing(self):
+        self.steps = 0
+        self.step_time = 0.0
+
+    def steps_per_second(self):
+        """Env steps (one per env per step() call) per second of stepping."""
+        return self.steps / self.step_time if self.step_time else 0.0
+
+    def ticks_per_second(self):
+        """Sim ticks per second of stepping, at most action_repeat per env step."""
+        return self.steps_per_second() * self.action_repeat
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class VectorEnv(_Vector):
+    def __init__(self, num_envs, seed=0, **env_kwargs):
+        self.num_envs = num_envs
+        self.arrays = _arrays(num_envs)
+        self.envs = _make_envs(self.arrays, 0, num_envs, seed, env_kwargs)
+        self.action_repeat = self.envs[0].action_repeat
+        self.__dict__.update(self.arrays)
+        self._start_timing()
+
+    def reset(self, seed=None):
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+        return self.obs, {}
+
+    def step(self, actions):
+        start = time.perf_counter()
+        self.actions[:] = actions
+        _step_envs(self.envs, 0, self.arrays)
+        self.steps += self.num_envs
+        self.step_time += time.perf_counter() - start
+        return self.obs, self.rewards, self.terminated, self.truncated, {"winner": self.winners}
+
+
+def _worker(conn, shm_name, num_envs, first, count, seed, env_kwargs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _arrays(num_envs, shm.buf)
+    envs = _make_envs(arrays, first, count, seed, env_kwargs)
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == "step":
+                _step_envs(envs, first, arrays)
+            elif command == "reset":
+                for i, env in enumerate(envs, first):
+                    env.reset(None if arg is None else arg + i)
+            elif command == "close":
+                break
+            conn.send(None)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del arrays, envs
+        shm.close()
+        conn.close()
+
+
+class SubprocVectorEnv(_Vector):
+    def __init__(self, num_envs, workers=2, seed=0, **env_kwargs):
+        workers = max(1, min(workers, num_envs))
+        self.num_envs = num_envs
+        self.action_repeat = env_kwargs.get("action_repeat", ACTION_REPEAT)
+        self.shm = shared_memory.SharedMemory(create=True, size=_buffer_size(num_envs))
+        self.arrays = _arrays(num_envs, self.shm.buf)
+        self.__dict__.update(self.arrays)
+        self._start_timing()
+
+        context = multiprocessing.get_context()
+        self.conns, self.processes = [], []
+        per, extra = divmod(num_envs, workers)
+        first = 0
+        for w in range(workers):
+            count = per + (w < extra)
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True, name=f"env-worker-{w}",
+                                      args=(child, self.shm.name, num_envs, first, count, seed, env_kwargs))
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+            first += count
+
+    def _all(self, command, arg=None):
+        for conn in self.conns:
+            conn.send((command, arg))
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self, seed=None):
+        self._all("reset", seed)
+        return self.obs, {}
+
+    def step(self, actions):
+        start = time.perf_counter()
+        self.actions[:] = actions
+        self._all("step")
+        self.steps += self.num_envs
+        self.step_time += time.perf_counter() - start
+        return self.obs, self.rewards, self.terminated, self.truncated, {"winner": self.winners}
+
+    def close(self):
+        if self.shm is None:
+            return
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(5)
+        for name in self.arrays:
+            self.__dict__.pop(name, None)
+        self.arrays = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass    # a caller still holds one of the arrays; the mapping goes when they do
+        self.shm.unlink()
+        self.shm = None
@@ -0,0 +1,143 @@
+"""
+Closed-form ball path prediction.
+
+Between touches the ball is a parabola, so instead of stepping a copy of
+the ball forward every frame the path is solved directly: time to reach
+the floor from the quadratic, time to reach the net from the linear x
+motion, then the bounce and the next arc. The result is cached on the
+ball's version counter and only recomputed when a hit, bounce or net
+contact changes the flight.
+
+The vertical velocity is offset by half a tick of gravity so the arc
+lands on exactly the positions the sim's (semi-implicit Euler) step
+produces at each tick.
+"""
+import math
+
+from sim import (BALL_RADIUS, BOUNCE, FLOOR_Y, GRAVITY, NET_BOUNCE, NET_HALF,
+                 NET_POS, NET_TOP)
+
+LANDING_Y = FLOOR_Y + BALL_RADIUS   # ball centre height when it touches the floor
+MAX_FLIGHT = 30.0                   # seconds, only matters if GRAVITY is set to 0
+
+
+def _floor_time(y, vy, g, h=LANDING_Y):
+    """Later root of y + vy t - g/2 t^2 = h, or 0 if the ball is already below."""
+    if g <= 0:
+        return MAX_FLIGHT
+    disc = vy * vy + 2 * g * (y - h)
+    if disc < 0:
+        return 0.0
+    return max((vy + math.sqrt(disc)) / g, 0.0)
+
+
+def _net_time(p, v, g, t_max):
+    """When the ball's surface reaches the net face it's heading for, if it hits it."""
+    vx = v[0]
+    if vx == 0:
+        return None
+    face = NET_POS[0] - math.copysign(NET_HALF[0] + BALL_RADIUS, vx)
+    t = (face - p[0]) / vx
+    if t <= 0 or t >= t_max:
+        return None
+    y = p[1] + v[1] * t - 0.5 * g * t * t
+    z = p[2] + v[2] * t
+    if y <= NET_TOP and y >= NET_POS[1] - NET_HALF[1] and abs(z) <= NET_HALF[2] + BALL_RADIUS:
+        return t
+    return None
+
+
+class Trajectory:
+    """
+    Piecewise parabola starting at (position, velocity) at time start.
+
+    segments are (t0, t1, p, v) with p/v the state at t0. landing_point and
+    landing_time are where and when the ball first reaches the floor.
+    """
+
+    def __init__(self, position, velocity, start=0.0, dt=1 / 60, bounces=1, gravity=GRAVITY):
+        self.start = start
+        self.gravity = g = gravity
+        self.segments = []
+        self.landing_point = None
+        self.landing_time = None
+
+        p = tuple(position)
+        v = (velocity[0], velocity[1] - 0.5 * g * dt, velocity[2])
+        t0 = start
+        floors = 0
+        for _ in range(bounces + 4):    # a couple of net hits on top of the bounces
+            t_floor = _floor_time(p[1], v[1], g)
+            t_net = _net_time(p, v, g, t_floor)
+            t = t_floor if t_net is None else t_net
+            self.segments.append((t0, t0 + t, p, v))
+
+            end = self._at(p, v, t)
+            vy_end = v[1] - g * t
+            if t_net is None:
+                if self.landing_point is None:
+                    self.landing_point = end
+                    self.landing_time = t0 + t
+                floors += 1
+                if floors > bounces or t == 0:
+                    break
+                v = (v[0], vy_end * BOUNCE, v[2])
+            else:
+                v = (v[0] * NET_BOUNCE, vy_end, v[2])
+            p = end
+            t0 += t
+
+    def _at(self, p, v, t):
+        return (p[0] + v[0] * t,
+                p[1] + v[1] * t - 0.5 * self.gravity * t * t,
+                p[2] + v[2] * t)
+
+    @property
+    def end(self):
+        return self.segments[-1][1]
+
+    def position_at(self, t):
+        """Predicted ball position at absolute time t (clamped to the path)."""
+        for t0, t1, p, v in self.segments:
+            if t <= t1:
+                return self._at(p, v, max(t - t0, 0))
+        t0, t1, p, v = self.segments[-1]
+        return self._at(p, v, t1 - t0)
+
+    def sample(self, n, since=None):
+        """n points evenly spread in time over the path (from since, if given)."""
+        a = self.start if since is None else max(since, self.start)
+        b = self.end
+        if n < 2 or b <= a:
+            return [self.position_at(a)] * max(n, 1)
+        step = (b - a) / (n - 1)
+        return [self.position_at(a + i * step) for i in range(n)]
+
+
+class TrajectoryPredictor:
+    """Keeps a Trajectory for a sim ball, rebuilt only when its version changes."""
+
+    def __init__(self, dt=1 / 60, bounces=1):
+        self.dt = dt
+        self.bounces = bounces
+        self.version = None
+        self.trajectory = None
+        self.rebuilds = 0
+
+    def update(self, ball, now):
+        """Returns True if the path was recomputed."""
+        if ball.version == self.version and self.trajectory is not None:
+            return False
+        self.version = ball.version
+        self.trajectory = Trajectory(ball.position, ball.velocity, now, self.dt, self.bounces)
+        self.rebuilds += 1
+        return True
+
+    @property
+    def landing_point(self):
+        return self.trajectory.landing_point if self.trajectory else None
+
+    def time_to_land(self, now):
+        if self.trajectory is None or self.trajectory.landing_time is None:
+            return None
+        return max(self.trajectory.landing_time - now, 0.0)
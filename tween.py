@@ -0,0 +1,256 @@
+"""
+Data-driven animation clips and the one scheduler that plays them.
+
+A clip is plain data: for each property path, a list of keyframes
+(time, value[, curve]). It is compiled once into segments. The value may be:
+
+    a tuple     the property's value at that time
+    None        whatever the property holds when the clip plays (first key only)
+    a str       a value passed to play() under that name
+
+Each key's curve shapes the segment that ends at it; "step" jumps at the
+key time. The "events" track lists (time, method name) instead: the
+method is called on the bound object at that time.
+
+    BUMP = Clip("bump", {
+        "arm_left.position": [(0, None), (0.08, (-0.25, -0.25, 0.4)), (0.3, (-.75, -.6, -1), "out_expo")],
+    })
+    timeline.play(BUMP, player_view, key="arms")
+    ...every frame: timeline.update(dt)
+
+Playing a clip under a key that is still playing cancels the older one
+first. Segments that pick up "from the current value" start from wherever
+the cancelled one left off, so rapid retriggers blend instead of stacking.
+
+Segments wait on a timer wheel until they start. Each frame,
+Timeline.update() moves the due ones to the active list and advances
+every active tween in a single pass. The module is render-free: tweens
+set attributes on whatever objects they are bound to.
+"""
+import math
+
+WHEEL_SLOTS = 64
+WHEEL_RESOLUTION = 1 / 60   # seconds per wheel slot
+
+
+def linear(t):
+    return t
+
+
+def out_expo(t):
+    return 1.0 if t >= 1 else 1 - 2 ** (-10 * t)
+
+
+def in_expo(t):
+    return 0.0 if t <= 0 else 2 ** (10 * (t - 1))
+
+
+def step(t):
+    return 1.0 if t >= 1 else 0.0
+
+
+CURVES = {"linear": linear, "out_expo": out_expo, "in_expo": in_expo, "step": step}
+
+
+class Segment:
+    __slots__ = ('path', 'attr', 'start', 'end', 'source', 'value', 'curve')
+
+    def __init__(self, path, attr, start, end, source, value, curve):
+        self.path = path        # attribute names from the bound object to the animated one
+        self.attr = attr
+        self.start = start
+        self.end = end
+        self.source = source    # None: the property's value when the segment starts
+        self.value = value
+        self.curve = curve
+
+
+class Clip:
+    """Keyframe tracks compiled into segments, ordered by start time."""
+
+    def __init__(self, name, tracks):
+        self.name = name
+        self.segments = []
+        self.events = []        # (time, method name)
+        self.length = 0.0
+        for prop, keys in tracks.items():
+            if prop == "events":
+                self.events = sorted(keys)
+                self.length = max([self.length] + [t for t, _ in keys])
+                continue
+            *path, attr = prop.split(".")
+            keys = [(k[0], k[1], CURVES[k[2]] if len(k) > 2 else linear) for k in keys]
+            first_time, first_value, _ = keys[0]
+            if first_value is not None:
+                # the first key sets its value outright
+                self.segments.append(Segment(tuple(path), attr, first_time, first_time, first_value, first_value, step))
+            previous = first_value
+            for (t0, _, _), (t1, value, curve) in zip(keys, keys[1:]):
+                if value != previous:   # repeated keys are holds: nothing to play
+                    self.segments.append(Segment(tuple(path), attr, t0, t1, previous, value, curve))
+                previous = value
+            self.length = max(self.length, keys[-1][0])
+        self.segments.sort(key=lambda s: s.start)
+
+
+class Playing:
+    """One play() of a clip: its bound object, parameters and cancelled flag."""
+    __slots__ = ('clip', 'root', 'params', 'key', 'started', 'cancelled', 'remaining')
+
+    def __init__(self, clip, root, params, key, started):
+        self.clip = clip
+        self.root = root
+        self.params = params
+        self.key = key
+        self.started = started
+        self.cancelled = False
+        self.remaining = len(clip.segments) + len(clip.events)
+
+
+class Tween:
+    __slots__ = ('playing', 'segment', 'target', 'start', 'end', 'source', 'value')
+
+    def __init__(self, playing, segment, target):
+        self.playing = playing
+        self.segment = segment
+        self.target = target
+        self.start = playing.started + segment.start
+        self.end = playing.started + segment.end
+        self.source = None
+        self.value = None
+
+
+class Timeline:
+    def __init__(self, slots=WHEEL_SLOTS, resolution=WHEEL_RESOLUTION):
+        self.time = 0.0
+        self.resolution = resolution
+        self.wheel = [[] for _ in range(slots)]
+        self.tick = 0               # wheel slot the clock is in
+        self.waiting = 0            # entries on the wheel
+        self.active = []            # tweens being advanced
+        self.playing = {}           # key -> Playing
+        self.plays = 0
+        self.cancels = 0
+
+    @property
+    def active_count(self):
+        return len(self.active)
+
+    def play(self, clip, root, key=None, **params):
+        """Start clip on root. A clip already playing under key is cancelled."""
+        if key is not None:
+            self.cancel(key)
+        playing = Playing(clip, root, params, key, self.time)
+        if key is not None:
+            self.playing[key] = playing
+        self.plays += 1
+        for segment in clip.segments:
+            target = root
+            for name in segment.path:
+                target = getattr(target, name)
+            self._schedule(Tween(playing, segment, target))
+        for t, method in clip.events:
+            self._schedule((playing.started + t, playing, method))
+        if not clip.segments and not clip.events:
+            self._finish(playing)
+        return playing
+
+    def cancel(self, key):
+        """Stop the clip playing under key where it is. Its tweens are dropped as they come up."""
+        playing = self.playing.pop(key, None)
+        if playing is not None:
+            playing.cancelled = True
+            self.cancels += 1
+
+    def _schedule(self, entry):
+        due = entry.start if isinstance(entry, Tween) else entry[0]
+        tick = math.ceil(due / self.resolution - 1e-9)
+        if tick <= self.tick:
+            self._start(entry)      # due now
+            return
+        self.wheel[tick % len(self.wheel)].append(entry)
+        self.waiting += 1
+
+    def _start_due(self, tick):
+        """Start the entries in tick's slot that are due by now; later laps stay put."""
+        slot = self.wheel[tick % len(self.wheel)]
+        if not slot:
+            return
+        later = []
+        for entry in slot:
+            due = entry.start if isinstance(entry, Tween) else entry[0]
+            if due > self.time + 1e-9:
+                later.append(entry)
+            else:
+                self.waiting -= 1
+                self._start(entry)
+        slot[:] = later
+
+    def _start(self, entry):
+        if isinstance(entry, Tween):
+            if not entry.playing.cancelled:
+                self._begin(entry)
+            return
+        _, playing, method = entry
+        if not playing.cancelled:
+            getattr(playing.root, method)()
+            self._done(playing)
+
+    def _begin(self, tween):
+        segment = tween.segment
+        params = tween.playing.params
+        source, value = segment.source, segment.value
+        if source is None:
+            source = tuple(getattr(tween.target, segment.attr))
+        elif isinstance(source, str):
+            source = params[source]
+        if isinstance(value, str):
+            value = params[value]
+        tween.source, tween.value = source, value
+        self.active.append(tween)
+
+    def update(self, dt):
+        """Advance the clock by dt: start what's due, then step every active tween once."""
+        self.time += dt
+        tick = int(self.time / self.resolution)
+        if self.waiting:
+            # every slot passed since the last update, one lap at most
+            for t in range(self.tick + 1, min(tick, self.tick + len(self.wheel)) + 1):
+                self._start_due(t)
+        self.tick = tick
+
+        now = self.time
+        still = []
+        for tween in self.active:
+            playing = tween.playing
+            if playing.cancelled:
+                continue
+            segment = tween.segment
+            length = tween.end - tween.start
+            t = 1.0 if length <= 0 else min((now - tween.start) / length, 1.0)
+            k = segment.curve(t)
+            a, b = tween.source, tween.value
+            setattr(tween.target, segment.attr, tuple(x + (y - x) * k for x, y in zip(a, b)))
+            if t < 1.0:
+                still.append(tween)
+            else:
+                self._done(playing)
+        self.active = still
+
+    def _done(self, playing):
+        playing.remaining -= 1
+        if playing.remaining == 0:
+            self._finish(playing)
+
+    def _finish(self, playing):
+        if playing.key is not None and self.playing.get(playing.key) is playing:
+            del self.playing[playing.key]
+
+    def stats(self):
+        return {
+            "active": len(self.active),
+            "waiting": self.waiting,
+            "clips": len(self.playing),
+            "plays": self.plays,
+            "cancels": self.cancels,
+        }